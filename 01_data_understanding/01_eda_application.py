@@ -8,7 +8,7 @@ sys.path.append(str(PROJECT_ROOT))
 import pandas as pd
 
 from src.io import load_parquet, report_basic
-from src.config import TARGET_COL
+from src.config import INTERIM_DIR, TARGET_COL
 
 
 def main():
@@ -60,7 +60,7 @@ def main():
         "top_null_columns": null_ratio.head(10).to_dict(),
     }
 
-    out_dir = PROJECT_ROOT / "data" / "interim"
+    out_dir = INTERIM_DIR
     out_dir.mkdir(parents=True, exist_ok=True)
     out_path = out_dir / "eda_application_summary.json"
 
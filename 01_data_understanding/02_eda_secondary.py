@@ -7,7 +7,7 @@ sys.path.append(str(PROJECT_ROOT))
 import pandas as pd
 
 from src.io import load_parquet, report_basic, require_columns
-from src.config import KEYS
+from src.config import INTERIM_DIR, KEYS
 
 
 def key_profile(df: pd.DataFrame, key: str, df_name: str) -> dict:
@@ -77,7 +77,7 @@ def main():
             print(f"Duplicated SK_ID_PREV rows in previous_application: {dup}")
 
     
-    out_dir = PROJECT_ROOT / "data" / "interim"
+    out_dir = INTERIM_DIR
     out_dir.mkdir(parents=True, exist_ok=True)
     out_path = out_dir / "eda_secondary_key_profiles.json"
     pd.DataFrame(profiles).to_json(out_path, orient="records", indent=2)
@@ -7,13 +7,17 @@ sys.path.append(str(PROJECT_ROOT))
 import pandas as pd
 
 from src.io import load_parquet, require_columns
-from src.config import KEYS, TARGET_COL
+from src.config import KEYS, PROCESSED_DIR, TARGET_COL
+from src.profiling import span, stage
 
 
 def main():
     
-    res = load_parquet("application")
-    df = res.df.copy()
+    with span("load", table="application") as s:
+        res = load_parquet("application")
+        s["rows"] = res.df.shape[0]
+    with span("derive", step="copy"):
+        df = res.df.copy()
 
     print(f"Loaded application: shape={df.shape}")
 
@@ -22,8 +26,9 @@ def main():
 
     
     if TARGET_COL in df.columns:
-        y = df[TARGET_COL].astype("int8")
-        X = df.drop(columns=[TARGET_COL])
+        with span("derive", step="split_target"):
+            y = df[TARGET_COL].astype("int8")
+            X = df.drop(columns=[TARGET_COL])
         print("TARGET column found and separated.")
     else:
         y = None
@@ -35,17 +40,19 @@ def main():
     print(f"ID columns detected: {id_cols}")
 
     
-    out_dir = PROJECT_ROOT / "data" / "processed"
+    out_dir = PROCESSED_DIR
     out_dir.mkdir(parents=True, exist_ok=True)
 
     X_path = out_dir / "base_X.parquet"
-    X.to_parquet(X_path)
+    with span("write", path=X_path.name, rows=X.shape[0]):
+        X.to_parquet(X_path)
 
     print(f"[OK] Base features saved to: {X_path}")
 
     if y is not None:
         y_path = out_dir / "base_y.parquet"
-        y.to_frame("TARGET").to_parquet(y_path)
+        with span("write", path=y_path.name, rows=y.shape[0]):
+            y.to_frame("TARGET").to_parquet(y_path)
         print(f"[OK] Target saved to: {y_path}")
 
     
@@ -62,4 +69,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with stage(__file__):
+        main()
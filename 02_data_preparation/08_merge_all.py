@@ -6,86 +6,66 @@ sys.path.append(str(PROJECT_ROOT))
 
 import pandas as pd
 
-from src.config import KEYS
-from src.io import load_parquet, require_columns
+from src.artifact_cache import cached_build
+from src.config import KEYS, PROCESSED_DIR
+from src.features import FEATURE_GROUPS, merge_features, save_model_tables
+from src.io import require_columns
+from src.profiling import span, stage
 
 
 def load_processed(path: Path, name: str) -> pd.DataFrame:
     if not path.exists():
         raise FileNotFoundError(f"Missing processed file: {path}")
-    df = pd.read_parquet(path)
+    with span("load", table=name) as s:
+        df = pd.read_parquet(path)
+        s["rows"] = df.shape[0]
     print(f"Loaded {name}: shape={df.shape}")
     return df
 
 
 def main():
-    processed_dir = PROJECT_ROOT / "data" / "processed"
+    processed_dir = PROCESSED_DIR
 
-    
-    base_X = load_processed(processed_dir / "base_X.parquet", "base_X")
+    base_X_path = processed_dir / "base_X.parquet"
     base_y_path = processed_dir / "base_y.parquet"
-    base_y = load_processed(base_y_path, "base_y") if base_y_path.exists() else None
+    feat_paths = [(g.output_name, processed_dir / f"{g.output_name}.parquet") for g in FEATURE_GROUPS]
 
-    require_columns(base_X, [KEYS["SK_ID_CURR"]], df_name="base_X")
+    def build():
+        base_X = load_processed(base_X_path, "base_X")
+        base_y = load_processed(base_y_path, "base_y") if base_y_path.exists() else None
 
-    n_base = base_X.shape[0]
+        require_columns(base_X, [KEYS["SK_ID_CURR"]], df_name="base_X")
 
-    
-    feat_files = [
-        ("feat_bureau", processed_dir / "feat_bureau.parquet"),
-        ("feat_bureau_balance", processed_dir / "feat_bureau_balance.parquet"),
-        ("feat_previous_application", processed_dir / "feat_previous_application.parquet"),
-        ("feat_pos_cash", processed_dir / "feat_pos_cash.parquet"),
-        ("feat_installments", processed_dir / "feat_installments.parquet"),
-        ("feat_credit_card", processed_dir / "feat_credit_card.parquet"),
-    ]
+        feats = [(name, load_processed(path, name)) for name, path in feat_paths]
 
-    feats = []
-    for name, path in feat_files:
-        df = load_processed(path, name)
-        require_columns(df, [KEYS["SK_ID_CURR"]], df_name=name)
+        with span("merge", tables=len(feats)) as s:
+            merged = merge_features(base_X, feats)
+            s["columns"] = merged.shape[1]
 
-        
-        dups = int(df.duplicated(subset=[KEYS["SK_ID_CURR"]]).sum())
-        if dups > 0:
-            raise ValueError(f"[{name}] tiene {dups} SK_ID_CURR duplicados (debería ser 1 fila por cliente).")
+        save_model_tables(merged, base_X, base_y, out_dir=processed_dir)
 
-        feats.append(df)
+    missing = [p for p in [base_X_path] + [p for _, p in feat_paths] if not p.exists()]
+    if missing:
+        raise FileNotFoundError(f"Missing processed file: {missing[0]}")
 
-    
-    merged = base_X
-    for df_feat in feats:
-        merged = merged.merge(df_feat, on=KEYS["SK_ID_CURR"], how="left")
-        print(f"After merge -> shape={merged.shape}")
+    # Versión por contenido de base + feat_*: si solo cambió un grupo, el merge se recalcula;
+    # si nada cambió, model_X/model_y se restauran del cache
+    inputs = [base_X_path] + ([base_y_path] if base_y_path.exists() else []) + [p for _, p in feat_paths]
+    outputs = [processed_dir / "model_X.parquet", processed_dir / "model_metadata.json"]
+    if base_y_path.exists():
+        outputs.append(processed_dir / "model_y.parquet")
 
-    
-    if merged.shape[0] != n_base:
-        raise ValueError(f"Row count changed after merges! base={n_base}, merged={merged.shape[0]}")
-
-    
-    out_dir = processed_dir
-    out_dir.mkdir(parents=True, exist_ok=True)
-
-    X_out = out_dir / "model_X.parquet"
-    merged.to_parquet(X_out)
-    print(f"[OK] Model features saved to: {X_out}")
-
-    if base_y is not None and "TARGET" in base_y.columns:
-        y_out = out_dir / "model_y.parquet"
-        base_y.to_parquet(y_out)
-        print(f"[OK] Model target saved to: {y_out}")
-
-    
-    meta = {
-        "rows": int(merged.shape[0]),
-        "n_features": int(merged.shape[1]),
-        "n_added_features": int(merged.shape[1] - base_X.shape[1]),
-    }
-
-    meta_path = out_dir / "model_metadata.json"
-    pd.Series(meta).to_json(meta_path, indent=2)
-    print(f"[OK] Model metadata saved to: {meta_path}")
+    cached = cached_build(
+        "model_tables",
+        inputs,
+        outputs,
+        build,
+        code=[Path(__file__), load_processed, merge_features, save_model_tables],
+    )
+    if cached:
+        print(f"[OK] Model tables restored from cache to: {processed_dir}")
 
 
 if __name__ == "__main__":
-    main()
+    with stage(__file__):
+        main()
@@ -7,39 +7,47 @@ sys.path.append(str(PROJECT_ROOT))
 import pandas as pd
 from sklearn.model_selection import train_test_split
 
-from src.config import TARGET_COL
+from src.artifact_cache import cached_build
+from src.config import PROCESSED_DIR, TARGET_COL
+from src.profiling import span, stage
 
 
 RANDOM_STATE = 42
 
+SPLIT_FILES = [
+    "X_train.parquet", "y_train.parquet",
+    "X_valid.parquet", "y_valid.parquet",
+    "X_test.parquet", "y_test.parquet",
+    "split_metadata.json",
+]
 
-def main():
-    processed_dir = PROJECT_ROOT / "data" / "processed"
 
-    
-    X = pd.read_parquet(processed_dir / "model_X.parquet")
-    y = pd.read_parquet(processed_dir / "model_y.parquet")[TARGET_COL]
+def split(processed_dir: Path):
+    with span("load", table="model_X") as s:
+        X = pd.read_parquet(processed_dir / "model_X.parquet")
+        y = pd.read_parquet(processed_dir / "model_y.parquet")[TARGET_COL]
+        s["rows"] = X.shape[0]
 
     print(f"Loaded model_X: {X.shape}")
     print(f"Loaded model_y: {y.shape}")
 
     
-    X_train, X_temp, y_train, y_temp = train_test_split(
-        X,
-        y,
-        test_size=0.30,
-        stratify=y,
-        random_state=RANDOM_STATE,
-    )
-
-    
-    X_valid, X_test, y_valid, y_test = train_test_split(
-        X_temp,
-        y_temp,
-        test_size=0.50,
-        stratify=y_temp,
-        random_state=RANDOM_STATE,
-    )
+    with span("split"):
+        X_train, X_temp, y_train, y_temp = train_test_split(
+            X,
+            y,
+            test_size=0.30,
+            stratify=y,
+            random_state=RANDOM_STATE,
+        )
+
+        X_valid, X_test, y_valid, y_test = train_test_split(
+            X_temp,
+            y_temp,
+            test_size=0.50,
+            stratify=y_temp,
+            random_state=RANDOM_STATE,
+        )
 
     
     def report_split(name, y_part):
@@ -53,14 +61,10 @@ def main():
 
     
     out_dir = processed_dir
-    X_train.to_parquet(out_dir / "X_train.parquet")
-    y_train.to_frame(TARGET_COL).to_parquet(out_dir / "y_train.parquet")
-
-    X_valid.to_parquet(out_dir / "X_valid.parquet")
-    y_valid.to_frame(TARGET_COL).to_parquet(out_dir / "y_valid.parquet")
-
-    X_test.to_parquet(out_dir / "X_test.parquet")
-    y_test.to_frame(TARGET_COL).to_parquet(out_dir / "y_test.parquet")
+    for name, X_part, y_part in [("train", X_train, y_train), ("valid", X_valid, y_valid), ("test", X_test, y_test)]:
+        with span("write", path=f"X_{name}.parquet", rows=X_part.shape[0]):
+            X_part.to_parquet(out_dir / f"X_{name}.parquet")
+            y_part.to_frame(TARGET_COL).to_parquet(out_dir / f"y_{name}.parquet")
 
     
     meta = {
@@ -77,5 +81,21 @@ def main():
     print(f"[OK] Split metadata saved to: {meta_path}")
 
 
+def main():
+    processed_dir = PROCESSED_DIR
+
+    cached = cached_build(
+        "splits",
+        [processed_dir / "model_X.parquet", processed_dir / "model_y.parquet"],
+        [processed_dir / name for name in SPLIT_FILES],
+        lambda: split(processed_dir),
+        code=[Path(__file__)],
+        params={"random_state": RANDOM_STATE},
+    )
+    if cached:
+        print(f"[OK] Splits restored from cache to: {processed_dir}")
+
+
 if __name__ == "__main__":
-    main()
+    with stage(__file__):
+        main()
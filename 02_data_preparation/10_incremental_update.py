@@ -0,0 +1,48 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import pandas as pd
+
+from src.incremental import INCREMENTAL_GROUPS, incremental_update, init_state, state_paths
+from src.profiling import span, stage
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Actualiza un grupo de features con filas nuevas de su tabla mensual, sin recalcular la historia."
+    )
+    parser.add_argument("group", choices=INCREMENTAL_GROUPS)
+    parser.add_argument("deltas", nargs="*", type=Path, help="Parquets con las filas nuevas (mismas columnas que la tabla cruda).")
+    parser.add_argument("--init", action="store_true", help="Construye el estado por llave desde la tabla cruda completa.")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+
+    if args.init:
+        with span("aggregate", group=args.group, init=True):
+            state = init_state(args.group)
+        print(f"[OK] Incremental state for {args.group} ({len(state)} keys, {time.perf_counter() - t0:.1f}s) saved to: {state_paths(args.group)[0]}")
+        return
+
+    if not args.deltas:
+        parser.error("indicar al menos un parquet con filas nuevas (o --init)")
+
+    missing = [p for p in args.deltas if not p.exists()]
+    if missing:
+        raise FileNotFoundError(f"Missing delta file: {missing[0]}")
+
+    with span("aggregate", group=args.group, deltas=len(args.deltas)):
+        summary = incremental_update(args.group, (pd.read_parquet(p) for p in args.deltas))
+    print(summary)
+    print(f"[OK] {args.group} updated incrementally in {time.perf_counter() - t0:.1f}s (feat_{args.group}.parquet and model_X.parquet)")
+    print("Note: rerun 09_split_train_valid_test.py to refresh the splits.")
+
+
+if __name__ == "__main__":
+    with stage(__file__):
+        main()
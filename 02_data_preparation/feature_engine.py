@@ -0,0 +1,46 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import pandas as pd
+
+from src.config import PROCESSED_DIR
+from src.features import FEATURE_GROUPS, build_feature_groups, merge_features, save_feature_group, save_model_tables
+from src.profiling import span, stage
+
+# Alternativa a correr 02..08 por separado: cada tabla cruda se lee una vez, el mapeo
+# SK_ID_PREV/SK_ID_BUREAU -> SK_ID_CURR se construye una vez y model_X se arma en memoria.
+# Con True también se escriben los feat_*.parquet intermedios (igual que 02..07).
+WRITE_FEATURE_FILES = False
+
+
+def main():
+    processed_dir = PROCESSED_DIR
+
+    # base_X / base_y vienen de 01_build_base.py
+    with span("load", table="base_X") as s:
+        base_X = pd.read_parquet(processed_dir / "base_X.parquet")
+        base_y_path = processed_dir / "base_y.parquet"
+        base_y = pd.read_parquet(base_y_path) if base_y_path.exists() else None
+        s["rows"] = base_X.shape[0]
+    print(f"Loaded base_X: shape={base_X.shape}")
+
+    feats = build_feature_groups()
+
+    if WRITE_FEATURE_FILES:
+        for name, df in feats.items():
+            out_path = save_feature_group(name, df, out_dir=processed_dir)
+            print(f"[OK] Features saved to: {out_path}")
+
+    with span("merge", tables=len(FEATURE_GROUPS)) as s:
+        merged = merge_features(base_X, [(g.output_name, feats[g.name]) for g in FEATURE_GROUPS])
+        s["columns"] = merged.shape[1]
+
+    save_model_tables(merged, base_X, base_y, out_dir=processed_dir)
+
+
+if __name__ == "__main__":
+    with stage(__file__):
+        main()
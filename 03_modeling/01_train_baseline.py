@@ -13,23 +13,26 @@ from sklearn.impute import SimpleImputer
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import roc_auc_score, classification_report
 
-from src.config import TARGET_COL
+from src.config import ARTIFACTS_DIR, PROCESSED_DIR, TARGET_COL
+from src.profiling import span, stage
 
 
 RANDOM_STATE = 42
 
 
 def main():
-    data_dir = PROJECT_ROOT / "data" / "processed"
-    artifacts_dir = PROJECT_ROOT / "artifacts"
+    data_dir = PROCESSED_DIR
+    artifacts_dir = ARTIFACTS_DIR
     artifacts_dir.mkdir(parents=True, exist_ok=True)
 
     
-    X_train = pd.read_parquet(data_dir / "X_train.parquet")
-    y_train = pd.read_parquet(data_dir / "y_train.parquet")[TARGET_COL]
+    with span("load", table="X_train+X_valid") as s:
+        X_train = pd.read_parquet(data_dir / "X_train.parquet")
+        y_train = pd.read_parquet(data_dir / "y_train.parquet")[TARGET_COL]
 
-    X_valid = pd.read_parquet(data_dir / "X_valid.parquet")
-    y_valid = pd.read_parquet(data_dir / "y_valid.parquet")[TARGET_COL]
+        X_valid = pd.read_parquet(data_dir / "X_valid.parquet")
+        y_valid = pd.read_parquet(data_dir / "y_valid.parquet")[TARGET_COL]
+        s["rows"] = X_train.shape[0] + X_valid.shape[0]
 
     print(f"Train shape: {X_train.shape}")
     print(f"Valid shape: {X_valid.shape}")
@@ -37,8 +40,9 @@ def main():
     import numpy as np
 
     
-    X_train = X_train.replace([np.inf, -np.inf], np.nan)
-    X_valid = X_valid.replace([np.inf, -np.inf], np.nan)
+    with span("derive", step="inf_to_nan"):
+        X_train = X_train.replace([np.inf, -np.inf], np.nan)
+        X_valid = X_valid.replace([np.inf, -np.inf], np.nan)
 	
 
     
@@ -86,11 +90,13 @@ def main():
     )
 
     
-    pipe.fit(X_train, y_train)
+    with span("fit", model="logistic_regression", rows=X_train.shape[0]):
+        pipe.fit(X_train, y_train)
 
     
-    y_valid_proba = pipe.predict_proba(X_valid)[:, 1]
-    y_valid_pred = pipe.predict(X_valid)
+    with span("predict", rows=X_valid.shape[0]):
+        y_valid_proba = pipe.predict_proba(X_valid)[:, 1]
+        y_valid_pred = pipe.predict(X_valid)
 
     auc = roc_auc_score(y_valid, y_valid_proba)
 
@@ -115,4 +121,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with stage(__file__):
+        main()
@@ -5,41 +5,37 @@ PROJECT_ROOT = Path(__file__).resolve().parents[1]
 sys.path.append(str(PROJECT_ROOT))
 
 import json
-import numpy as np
 import pandas as pd
 from sklearn.ensemble import HistGradientBoostingClassifier
 from sklearn.metrics import roc_auc_score, classification_report
 
-from src.config import TARGET_COL
+from src.config import ARTIFACTS_DIR, PROCESSED_DIR, TARGET_COL
+from src.io import load_numeric_cached
+from src.profiling import span, stage
 
 
 RANDOM_STATE = 42
 
 
 def main():
-    data_dir = PROJECT_ROOT / "data" / "processed"
-    artifacts_dir = PROJECT_ROOT / "artifacts"
+    data_dir = PROCESSED_DIR
+    artifacts_dir = ARTIFACTS_DIR
     artifacts_dir.mkdir(parents=True, exist_ok=True)
 
     
-    X_train = pd.read_parquet(data_dir / "X_train.parquet")
-    y_train = pd.read_parquet(data_dir / "y_train.parquet")[TARGET_COL]
+    # Solo numéricas, inf -> NaN (cache .npy memory-mapped, ver src/io.py)
+    with span("load", table="X_train+X_valid", numeric_cache=True) as s:
+        X_train = load_numeric_cached(data_dir / "X_train.parquet")
+        y_train = pd.read_parquet(data_dir / "y_train.parquet")[TARGET_COL]
 
-    X_valid = pd.read_parquet(data_dir / "X_valid.parquet")
-    y_valid = pd.read_parquet(data_dir / "y_valid.parquet")[TARGET_COL]
-
-    
-    X_train = X_train.select_dtypes(include=["number"])
-    X_valid = X_valid.select_dtypes(include=["number"])
+        X_valid = load_numeric_cached(data_dir / "X_valid.parquet")
+        y_valid = pd.read_parquet(data_dir / "y_valid.parquet")[TARGET_COL]
+        s["rows"] = X_train.shape[0] + X_valid.shape[0]
 
     print(f"Train shape (numeric only): {X_train.shape}")
     print(f"Valid shape (numeric only): {X_valid.shape}")
 
     
-    X_train = X_train.replace([np.inf, -np.inf], np.nan)
-    X_valid = X_valid.replace([np.inf, -np.inf], np.nan)
-
-    
     model = HistGradientBoostingClassifier(
         max_depth=6,
         learning_rate=0.05,
@@ -50,10 +46,12 @@ def main():
     )
 
     
-    model.fit(X_train, y_train)
+    with span("fit", model="hist_gradient_boosting", rows=X_train.shape[0]):
+        model.fit(X_train, y_train)
 
     
-    y_valid_proba = model.predict_proba(X_valid)[:, 1]
+    with span("predict", rows=X_valid.shape[0]):
+        y_valid_proba = model.predict_proba(X_valid)[:, 1]
     y_valid_pred = (y_valid_proba >= 0.5).astype(int)
 
     auc = roc_auc_score(y_valid, y_valid_proba)
@@ -78,4 +76,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with stage(__file__):
+        main()
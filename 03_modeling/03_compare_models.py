@@ -1,9 +1,13 @@
+import sys
 import json
 from pathlib import Path
 import pandas as pd
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
-ARTIFACTS_DIR = PROJECT_ROOT / "artifacts"
+sys.path.append(str(PROJECT_ROOT))
+
+from src.config import ARTIFACTS_DIR
+from src.profiling import stage
 
 
 def main():
@@ -34,4 +38,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with stage(__file__):
+        main()
@@ -1,6 +1,5 @@
 import sys
 from pathlib import Path
-import numpy as np
 import pandas as pd
 from sklearn.ensemble import HistGradientBoostingClassifier
 from sklearn.metrics import roc_auc_score, classification_report
@@ -10,37 +9,34 @@ PROJECT_ROOT = Path(__file__).resolve().parents[1]
 sys.path.append(str(PROJECT_ROOT))
 
 
-from src.config import TARGET_COL
+from src.config import PROCESSED_DIR, TARGET_COL
+from src.io import load_numeric_cached
+from src.profiling import span, stage
 
 
 RANDOM_STATE = 42
 
 
 def main():
-    data_dir = PROJECT_ROOT / "data" / "processed"
+    data_dir = PROCESSED_DIR
 
     
-    X_train = pd.read_parquet(data_dir / "X_train.parquet")
-    y_train = pd.read_parquet(data_dir / "y_train.parquet")[TARGET_COL]
+    # Solo numéricas, inf -> NaN (cache .npy memory-mapped, ver src/io.py)
+    with span("load", table="X_train+X_valid+X_test", numeric_cache=True) as s:
+        X_train = load_numeric_cached(data_dir / "X_train.parquet")
+        y_train = pd.read_parquet(data_dir / "y_train.parquet")[TARGET_COL]
 
-    X_valid = pd.read_parquet(data_dir / "X_valid.parquet")
-    y_valid = pd.read_parquet(data_dir / "y_valid.parquet")[TARGET_COL]
+        X_valid = load_numeric_cached(data_dir / "X_valid.parquet")
+        y_valid = pd.read_parquet(data_dir / "y_valid.parquet")[TARGET_COL]
 
-    X_test = pd.read_parquet(data_dir / "X_test.parquet")
-    y_test = pd.read_parquet(data_dir / "y_test.parquet")[TARGET_COL]
+        X_test = load_numeric_cached(data_dir / "X_test.parquet")
+        y_test = pd.read_parquet(data_dir / "y_test.parquet")[TARGET_COL]
+        s["rows"] = X_train.shape[0] + X_valid.shape[0] + X_test.shape[0]
 
     
-    X_train = X_train.select_dtypes(include=["number"])
-    X_valid = X_valid.select_dtypes(include=["number"])
-    X_test = X_test.select_dtypes(include=["number"])
-
-    
-    for df in [X_train, X_valid, X_test]:
-        df.replace([np.inf, -np.inf], np.nan, inplace=True)
-
-    
-    X_full = pd.concat([X_train, X_valid])
-    y_full = pd.concat([y_train, y_valid])
+    with span("derive", step="concat_train_valid"):
+        X_full = pd.concat([X_train, X_valid])
+        y_full = pd.concat([y_train, y_valid])
 
     model = HistGradientBoostingClassifier(
         max_depth=6,
@@ -51,10 +47,12 @@ def main():
         class_weight={0: 1.0, 1: 5.0},
     )
 
-    model.fit(X_full, y_full)
+    with span("fit", model="hist_gradient_boosting", rows=X_full.shape[0]):
+        model.fit(X_full, y_full)
 
     
-    y_test_proba = model.predict_proba(X_test)[:, 1]
+    with span("predict", rows=X_test.shape[0]):
+        y_test_proba = model.predict_proba(X_test)[:, 1]
     y_test_pred = (y_test_proba >= 0.5).astype(int)
 
     auc = roc_auc_score(y_test, y_test_proba)
@@ -65,4 +63,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with stage(__file__):
+        main()
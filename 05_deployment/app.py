@@ -1,23 +1,112 @@
+import asyncio
+import os
+import sys
+import time
+import warnings
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, List, Optional
 
 import numpy as np
-import pandas as pd
-import joblib
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
-ARTIFACTS = PROJECT_ROOT / "artifacts"
+sys.path.append(str(PROJECT_ROOT))
 
-MODEL_PATH = ARTIFACTS / "champion_model.joblib"
-COLS_PATH = ARTIFACTS / "champion_numeric_cols.joblib"
+from src.config import ARTIFACTS_DIR
+from src.feature_store import FeatureStore
+from src.metrics import CONTENT_TYPE, SIZE_BUCKETS, MetricsMiddleware, MetricsRegistry, RequestTimer, annotate, mark, register_process_metrics
+from src.microbatch import MicroBatcher
+from src.model_registry import ModelBundle, load_model, load_version, manifest_signature, read_manifest, warm_up
+from src.shared_serving import STORE_SUBDIR, load_shared_model
+
+
+MODEL_PATH = ARTIFACTS_DIR / "champion_model.joblib"
+COLS_PATH = ARTIFACTS_DIR / "champion_numeric_cols.joblib"
+COMPILED_MODEL_PATH = ARTIFACTS_DIR / "champion_model_compiled.npz"
+FLAT_MODEL_PATH = ARTIFACTS_DIR / "champion_model_flat.bin"
+FEATURE_STORE_DIR = ARTIFACTS_DIR / "feature_store"
+
+# Modo multi-worker (05_deployment/serve.py): el proceso padre deja el modelo plano y el
+# feature store en este directorio (memoria compartida) y cada worker solo los abre con
+# memory-map. La recarga en caliente del registro sigue funcionando igual.
+SHARED_ARTIFACTS_DIR = os.environ.get("SHARED_ARTIFACTS_DIR")
+if SHARED_ARTIFACTS_DIR:
+    FEATURE_STORE_DIR = Path(SHARED_ARTIFACTS_DIR) / STORE_SUBDIR
+
+# Registro de modelos versionados (ver publish_model.py). Si tiene versión activa se sirve
+# esa y el servicio revisa el manifiesto cada MODEL_REGISTRY_POLL_S segundos (0 = no revisar);
+# si no, se usan los artefactos sueltos de artifacts/.
+MODEL_REGISTRY_DIR = Path(os.environ.get("MODEL_REGISTRY_DIR", str(ARTIFACTS_DIR / "model_registry")))
+MODEL_REGISTRY_POLL_S = float(os.environ.get("MODEL_REGISTRY_POLL_S", "5"))
+
+# auto: usa el modelo plano (memory-map) o el compilado si existen (ver export_compiled_model.py);
+# si no, el joblib. Con flat / compiled el servicio no importa sklearn ni pandas.
+MODEL_FORMAT = os.environ.get("MODEL_FORMAT", "auto")
+
+THRESHOLD = 0.5
+
+# Tamaño de bloque para /predict/batch (filas por llamada a predict_proba)
+BATCH_CHUNK_SIZE = int(os.environ.get("PREDICT_BATCH_CHUNK_SIZE", "50000"))
+
+# Micro-batching de /predict: agrupa solicitudes concurrentes hasta MAX_BATCH filas o MAX_WAIT_MS
+MICROBATCH_ENABLED = os.environ.get("MICROBATCH_ENABLED", "1") == "1"
+MICROBATCH_MAX_BATCH = int(os.environ.get("MICROBATCH_MAX_BATCH", "64"))
+MICROBATCH_MAX_WAIT_MS = float(os.environ.get("MICROBATCH_MAX_WAIT_MS", "2"))
+
+# Métricas de Prometheus en GET /metrics: tiempo por etapa de cada solicitud, filas por
+# solicitud y por llamada al modelo, versión del modelo y memoria del proceso.
+# METRICS_ENABLED=0 quita el middleware y los timers (para medir su costo).
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") == "1"
+
+
+# El modelo se entrenó con DataFrame; se puntúa con arrays NumPy en el mismo orden de columnas
+warnings.filterwarnings("ignore", message="X does not have valid feature names")
 
 
 app = FastAPI(title="Home Credit Risk API", version="1.0")
 
 
+metrics = MetricsRegistry()
+REQUESTS = metrics.counter("hc_api_requests_total", "Requests by route, status code and model version.", ["route", "status", "model_version"])
+REQUEST_SECONDS = metrics.histogram("hc_api_request_duration_seconds", "Request latency inside the app, from routing to the last byte sent.", ["route"])
+STAGE_SECONDS = metrics.histogram(
+    "hc_api_stage_duration_seconds",
+    "Successful request time by stage: parse (body + validation), features, inference (includes micro-batch wait), serialize.",
+    ["route", "stage"],
+)
+REQUEST_ROWS = metrics.histogram("hc_api_request_rows", "Rows scored per successful request.", ["route"], buckets=SIZE_BUCKETS)
+MODEL_SECONDS = metrics.histogram("hc_model_predict_duration_seconds", "Duration of each predict_proba call.", ["model_version"])
+MODEL_ROWS = metrics.histogram("hc_model_predict_rows", "Rows per predict_proba call (micro-batch, batch chunk or single row).", ["model_version"], buckets=SIZE_BUCKETS)
+metrics.gauge(
+    "hc_model_info",
+    "Model being served (always 1).",
+    lambda: [((serving.bundle.version, serving.bundle.format, len(serving.bundle.columns)), 1)],
+    ["version", "format", "n_features"],
+)
+metrics.gauge("hc_model_memory_bytes", "Memory used by the served model arrays.", lambda: [((serving.bundle.version,), serving.bundle.memory_bytes or 0)], ["version"])
+metrics.gauge("hc_model_loaded_timestamp_seconds", "When the served model was loaded.", lambda: [((serving.bundle.version,), serving.bundle.loaded_at)], ["version"])
+register_process_metrics(metrics)
+
+
+def observe_request(route: str, status: int, timer: RequestTimer, seconds: float) -> None:
+    REQUEST_SECONDS.observe(seconds, route)
+    REQUESTS.inc(route, str(status), timer.model_version or "")
+    if status == 200:
+        for stage, elapsed in timer.stages:
+            STAGE_SECONDS.observe(elapsed, route, stage)
+        if timer.rows is not None:
+            REQUEST_ROWS.observe(timer.rows, route)
+
+
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, on_request=observe_request)
+
+
 class PredictRequest(BaseModel):
     """
     Recibe un diccionario de features (por ejemplo desde model_X).
@@ -33,11 +122,243 @@ class PredictRequest(BaseModel):
     features: Dict[str, Any]
 
 
+class PredictBatchRequest(BaseModel):
+    """
+    Recibe muchos registros en una sola llamada, en uno de dos formatos:
+
+    - Filas: {"records": [{"EXT_SOURCE_1": 0.7, ...}, {...}]}
+    - Columnar: {"columns": {"EXT_SOURCE_1": [0.7, 0.1, ...], ...}}
+
+    Las probabilidades se devuelven en el mismo orden de entrada.
+    """
+    records: Optional[List[Dict[str, Any]]] = None
+    columns: Optional[Dict[str, List[Any]]] = None
+    chunk_size: Optional[int] = None
+
+
+class PredictRawRequest(BaseModel):
+    """
+    Cliente nuevo (no está en model_X): su fila cruda de application y sus registros crudos
+    de cada tabla de historial, con las columnas de data/raw. Las features se calculan igual
+    que en 02_data_preparation (src/online_features.py). Ejemplo:
+    {
+      "application": {"SK_ID_CURR": 456789, "AMT_CREDIT": 500000, ...},
+      "bureau": [{"SK_ID_BUREAU": 1, "AMT_CREDIT_SUM": 120000, ...}],
+      "bureau_balance": [{"SK_ID_BUREAU": 1, "MONTHS_BALANCE": -3, "STATUS": "0"}],
+      "previous_application": [{"SK_ID_PREV": 7, ...}],
+      "pos_cash_balance": [], "installments_payments": [], "credit_card_balance": []
+    }
+    """
+    application: Dict[str, Any]
+    bureau: List[Dict[str, Any]] = []
+    bureau_balance: List[Dict[str, Any]] = []
+    previous_application: List[Dict[str, Any]] = []
+    pos_cash_balance: List[Dict[str, Any]] = []
+    installments_payments: List[Dict[str, Any]] = []
+    credit_card_balance: List[Dict[str, Any]] = []
+
+
+class InFlight:
+    """
+    Solicitudes que todavía usan un Serving (se cuentan en el event loop, sin lock).
+    """
+
+    def __init__(self):
+        self.count = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    def __enter__(self):
+        self.count += 1
+        self._idle.clear()
+        return self
+
+    def __exit__(self, *exc):
+        self.count -= 1
+        if self.count == 0:
+            self._idle.set()
+
+    async def drained(self) -> None:
+        await self._idle.wait()
+
+
+@dataclass(frozen=True)
+class Serving:
+    """
+    Modelo activo y su micro-batcher. Se reemplaza completo en un cambio de versión: cada
+    solicitud toma la referencia una vez, así que arma su fila y la puntúa con el mismo modelo.
+    """
+    bundle: ModelBundle
+    batcher: Optional[MicroBatcher]
+    in_flight: InFlight = field(default_factory=InFlight)
+
+
+@contextmanager
+def active_serving() -> Iterator[Serving]:
+    """
+    El Serving actual, marcado en uso hasta que termina la solicitud: su micro-batcher no se
+    cierra mientras tanto aunque un cambio de versión lo reemplace en medio de un await.
+    """
+    s = serving
+    with s.in_flight:
+        yield s
+
+
+registry_status: Dict[str, Any] = {"last_check": None, "last_error": None}
+
+
+def load_initial_model() -> ModelBundle:
+    if SHARED_ARTIFACTS_DIR:
+        return load_shared_model(Path(SHARED_ARTIFACTS_DIR))
+
+    if read_manifest(MODEL_REGISTRY_DIR)["active"] is not None:
+        return load_version(MODEL_REGISTRY_DIR, model_format=MODEL_FORMAT)
+
+    # Sin registro: artefactos sueltos de artifacts/
+    bundle = load_model(MODEL_PATH, COLS_PATH, COMPILED_MODEL_PATH, model_format=MODEL_FORMAT, flat_path=FLAT_MODEL_PATH)
+    warm_up(bundle)
+    return bundle
+
+
+def check_feature_store(bundle: ModelBundle) -> None:
+    if store is not None and list(store.columns) != list(bundle.columns):
+        raise ValueError(f"[{bundle.version}] El feature store no tiene las mismas columnas que el modelo; regenerarlo.")
+
+
+def start_batcher(bundle: ModelBundle) -> Optional[MicroBatcher]:
+    if not MICROBATCH_ENABLED:
+        return None
+    batcher = MicroBatcher(
+        lambda X: predict_proba(bundle, X),
+        max_batch=MICROBATCH_MAX_BATCH,
+        max_wait_ms=MICROBATCH_MAX_WAIT_MS,
+    )
+    batcher.start()
+    return batcher
+
+
+async def swap_model(bundle: ModelBundle) -> None:
+    """
+    Activa un modelo ya cargado y validado: el cambio es una sola asignación en el event
+    loop. El micro-batcher anterior se cierra recién cuando terminan las solicitudes que
+    tomaron el Serving anterior (algunas todavía arman su fila, ej. /predict/raw).
+    """
+    global serving
+    old = serving
+    serving = Serving(bundle, start_batcher(bundle))
+    if old.batcher is not None:
+        await old.in_flight.drained()
+        await old.batcher.close()
+
+
+async def reload_model() -> bool:
+    """
+    Carga la versión activa del registro si no es la que se está sirviendo. La carga y la
+    validación corren en el threadpool; si fallan, se sigue sirviendo el modelo actual.
+    """
+    registry_status["last_check"] = time.time()
+    try:
+        target = read_manifest(MODEL_REGISTRY_DIR)["active"]
+        if target is None or target == serving.bundle.version:
+            registry_status["last_error"] = None
+            return False
+        bundle = await run_in_threadpool(load_version, MODEL_REGISTRY_DIR, target, MODEL_FORMAT)
+        check_feature_store(bundle)
+    except Exception as e:
+        registry_status["last_error"] = f"{type(e).__name__}: {e}"
+        return False
+
+    await swap_model(bundle)
+    registry_status["last_error"] = None
+    return True
+
+
+async def watch_registry() -> None:
+    """
+    Recarga el modelo cuando cambia el manifiesto. Si la carga falla, el cambio no se da por
+    visto y se reintenta en cada consulta hasta que la versión activa se pueda servir.
+    """
+    last = manifest_signature(MODEL_REGISTRY_DIR)
+    while True:
+        await asyncio.sleep(MODEL_REGISTRY_POLL_S)
+        signature = manifest_signature(MODEL_REGISTRY_DIR)
+        if signature != last:
+            await reload_model()
+            if registry_status["last_error"] is None:
+                last = signature
+
+
 @app.on_event("startup")
-def load_artifacts():
-    global model, numeric_cols
-    model = joblib.load(MODEL_PATH)
-    numeric_cols = joblib.load(COLS_PATH)
+def load_feature_store():
+    global store
+    store = None
+    # Opcional: se genera con 05_deployment/build_feature_store.py
+    if FEATURE_STORE_DIR.exists():
+        store = FeatureStore.load(FEATURE_STORE_DIR)
+
+
+@app.on_event("startup")
+async def load_artifacts():
+    global serving, watcher
+    bundle = load_initial_model()
+    check_feature_store(bundle)
+    serving = Serving(bundle, start_batcher(bundle))
+
+    watcher = None
+    if MODEL_REGISTRY_POLL_S > 0:
+        watcher = asyncio.get_running_loop().create_task(watch_registry())
+
+
+@app.on_event("shutdown")
+async def stop_serving():
+    if watcher is not None:
+        watcher.cancel()
+    if serving.batcher is not None:
+        await serving.batcher.stop()
+
+
+def batch_to_matrix(req: PredictBatchRequest, builder) -> np.ndarray:
+    """
+    Construye la matriz de features (en el orden de numeric_cols) para un batch.
+    """
+    if (req.records is None) == (req.columns is None):
+        raise HTTPException(status_code=422, detail="Enviar exactamente uno de 'records' o 'columns'.")
+
+    try:
+        if req.records is not None:
+            return builder.matrix(req.records)
+
+        lengths = {len(v) for v in req.columns.values()}
+        if len(lengths) > 1:
+            raise HTTPException(status_code=422, detail=f"Columnas con largos distintos: {sorted(lengths)}")
+        n_rows = lengths.pop() if lengths else 0
+        return builder.matrix_from_columns(req.columns, n_rows)
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=422, detail=f"Valor de feature no numérico: {e}")
+
+
+def predict_proba(bundle: ModelBundle, X: np.ndarray) -> np.ndarray:
+    """
+    Probabilidad de default de cada fila: una llamada al modelo (medida si hay métricas).
+    """
+    if not METRICS_ENABLED:
+        return bundle.model.predict_proba(X)[:, 1]
+    t0 = time.perf_counter()
+    proba = bundle.model.predict_proba(X)[:, 1]
+    MODEL_SECONDS.observe(time.perf_counter() - t0, bundle.version)
+    MODEL_ROWS.observe(X.shape[0], bundle.version)
+    return proba
+
+
+def predict_proba_chunked(bundle: ModelBundle, X: np.ndarray, chunk_size: int) -> np.ndarray:
+    """
+    Llama a predict_proba por bloques de chunk_size filas (una llamada vectorizada por bloque).
+    """
+    proba = np.empty(X.shape[0], dtype=np.float64)
+    for start in range(0, X.shape[0], chunk_size):
+        stop = start + chunk_size
+        proba[start:stop] = predict_proba(bundle, X[start:stop])
+    return proba
 
 
 @app.get("/health")
@@ -45,22 +366,153 @@ def health():
     return {"status": "ok"}
 
 
+@app.get("/metrics")
+def prometheus_metrics():
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Métricas deshabilitadas (METRICS_ENABLED=0).")
+    return Response(metrics.render(), media_type=CONTENT_TYPE)
+
+
+def predict_one(bundle: ModelBundle, features: Dict[str, Any]) -> float:
+    row = bundle.builder.row(features)
+    mark("features")
+    return float(predict_proba(bundle, row)[0])
+
+
+async def score_row(s: Serving, row: np.ndarray) -> float:
+    if s.batcher is not None:
+        return await s.batcher.submit(row)
+    return await run_in_threadpool(lambda: float(predict_proba(s.bundle, row[None, :])[0]))
+
+
 @app.post("/predict")
-def predict(req: PredictRequest):
+async def predict(req: PredictRequest):
     
-    row = pd.DataFrame([req.features])
+    with active_serving() as s:
+        mark("parse")
+        annotate(1, s.bundle.version)
+        try:
+            if s.batcher is not None:
+                # Fila propia (no el buffer del hilo): queda en cola hasta que se procese su batch
+                row = s.bundle.builder.matrix([req.features])[0]
+                mark("features")
+                proba = await score_row(s, row)
+            else:
+                proba = await run_in_threadpool(predict_one, s.bundle, req.features)
+        except (TypeError, ValueError) as e:
+            raise HTTPException(status_code=422, detail=f"Valor de feature no numérico: {e}")
+        mark("inference")
 
-    
-    row = row.reindex(columns=numeric_cols)
+        pred = int(proba >= THRESHOLD)
 
-    
-    row = row.replace([np.inf, -np.inf], np.nan)
+        return {
+            "prediction": pred,
+            "probability_default": proba,
+            "threshold": THRESHOLD
+        }
+
+
+@app.get("/score/{sk_id_curr}")
+async def score_customer(sk_id_curr: int):
+
+    if store is None:
+        raise HTTPException(status_code=503, detail="Feature store no disponible (ver build_feature_store.py).")
+
+    with active_serving() as s:
+        mark("parse")
+        annotate(1, s.bundle.version)
+        row = store.get(sk_id_curr)
+        if row is None:
+            raise HTTPException(status_code=404, detail=f"SK_ID_CURR {sk_id_curr} no existe en el feature store.")
+        mark("features")
+
+        proba = await score_row(s, row)
+        mark("inference")
+
+        return {
+            "SK_ID_CURR": sk_id_curr,
+            "prediction": int(proba >= THRESHOLD),
+            "probability_default": proba,
+            "threshold": THRESHOLD
+        }
+
+
+def raw_to_row(bundle: ModelBundle, req: PredictRawRequest) -> np.ndarray:
+    # Import diferido: online_features trae pandas y el pipeline de features, que solo hacen
+    # falta para /predict/raw (el arranque de cada worker no los paga)
+    from src.online_features import HISTORY_TABLES, customer_features
+
+    history = {t: getattr(req, t) for t in HISTORY_TABLES}
+    features = customer_features(req.application, history)
+    return bundle.builder.matrix([features])[0]
+
+
+@app.post("/predict/raw")
+async def predict_raw(req: PredictRawRequest):
+
+    with active_serving() as s:
+        mark("parse")
+        annotate(1, s.bundle.version)
+        try:
+            row = await run_in_threadpool(raw_to_row, s.bundle, req)
+        except (TypeError, ValueError) as e:
+            raise HTTPException(status_code=422, detail=f"Registros crudos inválidos: {e}")
+        mark("features")
+
+        proba = await score_row(s, row)
+        mark("inference")
+
+        return {
+            "SK_ID_CURR": req.application.get("SK_ID_CURR"),
+            "prediction": int(proba >= THRESHOLD),
+            "probability_default": proba,
+            "threshold": THRESHOLD
+        }
+
+
+@app.get("/predict/microbatch")
+def microbatch_stats():
+    batcher = serving.batcher
+    if batcher is None:
+        return {"enabled": False}
+    return {"enabled": True, **batcher.stats()}
+
+
+@app.get("/model")
+def model_info():
+    manifest = read_manifest(MODEL_REGISTRY_DIR)
+    last_check = registry_status["last_check"]
+    return {
+        **serving.bundle.info(),
+        "registry": {
+            "dir": str(MODEL_REGISTRY_DIR),
+            "active": manifest["active"],
+            "versions": list(manifest["versions"]),
+            "poll_seconds": MODEL_REGISTRY_POLL_S,
+            "last_check": time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime(last_check)) if last_check else None,
+            "last_error": registry_status["last_error"],
+        },
+    }
+
+
+@app.post("/predict/batch")
+def predict_batch(req: PredictBatchRequest):
+
+    chunk_size = req.chunk_size or BATCH_CHUNK_SIZE
+    if chunk_size <= 0:
+        raise HTTPException(status_code=422, detail="chunk_size debe ser > 0.")
 
-    proba = float(model.predict_proba(row)[:, 1][0])
-    pred = int(proba >= 0.5)
+    s = serving
+    mark("parse")
+    X = batch_to_matrix(req, s.bundle.builder)
+    annotate(X.shape[0], s.bundle.version)
+    mark("features")
+    proba = predict_proba_chunked(s.bundle, X, chunk_size)
+    mark("inference")
 
     return {
-        "prediction": pred,
-        "probability_default": proba,
-        "threshold": 0.5
+        "n": int(proba.shape[0]),
+        "predictions": (proba >= THRESHOLD).astype(int).tolist(),
+        "probabilities_default": proba.tolist(),
+        "threshold": THRESHOLD,
     }
@@ -0,0 +1,36 @@
+import sys
+from pathlib import Path
+import pandas as pd
+import joblib
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.config import ARTIFACTS_DIR, KEYS, PROCESSED_DIR
+from src.feature_store import build_feature_store
+
+# float32 reduce la matriz a la mitad; puede mover probabilidades en ~1e-4 cuando un valor
+# queda muy cerca de un umbral de split. Usar "float64" para paridad exacta con /predict.
+STORE_DTYPE = "float32"
+
+
+def main():
+    data_dir = PROCESSED_DIR
+    artifacts_dir = ARTIFACTS_DIR
+
+    numeric_cols = joblib.load(artifacts_dir / "champion_numeric_cols.joblib")
+
+    # SK_ID_CURR también puede estar entre las columnas del modelo
+    read_cols = list(dict.fromkeys([KEYS["SK_ID_CURR"]] + list(numeric_cols)))
+    model_X = pd.read_parquet(data_dir / "model_X.parquet", columns=read_cols)
+    print(f"Loaded model_X: shape={model_X.shape}")
+
+    store_dir = artifacts_dir / "feature_store"
+    store = build_feature_store(model_X, numeric_cols, store_dir, dtype=STORE_DTYPE)
+
+    print(f"Feature store: rows={len(store)}, n_features={len(store.columns)}, dtype={store.features.dtype}")
+    print(f"[OK] Feature store saved to: {store_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import sys
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import joblib
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.config import ARTIFACTS_DIR, PROCESSED_DIR
+from src.tree_ensemble import CompiledEnsemble, export_hist_gradient_boosting
+
+PARITY_TOL = 1e-9
+
+
+def main():
+    data_dir = PROCESSED_DIR
+    artifacts_dir = ARTIFACTS_DIR
+
+    model = joblib.load(artifacts_dir / "champion_model.joblib")
+    numeric_cols = joblib.load(artifacts_dir / "champion_numeric_cols.joblib")
+
+    compiled = export_hist_gradient_boosting(model, numeric_cols)
+    print(f"Compiled ensemble: n_trees={compiled.n_trees}, n_nodes={compiled.feature.shape[0]}, max_depth={compiled.max_depth}")
+
+    out_path = artifacts_dir / "champion_model_compiled.npz"
+    compiled.save(out_path)
+
+    # Formato plano para la API: un archivo memory-map sin pickle (MODEL_FORMAT=flat)
+    flat_path = artifacts_dir / "champion_model_flat.bin"
+    compiled.save_flat(flat_path)
+
+    # Paridad contra sklearn sobre test (el archivo guardado, no el objeto en memoria)
+    X_test = pd.read_parquet(data_dir / "X_test.parquet", columns=numeric_cols)
+    X_test = X_test.replace([np.inf, -np.inf], np.nan)
+
+    expected = model.predict_proba(X_test)[:, 1]
+    X = X_test.to_numpy(dtype=np.float64)
+
+    for path, loaded in [(out_path, CompiledEnsemble.load(out_path)), (flat_path, CompiledEnsemble.load_flat(flat_path))]:
+        got = loaded.predict_proba(X)[:, 1]
+        max_diff = float(np.max(np.abs(expected - got)))
+        print(f"Parity of {path.name} on X_test ({len(X_test)} rows): max_abs_diff={max_diff:.3e}")
+        if max_diff > PARITY_TOL:
+            raise ValueError(f"{path.name} no coincide con sklearn (max_abs_diff={max_diff} > {PARITY_TOL})")
+
+    print(f"[OK] Saved compiled model to: {out_path}")
+    print(f"[OK] Saved flat model to: {flat_path}")
+
+
+if __name__ == "__main__":
+    main()
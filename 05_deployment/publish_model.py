@@ -0,0 +1,74 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import argparse
+import os
+
+import joblib
+import pandas as pd
+
+from src.config import ARTIFACTS_DIR, PROCESSED_DIR
+from src.model_registry import WARMUP_ROWS, activate, load_version, publish, read_manifest
+
+REGISTRY_DIR = Path(os.environ.get("MODEL_REGISTRY_DIR", str(ARTIFACTS_DIR / "model_registry")))
+
+
+def warmup_batch(numeric_cols):
+    # Filas reales de validación para el batch de prueba (si existen)
+    path = PROCESSED_DIR / "X_valid.parquet"
+    if not path.exists():
+        return None
+    X = pd.read_parquet(path, columns=list(numeric_cols)).head(WARMUP_ROWS)
+    return X.replace([float("inf"), float("-inf")], float("nan")).to_numpy(dtype="float64")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publica el modelo campeón como nueva versión del registro.")
+    parser.add_argument("--version", help="Nombre de la versión (por defecto v<n+1>)")
+    parser.add_argument("--no-activate", action="store_true", help="Registrar sin activar")
+    parser.add_argument("--activate", dest="activate_version", help="Solo activar una versión existente (rollback)")
+    parser.add_argument("--list", action="store_true", help="Listar versiones")
+    args = parser.parse_args()
+
+    if args.list:
+        manifest = read_manifest(REGISTRY_DIR)
+        for version, meta in manifest["versions"].items():
+            mark = "*" if version == manifest["active"] else " "
+            print(f"{mark} {version}  {meta}")
+        return
+
+    if args.activate_version:
+        load_version(REGISTRY_DIR, args.activate_version)
+        activate(REGISTRY_DIR, args.activate_version)
+        print(f"[OK] Active version: {args.activate_version} ({REGISTRY_DIR})")
+        return
+
+    model_path = ARTIFACTS_DIR / "champion_model.joblib"
+    cols_path = ARTIFACTS_DIR / "champion_numeric_cols.joblib"
+    numeric_cols = joblib.load(cols_path)
+
+    # compiled / flat se exportan del joblib publicado (no se copian los de artifacts/)
+    version = publish(
+        REGISTRY_DIR,
+        model_path,
+        cols_path,
+        warmup=warmup_batch(numeric_cols),
+        version=args.version,
+        activate=False,
+        metadata={"n_features": len(numeric_cols)},
+    )
+
+    # Se valida igual que en el servicio antes de activarla
+    bundle = load_version(REGISTRY_DIR, version)
+    print(f"Validated {version}: format={bundle.format}, n_features={len(bundle.columns)}, memory={bundle.memory_bytes / 1e6:.1f} MB")
+
+    if not args.no_activate:
+        activate(REGISTRY_DIR, version)
+    print(f"[OK] Published {version} to: {REGISTRY_DIR}" + ("" if args.no_activate else " (active)"))
+
+
+if __name__ == "__main__":
+    main()
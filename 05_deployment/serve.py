@@ -0,0 +1,55 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import argparse
+import os
+import shutil
+import time
+
+from src.config import ARTIFACTS_DIR, PROCESSED_DIR
+from src.shared_serving import default_shared_dir, prepare_shared_artifacts
+
+REGISTRY_DIR = Path(os.environ.get("MODEL_REGISTRY_DIR", str(ARTIFACTS_DIR / "model_registry")))
+
+# Por defecto un worker por núcleo
+API_WORKERS = int(os.environ.get("API_WORKERS", str(os.cpu_count() or 1)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Levanta la API con varios workers que comparten modelo y feature store.")
+    parser.add_argument("--workers", type=int, default=API_WORKERS)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--shared-dir", type=Path, help="Directorio compartido (por defecto uno nuevo en /dev/shm)")
+    args = parser.parse_args()
+
+    import uvicorn
+
+    shared_dir = args.shared_dir or default_shared_dir()
+    try:
+        t0 = time.perf_counter()
+        bundle = prepare_shared_artifacts(
+            shared_dir,
+            REGISTRY_DIR,
+            model_path=ARTIFACTS_DIR / "champion_model.joblib",
+            columns_path=ARTIFACTS_DIR / "champion_numeric_cols.joblib",
+            store_dir=ARTIFACTS_DIR / "feature_store",
+            model_X_path=PROCESSED_DIR / "model_X.parquet",
+        )
+        size_mb = sum(p.stat().st_size for p in shared_dir.rglob("*") if p.is_file()) / 1e6
+        print(f"Shared artifacts: model {bundle.version} ({len(bundle.columns)} features), {size_mb:.1f} MB in {time.perf_counter() - t0:.2f}s")
+        print(f"[OK] Shared artifacts saved to: {shared_dir}")
+
+        # Los workers heredan el entorno: abren el directorio compartido en vez de los artefactos
+        os.environ["SHARED_ARTIFACTS_DIR"] = str(shared_dir)
+        uvicorn.run("app:app", app_dir=str(Path(__file__).resolve().parent), host=args.host, port=args.port, workers=args.workers)
+    finally:
+        if args.shared_dir is None:
+            shutil.rmtree(shared_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,5 @@
 import sys
 from pathlib import Path
-import numpy as np
 import pandas as pd
 import joblib
 from sklearn.ensemble import HistGradientBoostingClassifier
@@ -8,30 +7,23 @@ from sklearn.ensemble import HistGradientBoostingClassifier
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 sys.path.append(str(PROJECT_ROOT))
 
-from src.config import TARGET_COL
+from src.config import ARTIFACTS_DIR, PROCESSED_DIR, TARGET_COL
+from src.io import load_numeric_cached
 
 RANDOM_STATE = 42
 
 def main():
-    data_dir = PROJECT_ROOT / "data" / "processed"
-    out_dir = PROJECT_ROOT / "artifacts"
+    data_dir = PROCESSED_DIR
+    out_dir = ARTIFACTS_DIR
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    # Cargar train + valid
-    X_train = pd.read_parquet(data_dir / "X_train.parquet")
+    # Cargar train + valid (solo numéricas, inf -> NaN; cache .npy memory-mapped)
+    X_train = load_numeric_cached(data_dir / "X_train.parquet")
     y_train = pd.read_parquet(data_dir / "y_train.parquet")[TARGET_COL]
 
-    X_valid = pd.read_parquet(data_dir / "X_valid.parquet")
+    X_valid = load_numeric_cached(data_dir / "X_valid.parquet")
     y_valid = pd.read_parquet(data_dir / "y_valid.parquet")[TARGET_COL]
 
-    
-    X_train = X_train.select_dtypes(include=["number"])
-    X_valid = X_valid.select_dtypes(include=["number"])
-
-    
-    for df in (X_train, X_valid):
-        df.replace([np.inf, -np.inf], np.nan, inplace=True)
-
     X_full = pd.concat([X_train, X_valid], axis=0)
     y_full = pd.concat([y_train, y_valid], axis=0)
 
@@ -0,0 +1,227 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import argparse
+import asyncio
+import importlib.util
+import itertools
+import json
+import math
+import os
+import subprocess
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+
+import httpx
+import joblib
+import numpy as np
+import pandas as pd
+
+from src.config import ARTIFACTS_DIR, PROCESSED_DIR
+
+
+N_REQUESTS = 2000          # solicitudes por escenario
+N_WARMUP = 50
+CONCURRENCY = [1, 8, 32]   # carga cerrada: clientes que esperan su respuesta antes de enviar otra
+RATES = [100, 400, 800]    # carga abierta: solicitudes por segundo, lleguen o no las respuestas
+BATCH_ROWS = 100           # filas por solicitud de /predict/batch
+BATCH_REQUESTS = 200
+TIMEOUT_S = 10.0
+RANDOM_STATE = 42
+
+# Variables que cambian cómo sirve la API en proceso (se guardan con los resultados)
+API_ENV = ["METRICS_ENABLED", "MICROBATCH_ENABLED", "MICROBATCH_MAX_BATCH", "MICROBATCH_MAX_WAIT_MS", "MODEL_FORMAT"]
+
+
+def load_payloads(n: int) -> tuple[list[dict], list[str]]:
+    """
+    Filas de X_test como las enviaría un cliente: solo las columnas del modelo, sin NaN/inf.
+    """
+    columns = list(joblib.load(ARTIFACTS_DIR / "champion_numeric_cols.joblib"))
+    X_test = pd.read_parquet(PROCESSED_DIR / "X_test.parquet", columns=columns)
+    sample = X_test.sample(n=n, replace=len(X_test) < n, random_state=RANDOM_STATE)
+    payloads = [{k: float(v) for k, v in r.items() if pd.notna(v) and math.isfinite(v)} for r in sample.to_dict("records")]
+    return payloads, columns
+
+
+@asynccontextmanager
+async def api_client(url: str = None):
+    """
+    Cliente HTTP asíncrono: contra un servidor ya levantado (url) o contra app.py en el mismo
+    proceso (ASGI, con su startup / shutdown). En proceso, cliente y servidor comparten el
+    event loop: sirve para comparar commits, no como medida absoluta de capacidad.
+    """
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    if url is not None:
+        async with httpx.AsyncClient(base_url=url, timeout=TIMEOUT_S, limits=limits) as client:
+            yield client
+        return
+
+    spec = importlib.util.spec_from_file_location("app", PROJECT_ROOT / "05_deployment" / "app.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    transport = httpx.ASGITransport(app=module.app)
+    async with module.app.router.lifespan_context(module.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://api", timeout=TIMEOUT_S, limits=limits) as client:
+            yield client
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = []
+        self.statuses = Counter()
+
+    async def send(self, client: httpx.AsyncClient, path: str, body: dict, t_start: float) -> None:
+        # t_start: momento en que la solicitud debía salir (en carga abierta incluye la espera)
+        try:
+            r = await client.post(path, json=body)
+            status = str(r.status_code)
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        self.latencies.append(time.perf_counter() - t_start)
+        self.statuses[status] += 1
+
+    def summary(self, elapsed: float) -> dict:
+        ms = np.asarray(self.latencies) * 1000
+        n = int(sum(self.statuses.values()))
+        errors = n - self.statuses["200"]
+        return {
+            "requests": n,
+            "errors": errors,
+            "error_rate": errors / n if n else 0.0,
+            "statuses": dict(self.statuses),
+            "throughput_rps": self.statuses["200"] / elapsed if elapsed > 0 else 0.0,
+            "p50_ms": float(np.percentile(ms, 50)),
+            "p95_ms": float(np.percentile(ms, 95)),
+            "p99_ms": float(np.percentile(ms, 99)),
+            "mean_ms": float(ms.mean()),
+            "max_ms": float(ms.max()),
+        }
+
+
+async def closed_loop(client, path: str, bodies: list[dict], concurrency: int) -> dict:
+    """
+    concurrency clientes en paralelo; cada uno envía la siguiente solicitud al recibir la anterior.
+    """
+    rec, counter = Recorder(), itertools.count()
+
+    async def user():
+        while (i := next(counter)) < len(bodies):
+            await rec.send(client, path, bodies[i], time.perf_counter())
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    return rec.summary(time.perf_counter() - t0)
+
+
+async def open_loop(client, path: str, bodies: list[dict], rate: float) -> dict:
+    """
+    Llegadas a ritmo fijo (rate por segundo) sin esperar respuestas. La latencia se mide
+    desde el momento programado, así que la cola que se forma si la API no da abasto se ve
+    en los percentiles (sin omisión coordinada).
+    """
+    rec, tasks = Recorder(), []
+    t0 = time.perf_counter()
+    for i, body in enumerate(bodies):
+        scheduled = t0 + i / rate
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(rec.send(client, path, body, scheduled)))
+    await asyncio.gather(*tasks)
+    return rec.summary(time.perf_counter() - t0)
+
+
+def git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, capture_output=True, text=True)
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+async def run(url: str, n_requests: int) -> dict:
+    payloads, columns = load_payloads(max(n_requests, BATCH_ROWS * BATCH_REQUESTS))
+    single = [{"features": p} for p in payloads[:n_requests]]
+    batches = [{"records": payloads[i:i + BATCH_ROWS]} for i in range(0, BATCH_ROWS * BATCH_REQUESTS, BATCH_ROWS)]
+    print(f"Payloads: {len(single)} single, {len(batches)} batches x {BATCH_ROWS} rows, {len(columns)} features")
+
+    scenarios = []
+    async with api_client(url) as client:
+        model = (await client.get("/model")).json()
+        await closed_loop(client, "/predict", single[:N_WARMUP], 4)
+
+        plan = (
+            [("/predict", "closed", c, single) for c in CONCURRENCY]
+            + [("/predict", "open", r, single) for r in RATES]
+            + [("/predict/batch", "closed", c, batches) for c in CONCURRENCY[:2]]
+        )
+        for path, mode, level, bodies in plan:
+            if mode == "closed":
+                result = await closed_loop(client, path, bodies, level)
+            else:
+                result = await open_loop(client, path, bodies, level)
+            key = "concurrency" if mode == "closed" else "rate_rps"
+            rows = BATCH_ROWS if path == "/predict/batch" else 1
+            scenarios.append({"endpoint": path, "mode": mode, key: level, "rows_per_request": rows, **result})
+            print(
+                f"{path:15s} {mode:6s} {key}={level:<4} p50={result['p50_ms']:7.2f} ms  p95={result['p95_ms']:7.2f} ms  "
+                f"p99={result['p99_ms']:7.2f} ms  {result['throughput_rps']:8.1f} req/s ({result['throughput_rps'] * rows:9.0f} rows/s)  "
+                f"errors={result['error_rate']:.2%}"
+            )
+
+    return {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "target": url or "in-process",
+        "env": {k: os.environ[k] for k in API_ENV if k in os.environ},
+        "model": {k: model.get(k) for k in ("version", "format", "n_features")},
+        "scenarios": scenarios,
+    }
+
+
+def scenario_key(s: dict) -> tuple:
+    return s["endpoint"], s["mode"], s.get("concurrency", s.get("rate_rps"))
+
+
+def compare(previous: dict, current: dict) -> None:
+    """
+    Cambio de p99 y throughput respecto de la corrida anterior (mismo escenario).
+    """
+    before = {scenario_key(s): s for s in previous.get("scenarios", [])}
+    print(f"\nVs previous run (commit {previous.get('commit')}, {previous.get('timestamp')}):")
+    for s in current["scenarios"]:
+        old = before.get(scenario_key(s))
+        if old is None:
+            continue
+        endpoint, mode, level = scenario_key(s)
+        d_p99 = s["p99_ms"] / old["p99_ms"] - 1 if old["p99_ms"] else 0.0
+        d_rps = s["throughput_rps"] / old["throughput_rps"] - 1 if old["throughput_rps"] else 0.0
+        print(f"{endpoint:15s} {mode:6s} {level:<4}  p99 {d_p99:+7.1%}  throughput {d_rps:+7.1%}  errors {old['error_rate']:.2%} -> {s['error_rate']:.2%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latencia y throughput de la API (/predict y /predict/batch).")
+    parser.add_argument("--url", help="API ya levantada (ej. http://127.0.0.1:8000); por defecto app.py en proceso")
+    parser.add_argument("--requests", type=int, default=N_REQUESTS, help="Solicitudes por escenario de /predict")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.url, args.requests))
+
+    out_path = ARTIFACTS_DIR / "bench_api.json"
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    if out_path.exists():
+        with open(out_path) as f:
+            compare(json.load(f), results)
+    with open(out_path, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"\n[OK] Benchmark saved to: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
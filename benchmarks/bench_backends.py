@@ -0,0 +1,79 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import json
+import resource
+import subprocess
+import time
+
+import pandas as pd
+
+from src.config import ARTIFACTS_DIR
+from src.features import AGGREGATION_METHODS, build_feature_groups
+
+
+REPEATS = 3
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss viene en KB en Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def worker(method: str) -> dict:
+    best = float("inf")
+    for _ in range(REPEATS):
+        t0 = time.perf_counter()
+        feats = build_feature_groups(verbose=False, method=method)
+        best = min(best, time.perf_counter() - t0)
+        del feats
+
+    return {
+        "method": method,
+        "seconds": best,
+        # Pico absoluto del proceso (mismas importaciones en cada backend)
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def check_parity() -> None:
+    expected = build_feature_groups(verbose=False, method="groupby")
+    got = build_feature_groups(verbose=False, method="arrow")
+    for name, df in expected.items():
+        # Mismas columnas, dtypes y filas; las sumas de floats pueden diferir en los últimos bits
+        pd.testing.assert_frame_equal(df, got[name], check_exact=False, rtol=1e-9)
+        print(f"[OK] {name}: arrow backend matches groupby (shape={df.shape})")
+
+
+def main():
+    if len(sys.argv) == 3 and sys.argv[1] == "--worker":
+        print(json.dumps(worker(sys.argv[2])))
+        return
+
+    # Cada backend en un proceso nuevo: el pico de RSS no se contamina entre métodos. Antes
+    # de la verificación de paridad, porque ru_maxrss se hereda del proceso padre
+    results = []
+    for method in AGGREGATION_METHODS:
+        out = subprocess.run(
+            [sys.executable, __file__, "--worker", method],
+            check=True, capture_output=True, text=True,
+        )
+        r = json.loads(out.stdout.strip().splitlines()[-1])
+        results.append(r)
+        print(f"{method:9s} t={r['seconds']:.3f}s  peak_rss={r['peak_rss_mb']:8.1f} MB")
+
+    check_parity()
+
+    out_path = ARTIFACTS_DIR / "bench_backends.json"
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(out_path, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"\n[OK] Benchmark saved to: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import argparse
+import json
+import os
+import subprocess
+import shutil
+import tempfile
+import time
+
+from src.config import ARTIFACTS_DIR, PROCESSED_DIR
+
+
+FORMATS = ["joblib", "compiled", "flat"]
+# "shared": modelo plano + feature store preparados una vez por el padre (05_deployment/serve.py)
+MODES = FORMATS + ["shared"]
+N_WORKERS = 4
+
+# Módulos pesados que un worker de la API no debería necesitar para /predict
+HEAVY_MODULES = ["pandas", "sklearn", "scipy", "joblib", "pyarrow"]
+
+
+def memory_mb(pid="self") -> dict:
+    """
+    RSS y PSS (RSS con las páginas compartidas repartidas entre los procesos que las usan).
+    """
+    out = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            name, _, value = line.partition(":")
+            if name in ("Rss", "Pss", "Shared_Clean", "Private_Clean", "Private_Dirty"):
+                out[name.lower() + "_mb"] = int(value.split()[0]) / 1024
+    return out
+
+
+def worker(model_format: str, hold: bool) -> None:
+    """
+    Un worker de la API en un proceso nuevo: importa app.py, corre el startup y atiende
+    una solicitud. Imprime una línea JSON; con hold espera a que se cierre stdin.
+    """
+    import importlib.util
+
+    t0 = time.perf_counter()
+    spec = importlib.util.spec_from_file_location("app", PROJECT_ROOT / "05_deployment" / "app.py")
+    app = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(app)
+    import_s = time.perf_counter() - t0
+    heavy = [m for m in HEAVY_MODULES if m in sys.modules]
+
+    # TestClient (httpx) se importa después de medir: no es parte de la API
+    import warnings
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        from fastapi.testclient import TestClient
+
+    client = TestClient(app.app)
+    t0 = time.perf_counter()
+    client.__enter__()
+    startup_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    client.post("/predict", json={"features": {"EXT_SOURCE_1": 0.5}}).raise_for_status()
+    first_ms = (time.perf_counter() - t0) * 1000
+
+    # Recorre todo el feature store (como tras muchas consultas a /score) para que sus
+    # páginas cuenten en la memoria del worker
+    if app.store is not None:
+        float(app.store.features.sum(dtype="float64"))
+
+    info = app.serving.bundle.info()
+    print(json.dumps({
+        "format": info["format"],
+        "feature_store_rows": 0 if app.store is None else len(app.store),
+        "import_seconds": import_s,
+        "startup_seconds": startup_s,
+        "model_load_seconds": info["load_seconds"],
+        "first_predict_ms": first_ms,
+        "heavy_modules_after_import": heavy,
+        "heavy_modules_after_startup": [m for m in HEAVY_MODULES if m in sys.modules],
+        **memory_mb(),
+    }), flush=True)
+
+    if hold:
+        sys.stdin.read()
+    client.__exit__(None, None, None)
+
+
+def start_workers(model_format: str, n: int, env: dict) -> list[dict]:
+    """
+    Arranca n workers a la vez (como uvicorn --workers n) y mide su memoria cuando todos
+    están listos, para ver cuánto del modelo comparten.
+    """
+    t0 = time.perf_counter()
+    procs = [
+        subprocess.Popen(
+            [sys.executable, __file__, "--worker", model_format, "--hold"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, env=env,
+        )
+        for _ in range(n)
+    ]
+    results = []
+    for p in procs:
+        line = p.stdout.readline()
+        if not line:
+            raise RuntimeError(f"El worker {model_format} terminó sin responder (código {p.wait()})")
+        results.append({**json.loads(line), "ready_seconds": time.perf_counter() - t0})
+    for p, r in zip(procs, results):
+        r.update(memory_mb(p.pid))
+    for p in procs:
+        p.stdin.close()
+        p.wait()
+    return results
+
+
+def mean(results: list[dict], key: str) -> float:
+    return sum(r[key] for r in results) / len(results)
+
+
+def prepare_shared(registry_dir: Path) -> Path:
+    from src.shared_serving import default_shared_dir, prepare_shared_artifacts
+
+    shared_dir = default_shared_dir()
+    prepare_shared_artifacts(
+        shared_dir,
+        registry_dir,
+        model_path=ARTIFACTS_DIR / "champion_model.joblib",
+        columns_path=ARTIFACTS_DIR / "champion_numeric_cols.joblib",
+        store_dir=ARTIFACTS_DIR / "feature_store",
+        model_X_path=PROCESSED_DIR / "model_X.parquet",
+    )
+    return shared_dir
+
+
+def main():
+    # Solo artefactos sueltos de artifacts/ (sin registro ni recarga en caliente)
+    registry_dir = Path(tempfile.mkdtemp(prefix="bench_cold_start_"))
+    base_env = {
+        **os.environ,
+        "MODEL_REGISTRY_DIR": str(registry_dir),
+        "MODEL_REGISTRY_POLL_S": "0",
+    }
+    paths = {
+        "joblib": ARTIFACTS_DIR / "champion_model.joblib",
+        "compiled": ARTIFACTS_DIR / "champion_model_compiled.npz",
+        "flat": ARTIFACTS_DIR / "champion_model_flat.bin",
+    }
+
+    results = {}
+    for fmt in MODES:
+        shared_dir = None
+        if fmt == "shared":
+            t0 = time.perf_counter()
+            shared_dir = prepare_shared(registry_dir)
+            env = {**base_env, "SHARED_ARTIFACTS_DIR": str(shared_dir)}
+            file_bytes = sum(p.stat().st_size for p in shared_dir.rglob("*") if p.is_file())
+            print(f"shared    prepared once by the parent in {time.perf_counter() - t0:.2f}s ({file_bytes / 1e6:.1f} MB): {shared_dir}")
+        elif paths[fmt].exists():
+            env = {**base_env, "MODEL_FORMAT": fmt}
+            file_bytes = paths[fmt].stat().st_size
+        else:
+            print(f"[skip] {fmt}: {paths[fmt].name} not found (run 05_deployment/export_compiled_model.py)")
+            continue
+
+        # Un worker solo: tiempos de arranque en frío
+        single = subprocess.run(
+            [sys.executable, __file__, "--worker", fmt], capture_output=True, text=True, env=env, check=True,
+        )
+        cold = json.loads(single.stdout.splitlines()[-1])
+
+        # N workers a la vez: memoria por worker
+        workers = start_workers(fmt, N_WORKERS, env)
+        if shared_dir is not None:
+            shutil.rmtree(shared_dir, ignore_errors=True)
+        results[fmt] = {
+            "file_bytes": file_bytes,
+            "cold_start": cold,
+            f"workers_{N_WORKERS}": {
+                "ready_seconds_max": max(r["ready_seconds"] for r in workers),
+                "rss_mb_mean": mean(workers, "rss_mb"),
+                "pss_mb_mean": mean(workers, "pss_mb"),
+                "private_mb_mean": mean(workers, "private_clean_mb") + mean(workers, "private_dirty_mb"),
+            },
+        }
+        w = results[fmt][f"workers_{N_WORKERS}"]
+        print(
+            f"{fmt:9s} import={cold['import_seconds']:.3f}s startup={cold['startup_seconds']:.3f}s "
+            f"(model load {cold['model_load_seconds'] * 1000:.1f} ms) first_predict={cold['first_predict_ms']:.1f} ms | "
+            f"{N_WORKERS} workers: RSS={w['rss_mb_mean']:.1f} MB PSS={w['pss_mb_mean']:.1f} MB private={w['private_mb_mean']:.1f} MB | "
+            f"heavy modules: {cold['heavy_modules_after_startup'] or '-'}"
+        )
+
+    out_path = ARTIFACTS_DIR / "bench_cold_start.json"
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(out_path, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"\n[OK] Benchmark saved to: {out_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Arranque en frío y memoria por worker de la API según el formato del modelo.")
+    parser.add_argument("--worker", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--hold", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        worker(args.worker, args.hold)
+    else:
+        main()
@@ -0,0 +1,164 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import argparse
+import asyncio
+import importlib.util
+import itertools
+import json
+import math
+import os
+import time
+from collections import Counter
+
+import httpx
+import numpy as np
+import pandas as pd
+
+from src.config import ARTIFACTS_DIR, KEYS, PROCESSED_DIR
+
+
+# Clientes concurrentes por endpoint. Con poca carga la cola del micro-batcher suele estar
+# vacía al cambiar de versión: es cuando una solicitud que todavía arma su fila puede
+# encontrarse con el batcher anterior ya cerrado
+N_CLIENTS = 2
+N_SWAPS = 40         # cambios de versión alternando entre las dos últimas del registro
+SWAP_INTERVAL_S = 0.05
+N_CUSTOMERS = 100
+TIMEOUT_S = 30.0
+RANDOM_STATE = 42
+
+
+def load_app():
+    # Sin watcher: los cambios de versión los dispara este script
+    os.environ["MODEL_REGISTRY_POLL_S"] = "0"
+    spec = importlib.util.spec_from_file_location("app", PROJECT_ROOT / "05_deployment" / "app.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def build_requests(columns, ids, with_store: bool) -> dict:
+    """
+    (método, path, body) por endpoint. /predict/raw arma sus filas en el threadpool antes de
+    puntuar: es el caso en que un cambio de versión puede ocurrir en medio de la solicitud.
+    """
+    from benchmarks.bench_predict_raw import build_payloads
+
+    model_X = pd.read_parquet(PROCESSED_DIR / "model_X.parquet").set_index(KEYS["SK_ID_CURR"], drop=False)
+    rows = model_X.loc[ids, list(columns)].to_dict("records")
+    requests = {
+        "/predict": [("POST", "/predict", {"features": {k: float(v) for k, v in r.items() if pd.notna(v) and math.isfinite(v)}}) for r in rows],
+        "/predict/raw": [("POST", "/predict/raw", p) for p in build_payloads(ids)],
+    }
+    if with_store:
+        requests["/score"] = [("GET", f"/score/{int(i)}", None) for i in ids]
+    return requests
+
+
+async def client_loop(client, requests: list, stop: asyncio.Event, statuses: Counter, latencies: list) -> None:
+    for method, path, body in itertools.cycle(requests):
+        if stop.is_set():
+            return
+        t0 = time.perf_counter()
+        try:
+            r = await client.request(method, path, json=body)
+            status = str(r.status_code)
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        latencies.append(time.perf_counter() - t0)
+        statuses[status] += 1
+
+
+async def run(app, versions: list, requests: dict, n_clients: int, n_swaps: int) -> dict:
+    from src.model_registry import activate
+
+    statuses = {name: Counter() for name in requests}
+    latencies = {name: [] for name in requests}
+    stop = asyncio.Event()
+    swaps = 0
+
+    transport = httpx.ASGITransport(app=app.app, raise_app_exceptions=False)
+    async with app.app.router.lifespan_context(app.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://api", timeout=TIMEOUT_S) as client:
+            clients = [
+                asyncio.create_task(client_loop(client, reqs, stop, statuses[name], latencies[name]))
+                for name, reqs in requests.items()
+                for _ in range(n_clients)
+            ]
+            t0 = time.perf_counter()
+            for i in range(n_swaps):
+                await asyncio.sleep(SWAP_INTERVAL_S)
+                activate(app.MODEL_REGISTRY_DIR, versions[(i + 1) % 2])
+                swaps += await app.reload_model()
+            stop.set()
+            await asyncio.gather(*clients)
+            elapsed = time.perf_counter() - t0
+
+    results = {"swaps": swaps, "elapsed_s": elapsed, "endpoints": {}}
+    for name in requests:
+        ms = np.asarray(latencies[name]) * 1000
+        n = sum(statuses[name].values())
+        results["endpoints"][name] = {
+            "requests": n,
+            "errors": n - statuses[name]["200"],
+            "statuses": dict(statuses[name]),
+            "p50_ms": float(np.percentile(ms, 50)),
+            "p99_ms": float(np.percentile(ms, 99)),
+            "max_ms": float(ms.max()),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solicitudes concurrentes a /predict, /score y /predict/raw mientras se cambia la versión activa del modelo.")
+    parser.add_argument("--clients", type=int, default=N_CLIENTS, help="Clientes concurrentes por endpoint")
+    parser.add_argument("--swaps", type=int, default=N_SWAPS)
+    args = parser.parse_args()
+
+    app = load_app()
+    from src.model_registry import activate, read_manifest
+
+    manifest = read_manifest(app.MODEL_REGISTRY_DIR)
+    versions = list(manifest["versions"])[-2:]
+    if len(versions) < 2:
+        print(f"[skip] {app.MODEL_REGISTRY_DIR} needs two published versions (run 05_deployment/publish_model.py twice)")
+        return 1
+
+    activate(app.MODEL_REGISTRY_DIR, versions[0])
+    try:
+        from src.model_registry import load_version
+
+        columns = load_version(app.MODEL_REGISTRY_DIR, versions[0]).columns
+        model_X_ids = pd.read_parquet(PROCESSED_DIR / "model_X.parquet", columns=[KEYS["SK_ID_CURR"]])[KEYS["SK_ID_CURR"]]
+        ids = model_X_ids.sample(n=min(N_CUSTOMERS, len(model_X_ids)), random_state=RANDOM_STATE).to_numpy()
+        requests = build_requests(columns, ids, app.FEATURE_STORE_DIR.exists())
+        results = asyncio.run(run(app, versions, requests, args.clients, args.swaps))
+    finally:
+        # El registro queda con la versión que estaba activa
+        if manifest["active"] is not None:
+            activate(app.MODEL_REGISTRY_DIR, manifest["active"])
+
+    results.update({"versions": versions, "clients_per_endpoint": args.clients, "microbatch": app.MICROBATCH_ENABLED})
+    print(f"Swaps: {results['swaps']} between {versions[0]} and {versions[1]} in {results['elapsed_s']:.1f}s")
+    for name, r in results["endpoints"].items():
+        print(f"{name:14s} requests={r['requests']:6d}  errors={r['errors']:4d}  p50={r['p50_ms']:.2f} ms  p99={r['p99_ms']:.2f} ms  max={r['max_ms']:.1f} ms  {r['statuses']}")
+
+    out_path = ARTIFACTS_DIR / "bench_hot_reload.json"
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(out_path, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n[OK] Benchmark saved to: {out_path}")
+
+    errors = sum(r["errors"] for r in results["endpoints"].values())
+    if errors:
+        print(f"[FAIL] {errors} requests failed during model swaps")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
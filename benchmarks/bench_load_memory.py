@@ -0,0 +1,86 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import json
+import resource
+import subprocess
+import time
+
+from src.config import ARTIFACTS_DIR
+from src.features import FEATURE_GROUPS, table_columns
+from src.io import load_parquet, parquet_columns
+
+
+TABLES = ["bureau_balance", "installments_payments", "pos_cash_balance", "credit_card_balance"]
+
+# Antes: tabla completa + .copy() (como los scripts originales). Después: proyección y tipos compactos.
+MODES = {
+    "full_copy": {},
+    "projected": {},
+    "projected_compact": {"downcast": "integer", "categorical": True, "zero_copy": True},
+    "projected_compact_float32": {"downcast": "all", "categorical": True, "zero_copy": True},
+}
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss viene en KB en Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def worker(table: str, mode: str) -> dict:
+    rss_before = peak_rss_mb()
+    t0 = time.perf_counter()
+
+    if mode == "full_copy":
+        df = load_parquet(table).df.copy()
+    else:
+        available = set(parquet_columns(table))
+        cols = [c for c in table_columns(FEATURE_GROUPS)[table] if c in available]
+        df = load_parquet(table, columns=cols, **MODES[mode]).df
+
+    return {
+        "table": table,
+        "mode": mode,
+        "rows": int(df.shape[0]),
+        "n_columns": int(df.shape[1]),
+        "seconds": time.perf_counter() - t0,
+        "df_memory_mb": float(df.memory_usage(deep=True).sum() / 1e6),
+        "peak_rss_mb": peak_rss_mb(),
+        "peak_rss_delta_mb": peak_rss_mb() - rss_before,
+    }
+
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == "--worker":
+        print(json.dumps(worker(sys.argv[2], sys.argv[3])))
+        return
+
+    # Cada medición en un proceso nuevo: el pico de RSS no se contamina entre modos
+    results = []
+    for table in TABLES:
+        for mode in MODES:
+            out = subprocess.run(
+                [sys.executable, __file__, "--worker", table, mode],
+                check=True, capture_output=True, text=True,
+            )
+            r = json.loads(out.stdout.strip().splitlines()[-1])
+            results.append(r)
+            print(
+                f"{table:24s} {mode:26s} rows={r['rows']:>10d} cols={r['n_columns']:>3d} "
+                f"df={r['df_memory_mb']:9.1f} MB  peak_rss_delta={r['peak_rss_delta_mb']:9.1f} MB  "
+                f"t={r['seconds']:.2f}s"
+            )
+
+    out_path = ARTIFACTS_DIR / "bench_load_memory.json"
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(out_path, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"\n[OK] Benchmark saved to: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
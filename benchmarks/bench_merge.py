@@ -0,0 +1,107 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import json
+import resource
+import subprocess
+import time
+
+import pandas as pd
+
+from src.config import ARTIFACTS_DIR, PROCESSED_DIR
+from src.features import FEATURE_GROUPS, MERGE_METHODS, merge_features
+
+
+
+# Réplicas de base_X (con SK_ID_CURR desplazados) para ver cómo escala cada método
+SCALES = [1, 10, 100]
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss viene en KB en Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def load_inputs(scale: int):
+    base_X = pd.read_parquet(PROCESSED_DIR / "base_X.parquet")
+    feats = [(g.output_name, pd.read_parquet(PROCESSED_DIR / f"{g.output_name}.parquet")) for g in FEATURE_GROUPS]
+    if scale == 1:
+        return base_X, feats
+
+    key = "SK_ID_CURR"
+    offset = int(base_X[key].max()) + 1
+
+    def replicate(df):
+        parts = []
+        for i in range(scale):
+            part = df.copy()
+            part[key] = part[key] + i * offset
+            parts.append(part)
+        return pd.concat(parts, ignore_index=True)
+
+    return replicate(base_X), [(name, replicate(df)) for name, df in feats]
+
+
+def worker(method: str, scale: int) -> dict:
+    base_X, feats = load_inputs(scale)
+    rss_before = peak_rss_mb()
+
+    t0 = time.perf_counter()
+    merged = merge_features(base_X, feats, verbose=False, method=method)
+    seconds = time.perf_counter() - t0
+
+    return {
+        "method": method,
+        "scale": scale,
+        "rows": int(merged.shape[0]),
+        "n_columns": int(merged.shape[1]),
+        "seconds": seconds,
+        "result_memory_mb": float(merged.memory_usage(deep=True).sum() / 1e6),
+        "peak_rss_delta_mb": peak_rss_mb() - rss_before,
+    }
+
+
+def check_parity() -> None:
+    base_X, feats = load_inputs(1)
+    expected = merge_features(base_X, feats, verbose=False, method="pandas")
+    got = merge_features(base_X, feats, verbose=False, method="indexed")
+    pd.testing.assert_frame_equal(expected, got, check_exact=True)
+    print(f"[OK] indexed join identical to pandas merge: shape={got.shape}")
+
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == "--worker":
+        print(json.dumps(worker(sys.argv[2], int(sys.argv[3]))))
+        return
+
+    check_parity()
+
+    # Cada medición en un proceso nuevo: el pico de RSS no se contamina entre métodos
+    results = []
+    for scale in SCALES:
+        for method in MERGE_METHODS:
+            out = subprocess.run(
+                [sys.executable, __file__, "--worker", method, str(scale)],
+                check=True, capture_output=True, text=True,
+            )
+            r = json.loads(out.stdout.strip().splitlines()[-1])
+            results.append(r)
+            print(
+                f"scale={scale:<3d} {method:8s} rows={r['rows']:>9d} cols={r['n_columns']:>4d} "
+                f"result={r['result_memory_mb']:8.1f} MB  peak_rss_delta={r['peak_rss_delta_mb']:8.1f} MB  "
+                f"t={r['seconds']:.3f}s"
+            )
+
+    out_path = ARTIFACTS_DIR / "bench_merge.json"
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(out_path, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"\n[OK] Benchmark saved to: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
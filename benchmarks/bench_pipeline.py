@@ -0,0 +1,234 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+import pyarrow.parquet as pq
+
+from src.config import ARTIFACTS_DIR, FILES, INTERIM_DIR, RAW_DIR
+
+
+# Etapas en orden (cada una lee lo que escribió la anterior)
+PREP_STAGES = [
+    "02_data_preparation/01_build_base.py",
+    "02_data_preparation/02_feature_bureau.py",
+    "02_data_preparation/03_feature_bureau_balance.py",
+    "02_data_preparation/04_feature_previous.py",
+    "02_data_preparation/05_feature_pos_cash.py",
+    "02_data_preparation/06_feature_installments.py",
+    "02_data_preparation/07_feature_credit_card.py",
+    "02_data_preparation/08_merge_all.py",
+    "02_data_preparation/09_split_train_valid_test.py",
+]
+MODEL_STAGES = [
+    "03_modeling/01_train_baseline.py",
+    "03_modeling/02_train_champion.py",
+    "03_modeling/03_compare_models.py",
+    "03_modeling/04_evaluate_on_test.py",
+]
+
+SCALES = [1, 5, 20]
+PROFILE_PATH = INTERIM_DIR / "eda_secondary_key_profiles.json"
+
+# Variables que cambian cómo corre el pipeline (se guardan con los resultados)
+PIPELINE_ENV = ["AGGREGATION_METHOD", "FEATURES_STREAMING", "STREAM_BATCH_ROWS", "FEATURES_WORKERS", "MERGE_METHOD", "PROFILE", "PROFILE_STAGES"]
+
+RAW_TABLES = [name for name in FILES if name != "columns_description"]
+
+
+def snapshot(dirs) -> dict:
+    files = {}
+    for d in dirs:
+        for path in Path(d).rglob("*"):
+            if path.is_file():
+                st = path.stat()
+                files[path] = (st.st_mtime_ns, st.st_size)
+    return files
+
+
+def run_stage(cmd: list, env: dict, log_path: Path, watch_dirs) -> dict:
+    """
+    Corre una etapa en un proceso nuevo. Tiempo de pared, CPU (usuario + sistema) y pico de
+    RSS salen de wait4 (solo de ese proceso); las salidas, de los archivos nuevos o
+    modificados en watch_dirs.
+    """
+    before = snapshot(watch_dirs)
+    t0 = time.perf_counter()
+    with open(log_path, "w") as log:
+        proc = subprocess.Popen(cmd, stdout=log, stderr=subprocess.STDOUT, env=env, cwd=PROJECT_ROOT)
+        _, status, usage = os.wait4(proc.pid, 0)
+    wall = time.perf_counter() - t0
+    proc.returncode = os.waitstatus_to_exitcode(status)
+
+    after = snapshot(watch_dirs)
+    root = Path(os.path.commonpath(watch_dirs))
+    outputs = {
+        str(path.relative_to(root)): size
+        for path, (mtime, size) in after.items()
+        if before.get(path) != (mtime, size)
+    }
+    return {
+        "returncode": proc.returncode,
+        "wall_s": wall,
+        "cpu_user_s": usage.ru_utime,
+        "cpu_sys_s": usage.ru_stime,
+        "peak_rss_mb": usage.ru_maxrss / 1024,
+        "output_bytes": sum(outputs.values()),
+        "outputs": outputs,
+    }
+
+
+def raw_summary(raw_dir: Path) -> dict:
+    out = {}
+    for name in RAW_TABLES:
+        path = raw_dir / FILES[name]
+        if path.exists():
+            out[name] = {"rows": pq.ParquetFile(path).metadata.num_rows, "bytes": path.stat().st_size}
+    return out
+
+
+def run_dataset(name: str, work_dir: Path, scale, stages: list, keep: bool, sorted_keys: bool = False) -> dict:
+    """
+    Todas las etapas sobre un conjunto de datos (scale=None: los parquet reales de data/raw)
+    con data/ y artifacts/ propios en work_dir/name (el cache de artefactos se desactiva).
+    """
+    root = work_dir / name
+    shutil.rmtree(root, ignore_errors=True)
+    data_dir, artifacts_dir, logs_dir = root / "data", root / "artifacts", root / "logs"
+    raw_dir = RAW_DIR if scale is None else data_dir / "raw"
+    for d in (data_dir / "processed", artifacts_dir, logs_dir):
+        d.mkdir(parents=True)
+
+    env = {
+        **os.environ,
+        "DATA_DIR": str(data_dir),
+        "RAW_DIR": str(raw_dir),
+        "ARTIFACTS_DIR": str(artifacts_dir),
+        "ARTIFACT_CACHE": "0",
+    }
+    print(f"\n=== {name} ===")
+
+    results = {"scale": scale, "sorted_keys": sorted_keys if scale is not None else None, "stages": {}}
+    if scale is not None:
+        gen = run_stage(
+            [sys.executable, __file__, "--generate", str(raw_dir), str(scale), str(PROFILE_PATH), str(int(sorted_keys))],
+            env, logs_dir / "00_generate.log", [data_dir],
+        )
+        results["stages"]["00_generate_synthetic"] = gen
+        print(f"{'00_generate_synthetic':34s} wall={gen['wall_s']:8.2f}s  peak_rss={gen['peak_rss_mb']:8.0f} MB")
+        if gen["returncode"] != 0:
+            print(f"[FAIL] generator (see {logs_dir / '00_generate.log'})")
+            return results
+    results["raw"] = raw_summary(raw_dir)
+
+    for script in stages:
+        stage = Path(script).stem
+        r = run_stage([sys.executable, str(PROJECT_ROOT / script)], env, logs_dir / f"{stage}.log", [data_dir / "processed", artifacts_dir])
+        results["stages"][script] = r
+        print(
+            f"{script:48s} wall={r['wall_s']:8.2f}s  cpu={r['cpu_user_s'] + r['cpu_sys_s']:8.2f}s  "
+            f"peak_rss={r['peak_rss_mb']:8.0f} MB  out={r['output_bytes'] / 1e6:9.1f} MB"
+        )
+        if r["returncode"] != 0:
+            print(f"[FAIL] {script} exited with {r['returncode']} (see {logs_dir / (stage + '.log')}); skipping the remaining stages")
+            break
+
+    if not keep:
+        shutil.rmtree(data_dir, ignore_errors=True)
+        shutil.rmtree(artifacts_dir, ignore_errors=True)
+    return results
+
+
+def scaling(datasets: dict) -> dict:
+    """
+    Por etapa, tiempo y pico de RSS de cada escala relativos a la escala sintética más chica,
+    divididos por el factor de escala: ~1 = lineal; >1 = la etapa escala peor que los datos.
+    """
+    synthetic = sorted((d["scale"], name) for name, d in datasets.items() if d["scale"] is not None)
+    if len(synthetic) < 2:
+        return {}
+    base_scale, base_name = synthetic[0]
+    base = datasets[base_name]["stages"]
+    out = {}
+    for script, r0 in base.items():
+        for scale, name in synthetic[1:]:
+            r = datasets[name]["stages"].get(script)
+            if r is None or r["returncode"] != 0 or r0["wall_s"] <= 0:
+                continue
+            factor = scale / base_scale
+            out.setdefault(script, {})[name] = {
+                "time_per_row_vs_base": r["wall_s"] / r0["wall_s"] / factor,
+                "peak_rss_vs_base": r["peak_rss_mb"] / r0["peak_rss_mb"],
+            }
+    return out
+
+
+def git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, capture_output=True, text=True)
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiempo, CPU, pico de RSS y salidas de cada etapa del pipeline, con datos reales y sintéticos.")
+    parser.add_argument("--scales", type=float, nargs="*", default=SCALES, help="Escalas sintéticas (1 = filas del dataset original)")
+    parser.add_argument("--no-real", action="store_true", help="No correr sobre data/raw")
+    parser.add_argument("--skip-modeling", action="store_true", help="Solo 02_data_preparation")
+    parser.add_argument("--work-dir", type=Path, default=Path(tempfile.gettempdir()) / "home_credit_bench_pipeline")
+    parser.add_argument("--keep", action="store_true", help="Conservar los datos generados y las salidas")
+    parser.add_argument("--sorted", action="store_true", help="Datos sintéticos con las tablas hijas ordenadas por key (más optimista que los archivos reales)")
+    parser.add_argument("--generate", nargs=4, metavar=("RAW_DIR", "SCALE", "PROFILE", "SORTED"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.generate:
+        from src.synthetic import generate_raw
+
+        generate_raw(Path(args.generate[0]), float(args.generate[1]), Path(args.generate[2]), sorted_keys=args.generate[3] == "1")
+        return
+
+    stages = PREP_STAGES + ([] if args.skip_modeling else MODEL_STAGES)
+    datasets = {}
+    if not args.no_real and (RAW_DIR / FILES["application"]).exists():
+        datasets["real"] = run_dataset("real", args.work_dir, None, stages, args.keep)
+    elif not args.no_real:
+        print(f"[skip] real: {RAW_DIR / FILES['application']} not found")
+    for scale in args.scales:
+        name = f"synthetic_x{scale:g}"
+        datasets[name] = run_dataset(name, args.work_dir, scale, stages, args.keep, args.sorted)
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "env": {k: os.environ[k] for k in PIPELINE_ENV if k in os.environ},
+        "cpu_count": os.cpu_count(),
+        "datasets": datasets,
+        "scaling": scaling(datasets),
+    }
+
+    if results["scaling"]:
+        print("\nScaling vs smallest synthetic scale (time per row ratio / peak RSS ratio; 1.0 = linear):")
+        for script, by_name in results["scaling"].items():
+            cells = "  ".join(f"{n}: {v['time_per_row_vs_base']:5.2f} / {v['peak_rss_vs_base']:5.2f}" for n, v in by_name.items())
+            print(f"{script:48s} {cells}")
+
+    out_path = ARTIFACTS_DIR / "bench_pipeline.json"
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(out_path, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"\n[OK] Benchmark saved to: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import json
+import time
+import warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from src.config import ARTIFACTS_DIR, PROCESSED_DIR
+from src.scoring import FeatureVectorBuilder
+
+
+N_REQUESTS = 2000
+RANDOM_STATE = 42
+
+warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+
+def pandas_path(model, numeric_cols, features):
+    # Ruta original de /predict (antes del FeatureVectorBuilder)
+    row = pd.DataFrame([features])
+    row = row.reindex(columns=numeric_cols)
+    row = row.replace([np.inf, -np.inf], np.nan)
+    return float(model.predict_proba(row)[:, 1][0])
+
+
+def numpy_path(model, builder, features):
+    return float(model.predict_proba(builder.row(features))[0, 1])
+
+
+def timed(fn, payloads):
+    lat = np.empty(len(payloads))
+    out = np.empty(len(payloads))
+    for i, features in enumerate(payloads):
+        t0 = time.perf_counter()
+        out[i] = fn(features)
+        lat[i] = time.perf_counter() - t0
+    return out, lat
+
+
+def summary(lat):
+    ms = lat * 1000
+    return {
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "mean_ms": float(ms.mean()),
+    }
+
+
+def main():
+    artifacts_dir = ARTIFACTS_DIR
+    data_dir = PROCESSED_DIR
+
+    model = joblib.load(artifacts_dir / "champion_model.joblib")
+    numeric_cols = joblib.load(artifacts_dir / "champion_numeric_cols.joblib")
+    builder = FeatureVectorBuilder(numeric_cols)
+
+    X_test = pd.read_parquet(data_dir / "X_test.parquet", columns=numeric_cols)
+    sample = X_test.sample(n=min(N_REQUESTS, len(X_test)), replace=len(X_test) < N_REQUESTS, random_state=RANDOM_STATE)
+    payloads = [{k: v for k, v in r.items() if pd.notna(v)} for r in sample.to_dict("records")]
+
+    print(f"Payloads: {len(payloads)} x {len(numeric_cols)} features")
+
+    # Calentamiento de ambas rutas
+    for features in payloads[:20]:
+        pandas_path(model, numeric_cols, features)
+        numpy_path(model, builder, features)
+
+    before, lat_before = timed(lambda f: pandas_path(model, numeric_cols, f), payloads)
+    after, lat_after = timed(lambda f: numpy_path(model, builder, f), payloads)
+
+    max_diff = float(np.max(np.abs(before - after)))
+    if max_diff > 1e-12:
+        raise ValueError(f"Las rutas pandas y NumPy no coinciden: max_abs_diff={max_diff}")
+
+    results = {
+        "n_requests": len(payloads),
+        "n_features": len(numeric_cols),
+        "before_pandas": summary(lat_before),
+        "after_numpy": summary(lat_after),
+        "max_abs_diff": max_diff,
+    }
+
+    for name in ["before_pandas", "after_numpy"]:
+        r = results[name]
+        print(f"{name:14s} p50={r['p50_ms']:.3f} ms  p99={r['p99_ms']:.3f} ms  mean={r['mean_ms']:.3f} ms")
+
+    out_path = artifacts_dir / "bench_predict_hotpath.json"
+    with open(out_path, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"\n[OK] Benchmark saved to: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
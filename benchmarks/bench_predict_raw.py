@@ -0,0 +1,158 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import importlib.util
+import json
+import time
+
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+
+from src.config import ARTIFACTS_DIR, KEYS, PROCESSED_DIR, TARGET_COL
+from src.io import load_parquet
+from src.online_features import HISTORY_TABLES, customer_features
+
+
+N_CUSTOMERS = 300
+RANDOM_STATE = 42
+
+
+def load_app():
+    spec = importlib.util.spec_from_file_location("app", PROJECT_ROOT / "05_deployment" / "app.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def records(df: pd.DataFrame, positions) -> list[dict]:
+    # Ida y vuelta por JSON, como llegan a la API (NaN -> null; json.dumps no redondea floats)
+    if positions is None or len(positions) == 0:
+        return []
+    rows = df.iloc[positions].astype(object)
+    return json.loads(json.dumps(rows.where(rows.notna(), None).to_dict("records")))
+
+
+def build_payloads(ids) -> list[dict]:
+    """
+    Payload de /predict/raw de cada cliente a partir de data/raw: su fila de application
+    y todas sus filas de historial.
+    """
+    curr, bureau_key, prev_key = KEYS["SK_ID_CURR"], KEYS["SK_ID_BUREAU"], KEYS["SK_ID_PREV"]
+    app = load_parquet("application").df
+    tables = {t: load_parquet(t).df for t in HISTORY_TABLES}
+    index = {
+        "application": app.groupby(curr).indices,
+        "bureau": tables["bureau"].groupby(curr).indices,
+        "previous_application": tables["previous_application"].groupby(curr).indices,
+        "bureau_balance": tables["bureau_balance"].groupby(bureau_key).indices,
+        **{t: tables[t].groupby(prev_key).indices for t in ("pos_cash_balance", "installments_payments", "credit_card_balance")},
+    }
+
+    def by_keys(table, keys):
+        # Registros en el orden del archivo, como los ve el pipeline batch
+        pos = [index[table][k] for k in keys if k in index[table]]
+        return np.sort(np.concatenate(pos)) if pos else None
+
+    payloads = []
+    for cid in ids:
+        application = records(app.drop(columns=[TARGET_COL], errors="ignore"), index["application"][cid])[0]
+        bureau_pos = index["bureau"].get(cid)
+        prev_pos = index["previous_application"].get(cid)
+        bureau_ids = tables["bureau"][bureau_key].to_numpy()[bureau_pos] if bureau_pos is not None else []
+        prev_ids = tables["previous_application"][prev_key].to_numpy()[prev_pos] if prev_pos is not None else []
+
+        payload = {
+            "application": application,
+            "bureau": records(tables["bureau"], bureau_pos),
+            "previous_application": records(tables["previous_application"], prev_pos),
+            "bureau_balance": records(tables["bureau_balance"], by_keys("bureau_balance", bureau_ids)),
+        }
+        for t in ("pos_cash_balance", "installments_payments", "credit_card_balance"):
+            payload[t] = records(tables[t], by_keys(t, prev_ids))
+        payloads.append(payload)
+    return payloads
+
+
+def summary(lat):
+    ms = np.asarray(lat) * 1000
+    return {
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "mean_ms": float(ms.mean()),
+    }
+
+
+def main():
+    data_dir = PROCESSED_DIR
+    model_X = pd.read_parquet(data_dir / "model_X.parquet")
+    ids = model_X[KEYS["SK_ID_CURR"]].sample(n=min(N_CUSTOMERS, len(model_X)), random_state=RANDOM_STATE).to_numpy()
+    payloads = build_payloads(ids)
+    print(f"Payloads: {len(payloads)} customers, {np.mean([sum(len(p[t]) for t in HISTORY_TABLES) for p in payloads]):.0f} history rows on average")
+
+    app = load_app()
+    with TestClient(app.app) as client:
+        bundle = app.serving.bundle
+        cols = bundle.columns
+        expected_X = bundle.builder.matrix(model_X.set_index(KEYS["SK_ID_CURR"], drop=False).loc[ids].to_dict("records"))
+
+        # 1. Features: idénticas a las de model_X (pipeline batch)
+        feature_lat, mismatches = [], 0
+        for payload, expected in zip(payloads, expected_X):
+            history = {t: payload[t] for t in HISTORY_TABLES}
+            t0 = time.perf_counter()
+            got = bundle.builder.matrix([customer_features(payload["application"], history)])[0]
+            feature_lat.append(time.perf_counter() - t0)
+            same = (got == expected) | (np.isnan(got) & np.isnan(expected))
+            mismatches += int((~same).sum())
+        if mismatches:
+            raise ValueError(f"/predict/raw no reproduce model_X: {mismatches} valores distintos")
+        print(f"[OK] Features identical to model_X for {len(payloads)} customers x {len(cols)} columns")
+
+        # 2. Probabilidades del endpoint = modelo sobre la fila de model_X
+        expected_proba = bundle.model.predict_proba(expected_X)[:, 1]
+        endpoint_lat, proba = [], []
+        for payload in payloads:
+            t0 = time.perf_counter()
+            r = client.post("/predict/raw", json=payload)
+            endpoint_lat.append(time.perf_counter() - t0)
+            r.raise_for_status()
+            proba.append(r.json()["probability_default"])
+        max_diff = float(np.max(np.abs(np.asarray(proba) - expected_proba)))
+        if max_diff > 1e-12:
+            raise ValueError(f"Probabilidades distintas a las del batch: max_abs_diff={max_diff}")
+        print(f"[OK] /predict/raw probabilities match batch scoring: max_abs_diff={max_diff:.1e}")
+
+        # Referencia: /predict con las features ya calculadas (mismo modelo, sin historial)
+        predict_lat = []
+        for row in expected_X:
+            features = {c: float(v) for c, v in zip(cols, row) if not np.isnan(v)}
+            t0 = time.perf_counter()
+            client.post("/predict", json={"features": features}).raise_for_status()
+            predict_lat.append(time.perf_counter() - t0)
+
+    results = {
+        "n_customers": len(payloads),
+        "n_features": len(cols),
+        "feature_computation": summary(feature_lat),
+        "endpoint": summary(endpoint_lat),
+        "predict_endpoint_reference": summary(predict_lat),
+        "max_abs_diff": max_diff,
+    }
+    for name in ["feature_computation", "endpoint", "predict_endpoint_reference"]:
+        r = results[name]
+        print(f"{name:26s} p50={r['p50_ms']:.3f} ms  p99={r['p99_ms']:.3f} ms  mean={r['mean_ms']:.3f} ms")
+
+    out_path = ARTIFACTS_DIR / "bench_predict_raw.json"
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(out_path, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"\n[OK] Benchmark saved to: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
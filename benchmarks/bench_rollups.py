@@ -0,0 +1,99 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.config import ARTIFACTS_DIR, KEYS
+from src.features import FEATURE_GROUPS, aggregate_group, aggregate_group_segments, table_columns
+from src.io import load_parquet, parquet_columns
+
+
+REPEATS = 3
+LOAD_OPTIONS = {"downcast": "integer", "categorical": True, "zero_copy": True}
+
+METHODS = {
+    "groupby": aggregate_group,
+    "segments": aggregate_group_segments,
+}
+
+
+def load_table(table: str, columns: list[str]):
+    available = set(parquet_columns(table))
+    return load_parquet(table, columns=[c for c in columns if c in available], **LOAD_OPTIONS)
+
+
+def max_rel_diff(a: pd.DataFrame, b: pd.DataFrame) -> float:
+    pd.testing.assert_frame_equal(a, b, check_exact=False, rtol=1e-9)
+    num = a.select_dtypes("number").columns
+    x, y = a[num].to_numpy(dtype=np.float64), b[num].to_numpy(dtype=np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rel = np.abs(x - y) / np.maximum(np.abs(x), 1e-300)
+    return float(np.nanmax(rel)) if rel.size else 0.0
+
+
+def main():
+    needed = table_columns(FEATURE_GROUPS)
+    results = []
+
+    for group in FEATURE_GROUPS:
+        res = load_table(group.table, needed[group.table])
+        mapping, dtypes = None, res.original_dtypes
+        if group.mapping_table is not None:
+            m = load_table(group.mapping_table, [group.key, KEYS["SK_ID_CURR"]])
+            mapping = m.df
+            dtypes = {**res.original_dtypes, **m.original_dtypes}
+
+        # Tabla en el orden del archivo y tabla ya ordenada por key (ej: parquet escrito
+        # ordenado): con llaves ordenadas el kernel de tramos se salta el ordenamiento
+        keys = res.df[group.key].to_numpy()
+        stored_sorted = bool(np.all(keys[1:] >= keys[:-1]))
+        inputs = {"stored": res.df, "sorted": res.df.sort_values(group.key, kind="stable", ignore_index=True)}
+        for layout, df in inputs.items():
+            outputs, times = {}, {}
+            for method, fn in METHODS.items():
+                best = float("inf")
+                for _ in range(REPEATS):
+                    t0 = time.perf_counter()
+                    outputs[method] = fn(group, df, mapping, original_dtypes=dtypes)
+                    best = min(best, time.perf_counter() - t0)
+                times[method] = best
+
+            r = {
+                "group": group.name,
+                "table": group.table,
+                "input": layout,
+                "stored_order_sorted": stored_sorted,
+                "rows": int(df.shape[0]),
+                "two_level": group.rollup_aggs is not None,
+                "groupby_seconds": times["groupby"],
+                "segments_seconds": times["segments"],
+                "speedup": times["groupby"] / times["segments"],
+                "max_rel_diff": max_rel_diff(outputs["groupby"], outputs["segments"]),
+            }
+            results.append(r)
+            label = layout + ("*" if layout == "stored" and stored_sorted else "")
+            print(
+                f"{group.name:22s} {label:9s} rows={r['rows']:>10d} groupby={r['groupby_seconds']:.3f}s "
+                f"segments={r['segments_seconds']:.3f}s speedup={r['speedup']:.2f}x max_rel_diff={r['max_rel_diff']:.1e}"
+            )
+        del res, mapping, inputs
+
+    out_path = ARTIFACTS_DIR / "bench_rollups.json"
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(out_path, "w") as f:
+        json.dump(results, f, indent=2)
+
+    if any(r["stored_order_sorted"] for r in results):
+        print("\n* the file is already sorted by key: 'stored' measures the sorted layout")
+    print(f"\n[OK] Benchmark saved to: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import json
+import time
+
+import pandas as pd
+
+from src.config import ARTIFACTS_DIR
+from src.features import build_feature_groups
+from src.pipeline import available_cores
+
+
+def worker_counts() -> list[int]:
+    cores = available_cores()
+    counts = [1, 2, 4, 8, 16]
+    return sorted({c for c in counts if c <= max(cores, 2)} | {cores})
+
+
+def main():
+    baseline = None
+    results = []
+
+    for workers in worker_counts():
+        t0 = time.perf_counter()
+        feats = build_feature_groups(verbose=False, workers=workers)
+        seconds = time.perf_counter() - t0
+
+        if baseline is None:
+            baseline = (feats, seconds)
+        else:
+            for name, df in feats.items():
+                pd.testing.assert_frame_equal(baseline[0][name], df, check_exact=True)
+
+        r = {
+            "workers": workers,
+            "cores": available_cores(),
+            "seconds": seconds,
+            "speedup": baseline[1] / seconds,
+            "identical_to_single_process": True,
+        }
+        results.append(r)
+        print(f"workers={workers:<3d} t={seconds:.2f}s speedup={r['speedup']:.2f}x (identical to 1 worker)")
+
+    out_path = ARTIFACTS_DIR / "bench_sharding.json"
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(out_path, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"\n[OK] Benchmark saved to: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
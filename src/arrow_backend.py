@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import time
+from typing import Iterable, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from .config import KEYS
+from .features import (
+    Agg,
+    BB_STATUS_SEVERITY,
+    FeatureGroup,
+    derive_bureau_balance,
+    derive_credit_card,
+    derive_installments,
+    derive_late_flags,
+    select_groups,
+    table_columns,
+)
+from .io import parquet_columns, raw_path
+
+
+# Funciones de pandas -> agregación de Arrow (mismas semánticas: se ignoran nulos; sum de un
+# grupo vacío = 0; var/std muestrales)
+ARROW_AGGS = {
+    "count": ("count", None),
+    "sum": ("sum", lambda: pc.ScalarAggregateOptions(min_count=0)),
+    "mean": ("mean", None),
+    "min": ("min", None),
+    "max": ("max", None),
+    "var": ("variance", lambda: pc.VarianceOptions(ddof=1)),
+    "std": ("stddev", lambda: pc.VarianceOptions(ddof=1)),
+}
+
+
+# -------------------------------------------------------------------------
+# Columnas derivadas (equivalentes Arrow de las de src/features.py)
+# -------------------------------------------------------------------------
+
+def _set(table: pa.Table, name: str, values) -> pa.Table:
+    i = table.schema.get_field_index(name)
+    return table.set_column(i, name, values) if i >= 0 else table.append_column(name, values)
+
+
+def _flag(condition) -> pa.ChunkedArray:
+    # En pandas, NaN > 0 es False: los nulos cuentan como 0
+    return pc.cast(pc.fill_null(condition, False), pa.int8())
+
+
+def _constant(table: pa.Table, value, type_) -> pa.Array:
+    return pa.repeat(pa.scalar(value, type=type_), table.num_rows)
+
+
+def arrow_bureau_balance(bb: pa.Table) -> pa.Table:
+    if "STATUS" not in bb.column_names:
+        return _set(bb, "status_severity", _constant(bb, 0, pa.int64()))
+    status = pc.cast(bb.column("STATUS"), pa.string())
+    codes = pa.array(list(BB_STATUS_SEVERITY), type=pa.string())
+    severity = pa.array(list(BB_STATUS_SEVERITY.values()), type=pa.int8())
+    values = pc.take(severity, pc.index_in(status, value_set=codes))
+    return _set(bb, "status_severity", pc.fill_null(values, 0))
+
+
+def arrow_late_flags(df: pa.Table) -> pa.Table:
+    if "SK_DPD" not in df.column_names:
+        df = _set(df, "is_late", _constant(df, 0, pa.int64()))
+        return _set(df, "late_days", _constant(df, 0, pa.int64()))
+    dpd = df.column("SK_DPD")
+    df = _set(df, "is_late", _flag(pc.greater(dpd, 0)))
+    return _set(df, "late_days", dpd)
+
+
+def arrow_installments(inst: pa.Table) -> pa.Table:
+    delay = pc.subtract(inst.column("DAYS_ENTRY_PAYMENT"), inst.column("DAYS_INSTALMENT"))
+    inst = _set(inst, "days_delay", delay)
+    inst = _set(inst, "is_late", _flag(pc.greater(delay, 0)))
+    inst = _set(inst, "is_early", _flag(pc.less(delay, 0)))
+
+    if "AMT_INSTALMENT" in inst.column_names and "AMT_PAYMENT" in inst.column_names:
+        return _set(inst, "payment_diff", pc.subtract(inst.column("AMT_PAYMENT"), inst.column("AMT_INSTALMENT")))
+    return _set(inst, "payment_diff", _constant(inst, 0.0, pa.float64()))
+
+
+def arrow_credit_card(cc: pa.Table) -> pa.Table:
+    if "AMT_BALANCE" in cc.column_names and "AMT_CREDIT_LIMIT_ACTUAL" in cc.column_names:
+        # División de floats como pandas (x/0 = inf, 0/0 = NaN -> nulo)
+        utilization = pc.divide(
+            pc.cast(cc.column("AMT_BALANCE"), pa.float64()),
+            pc.cast(cc.column("AMT_CREDIT_LIMIT_ACTUAL"), pa.float64()),
+        )
+        cc = _set(cc, "utilization", utilization)
+    else:
+        cc = _set(cc, "utilization", pa.nulls(cc.num_rows, type=pa.float64()))
+    return arrow_late_flags(cc)
+
+
+# derive de pandas -> equivalente Arrow. Un derive sin equivalente se aplica pasando por pandas.
+ARROW_DERIVE = {
+    derive_bureau_balance: arrow_bureau_balance,
+    derive_late_flags: arrow_late_flags,
+    derive_installments: arrow_installments,
+    derive_credit_card: arrow_credit_card,
+}
+
+
+def derive(group: FeatureGroup, table: pa.Table) -> pa.Table:
+    if group.derive is None:
+        return table
+    fn = ARROW_DERIVE.get(group.derive)
+    if fn is not None:
+        return fn(table)
+    df = group.derive(table.to_pandas())
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+# -------------------------------------------------------------------------
+# Motor
+# -------------------------------------------------------------------------
+
+def read_table(table: str, columns: list[str], not_null: Optional[str] = None) -> pa.Table:
+    """
+    Lee una tabla cruda con proyección (solo columns) y, si not_null, con el filtro
+    "not_null no es nulo" empujado al lector de parquet. Strings como diccionario.
+    """
+    path = raw_path(table)
+    schema = pq.read_schema(path)
+    strings = [c for c in columns if pa.types.is_string(schema.field(c).type) or pa.types.is_large_string(schema.field(c).type)]
+    filters = pc.field(not_null).is_valid() if not_null is not None else None
+    return pq.read_table(path, columns=columns, filters=filters, read_dictionary=strings or None)
+
+
+def _nan_to_null(values):
+    if pa.types.is_floating(values.type):
+        return pc.if_else(pc.is_nan(values), pa.scalar(None, type=values.type), values)
+    return values
+
+
+def group_aggregate(table: pa.Table, key: str, aggs: dict[str, Agg]) -> pa.Table:
+    """
+    groupby(key).agg(**aggs) de pandas en Arrow: filas con key nula descartadas, NaN tratados
+    como nulos, resultado ordenado por key con columnas [key, *aggs].
+    """
+    if table.column(key).null_count > 0:
+        table = table.filter(pc.is_valid(table.column(key)))
+
+    # Columnas de agregación con nombre propio (key puede agregarse sobre sí misma); cada
+    # (columna, función) se calcula una vez aunque varias salidas la usen
+    inputs = {key: table.column(key)}
+    specs, result_of = [], {}
+    for name, (col, func) in aggs.items():
+        if func not in ARROW_AGGS:
+            raise ValueError(f"Función no soportada por el backend arrow: '{func}'. Opciones: {list(ARROW_AGGS)}")
+        source = f"__{col}"
+        inputs.setdefault(source, _nan_to_null(table.column(col)))
+        arrow_func, options = ARROW_AGGS[func]
+        result_of[name] = f"{source}_{arrow_func}"
+        if (source, arrow_func) not in {s[:2] for s in specs}:
+            specs.append((source, arrow_func, options()) if options is not None else (source, arrow_func))
+
+    grouped = pa.table(inputs).group_by(key, use_threads=True).aggregate(specs)
+    out = {key: grouped.column(key)}
+    for name, column in result_of.items():
+        out[name] = grouped.column(column)
+    return pa.table(out).sort_by(key)
+
+
+def aggregate_group_arrow(
+    group: FeatureGroup,
+    table: pa.Table,
+    mapping: Optional[pa.Table] = None,
+) -> pd.DataFrame:
+    """
+    Mismo resultado que features.aggregate_group (mismas columnas y dtypes; las medias
+    pueden diferir en los últimos bits por el orden de suma), calculado con pyarrow.compute.
+
+    El segundo nivel es un left join del mapeo key -> SK_ID_CURR con el primer nivel y otro
+    group_by. Como en el merge de pandas, si alguna key del mapeo no tiene filas los
+    enteros del primer nivel pasan a float64.
+    """
+    curr = KEYS["SK_ID_CURR"]
+    missing = [c for c in group.required if c not in table.column_names]
+    if missing:
+        raise ValueError(f"[{group.table}] faltan columnas requeridas: {missing}")
+
+    table = derive(group, table)
+    aggs = {out: (col, func) for out, (col, func) in group.aggs.items() if col in table.column_names}
+    first = group_aggregate(table, group.key, aggs)
+
+    if group.rollup_aggs is None:
+        out = first
+    else:
+        if mapping is None:
+            raise ValueError(f"[{group.name}] requiere la tabla de mapeo {group.mapping_table}")
+        matched = first.append_column("__matched", _constant(first, True, pa.bool_()))
+        joined = mapping.select([group.key, curr]).join(matched, keys=group.key, join_type="left outer", use_threads=True)
+
+        if joined.column("__matched").null_count > 0:
+            for name in aggs:
+                if pa.types.is_integer(joined.schema.field(name).type):
+                    i = joined.schema.get_field_index(name)
+                    joined = joined.set_column(i, name, pc.cast(joined.column(name), pa.float64()))
+        out = group_aggregate(joined, curr, group.rollup_aggs)
+
+    df = out.to_pandas()
+    if group.finalize is not None:
+        df = group.finalize(df)
+    return df
+
+
+def build_feature_groups_arrow(
+    names: Optional[Iterable[str]] = None,
+    verbose: bool = True,
+) -> dict[str, pd.DataFrame]:
+    """
+    build_feature_groups con el backend arrow: cada tabla cruda se lee una vez como
+    pyarrow.Table (solo las columnas necesarias, sin filas de key nula cuando ninguna tabla
+    de mapeo la necesita) y los grupos se agregan con el group_by multihilo de Arrow, sin
+    pasar por pandas hasta el resultado.
+    """
+    groups = select_groups(names)
+    needed = table_columns(groups)
+    mapping_tables = {g.mapping_table for g in groups if g.mapping_table is not None}
+    tables = sorted(needed, key=lambda t: t not in mapping_tables)
+
+    mappings: dict[str, pa.Table] = {}
+    results: dict[str, pd.DataFrame] = {}
+    for table_name in tables:
+        t0 = time.perf_counter()
+        table_groups = [g for g in groups if g.table == table_name]
+        available = set(parquet_columns(table_name))
+        cols = [c for c in needed[table_name] if c in available]
+
+        # Las tablas de mapeo se leen completas: el merge de pandas conserva sus filas de key nula
+        keys = {g.key for g in table_groups}
+        not_null = next(iter(keys)) if len(keys) == 1 and table_name not in mapping_tables else None
+        table = read_table(table_name, cols, not_null=not_null)
+        if verbose:
+            print(f"Loaded {table_name} (arrow): rows={table.num_rows}, memory={table.nbytes / 1e6:.1f} MB in {time.perf_counter() - t0:.2f}s")
+
+        for g in groups:
+            if g.mapping_table == table_name and g.key not in mappings:
+                mappings[g.key] = table.select([g.key, KEYS["SK_ID_CURR"]])
+
+        for g in table_groups:
+            mapping = mappings.get(g.key) if g.rollup_aggs is not None else None
+            results[g.name] = aggregate_group_arrow(g, table, mapping)
+            if verbose:
+                print(f"Features {g.output_name} (arrow): shape={results[g.name].shape}")
+        del table
+
+    return {g.name: results[g.name] for g in groups}
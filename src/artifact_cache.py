@@ -0,0 +1,355 @@
+from __future__ import annotations
+
+import ast
+import hashlib
+import importlib.util
+import inspect
+import json
+import os
+import shutil
+import sys
+import textwrap
+import time
+import types
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Union
+
+from .config import ARTIFACT_CACHE_DIR, ARTIFACT_CACHE_ENABLED, ARTIFACT_CACHE_MAX_MB, PROCESSED_DIR
+from .io import file_sha256
+from .profiling import span
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin lock entre procesos
+    fcntl = None
+
+
+MANIFEST_PATH = PROCESSED_DIR / "artifact_manifest.json"
+
+CodeRef = Union[Path, Callable]
+
+
+# -------------------------------------------------------------------------
+# Versión de código
+# -------------------------------------------------------------------------
+
+def _code_names(code: types.CodeType) -> set[str]:
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _code_names(const)
+    return names
+
+
+def _is_project_object(obj) -> bool:
+    module = getattr(obj, "__module__", None) or ""
+    return module == "src" or module.startswith("src.")
+
+
+def _local_imports(fn: Callable) -> dict[str, object]:
+    """
+    Objetos importados dentro del cuerpo de fn ("from .sharding import ..." en una función):
+    no están en los globals del módulo, así que se resuelven aparte.
+    """
+    try:
+        tree = ast.parse(textwrap.dedent(inspect.getsource(fn)))
+    except (OSError, SyntaxError):
+        return {}
+    package = fn.__module__.rpartition(".")[0]
+    out = {}
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.ImportFrom):
+            continue
+        module_name = importlib.util.resolve_name("." * node.level + (node.module or ""), package) if node.level else node.module
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError:
+            continue  # dependencia opcional que no está instalada: el código no puede correr
+        for alias in node.names:
+            if hasattr(module, alias.name):
+                out[alias.asname or alias.name] = getattr(module, alias.name)
+    return out
+
+
+def _collect_value(key: str, obj, seen: dict[str, str]) -> None:
+    if obj is None or isinstance(obj, types.ModuleType):
+        return
+    if callable(obj):
+        if _is_project_object(obj) and (inspect.isfunction(obj) or inspect.isclass(obj)):
+            _collect_source(obj, seen)
+        return
+    try:
+        seen[key] = json.dumps(obj, sort_keys=True)
+    except TypeError:
+        pass  # estructuras con objetos (ej: FEATURE_GROUPS) se versionan aparte
+
+
+def _collect_source(fn: Callable, seen: dict[str, str]) -> None:
+    """
+    Código fuente de fn más, recursivamente, el de las funciones/clases de src que usa
+    (también las importadas dentro de la función) y el valor de las constantes simples
+    (dict, tuple, str, números) que referencia o que tiene como valores por defecto.
+    """
+    qualname = f"{fn.__module__}.{fn.__qualname__}"
+    if qualname in seen:
+        return
+    seen[qualname] = inspect.getsource(fn)
+
+    # Los valores por defecto (ej: method=AGGREGATION_METHOD) se evalúan al definir fn
+    for i, value in enumerate(getattr(fn, "__defaults__", None) or ()):
+        _collect_value(f"{qualname}.__defaults__[{i}]", value, seen)
+    for name, value in sorted((getattr(fn, "__kwdefaults__", None) or {}).items()):
+        _collect_value(f"{qualname}.__kwdefaults__[{name}]", value, seen)
+
+    code = getattr(fn, "__code__", None)
+    if code is None:
+        return
+    module_globals = vars(sys.modules[fn.__module__])
+    local_imports = _local_imports(fn)
+    for name in sorted(_code_names(code)):
+        if name in module_globals:
+            _collect_value(f"{fn.__module__}.{name}", module_globals[name], seen)
+        elif name in local_imports:
+            _collect_value(f"{qualname}.{name}", local_imports[name], seen)
+
+
+def code_version(*refs: CodeRef) -> str:
+    """
+    Hash del código que produce un artefacto: archivos (ej: el script) y funciones de src,
+    incluyendo las funciones y constantes de src que éstas usan.
+    """
+    seen: dict[str, str] = {}
+    for ref in refs:
+        if isinstance(ref, Path):
+            seen[f"file:{ref.name}"] = ref.read_text(encoding="utf-8")
+        else:
+            _collect_source(ref, seen)
+    payload = json.dumps(seen, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+# -------------------------------------------------------------------------
+# Cache
+# -------------------------------------------------------------------------
+
+class ArtifactCache:
+    """
+    Cache de artefactos direccionado por contenido.
+
+    La llave de un artefacto es el hash de: el contenido de sus inputs, la versión de código
+    que lo produce y sus parámetros. Cada versión se guarda en <root>/<llave>/ y el manifiesto
+    (artifact_manifest.json, junto a base_metadata.json) registra las versiones, sus tamaños
+    y su último uso. Cuando el cache supera max_bytes se borran las versiones usadas hace
+    más tiempo (LRU).
+
+    Los hashes de archivos se memorizan en el manifiesto por (tamaño, mtime), así que un
+    archivo sin cambios no se vuelve a leer.
+    """
+
+    def __init__(
+        self,
+        root: Path = ARTIFACT_CACHE_DIR,
+        manifest_path: Path = MANIFEST_PATH,
+        max_bytes: int = ARTIFACT_CACHE_MAX_MB * 1024 * 1024,
+    ):
+        self.root = Path(root)
+        self.manifest_path = Path(manifest_path)
+        self.max_bytes = max_bytes
+        self._hashes: dict[str, dict] = {}
+
+    # --- manifiesto -----------------------------------------------------
+
+    @contextmanager
+    def _locked(self):
+        """
+        Lock exclusivo del manifiesto (los scripts de features corren en paralelo).
+        """
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.manifest_path.with_suffix(".lock"), "w") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _read(self) -> dict:
+        if self.manifest_path.exists():
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        return {"entries": {}, "files": {}}
+
+    def _write(self, manifest: dict) -> None:
+        manifest["files"].update(self._hashes)
+        manifest["files"] = {p: v for p, v in manifest["files"].items() if Path(p).exists()}
+        tmp = self.manifest_path.with_suffix(".json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.manifest_path)
+
+    # --- hashes ---------------------------------------------------------
+
+    def file_hash(self, path: Path, memo: Optional[dict] = None) -> str:
+        path = Path(path).resolve()
+        st = path.stat()
+        known = self._hashes.get(str(path)) or (memo or {}).get(str(path))
+        if known and known["size"] == st.st_size and known["mtime_ns"] == st.st_mtime_ns:
+            return known["sha256"]
+        sha = file_sha256(path)
+        self._hashes[str(path)] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": sha}
+        return sha
+
+    def key(self, name: str, inputs: Iterable[Path], code: str, params: Optional[dict] = None) -> str:
+        """
+        Llave del artefacto. Los inputs se identifican por su contenido, no por su ruta o mtime.
+        """
+        memo = self._read()["files"]
+        payload = {
+            "name": name,
+            "inputs": [self.file_hash(p, memo) for p in inputs],
+            "code": code,
+            "params": params or {},
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+    # --- restore / store -------------------------------------------------
+
+    def restore(self, key: str, outputs: list[Path]) -> bool:
+        """
+        Si la versión `key` está en el cache, deja sus archivos en outputs y devuelve True.
+        Los outputs que ya tienen el contenido correcto no se reescriben (conservan su mtime).
+        """
+        with self._locked():
+            manifest = self._read()
+            entry = manifest["entries"].get(key)
+            if entry is None:
+                return False
+
+            obj_dir = self.root / key
+            if sorted(entry["files"]) != sorted(p.name for p in outputs) or not all(
+                (obj_dir / n).exists() for n in entry["files"]
+            ):
+                self._evict(manifest, [key])
+                self._write(manifest)
+                return False
+
+            for out in outputs:
+                if out.exists() and self.file_hash(out, manifest["files"]) == entry["files"][out.name]:
+                    continue
+                out.parent.mkdir(parents=True, exist_ok=True)
+                tmp = out.with_name(f".{out.name}.tmp")
+                shutil.copy2(obj_dir / out.name, tmp)
+                os.replace(tmp, out)
+
+            entry["last_used"] = time.time()
+            self._enforce_budget(manifest, keep=key)
+            self._write(manifest)
+            return True
+
+    def store(self, name: str, key: str, outputs: list[Path]) -> None:
+        """
+        Copia los outputs recién construidos al cache como versión `key` y aplica el
+        presupuesto de disco.
+        """
+        files = {p.name: self.file_hash(p) for p in outputs}
+
+        tmp_dir = self.root / f".{key}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir(parents=True)
+        for p in outputs:
+            shutil.copy2(p, tmp_dir / p.name)
+
+        with self._locked():
+            manifest = self._read()
+            obj_dir = self.root / key
+            shutil.rmtree(obj_dir, ignore_errors=True)
+            os.replace(tmp_dir, obj_dir)
+
+            now = time.time()
+            manifest["entries"][key] = {
+                "name": name,
+                "files": files,
+                "bytes": sum(p.stat().st_size for p in outputs),
+                "created": now,
+                "last_used": now,
+            }
+            self._enforce_budget(manifest, keep=key)
+            self._write(manifest)
+
+    # --- evicción -------------------------------------------------------
+
+    def _evict(self, manifest: dict, keys: Iterable[str]) -> None:
+        for key in keys:
+            manifest["entries"].pop(key, None)
+            shutil.rmtree(self.root / key, ignore_errors=True)
+
+    def _enforce_budget(self, manifest: dict, keep: Optional[str] = None) -> list[str]:
+        """
+        Borra versiones por último uso (la más antigua primero) hasta quedar bajo max_bytes.
+        `keep` (la versión recién guardada) nunca se borra.
+        """
+        entries = manifest["entries"]
+        total = sum(e["bytes"] for e in entries.values())
+        evicted = []
+        for key in sorted(entries, key=lambda k: entries[k]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            total -= entries[key]["bytes"]
+            evicted.append(key)
+        self._evict(manifest, evicted)
+        return evicted
+
+    def usage(self) -> dict:
+        """
+        Resumen del cache: versiones por artefacto y bytes totales.
+        """
+        entries = self._read()["entries"]
+        by_name: dict[str, int] = {}
+        for e in entries.values():
+            by_name[e["name"]] = by_name.get(e["name"], 0) + 1
+        return {
+            "versions": len(entries),
+            "bytes": sum(e["bytes"] for e in entries.values()),
+            "max_bytes": self.max_bytes,
+            "versions_by_name": by_name,
+        }
+
+
+def cached_build(
+    name: str,
+    inputs: Iterable[Path],
+    outputs: Iterable[Path],
+    build: Callable[[], object],
+    code: Iterable[CodeRef] = (),
+    params: Optional[dict] = None,
+    cache: Optional[ArtifactCache] = None,
+) -> bool:
+    """
+    Construye outputs con build() salvo que la misma versión (inputs + código + parámetros)
+    ya esté en el cache; en ese caso los restaura. Devuelve True si vinieron del cache.
+
+    Con ARTIFACT_CACHE=0 siempre se construye y no se usa el cache.
+    """
+    outputs = [Path(p) for p in outputs]
+    if not ARTIFACT_CACHE_ENABLED:
+        build()
+        return False
+
+    cache = cache or ArtifactCache()
+    # Hash de inputs + restauración: en una reconstrucción sin cambios es todo lo que corre
+    with span("cache", artifact=name) as s:
+        key = cache.key(name, [Path(p) for p in inputs], code_version(*code), params)
+        s["hit"] = cache.restore(key, outputs)
+    if s["hit"]:
+        return True
+
+    build()
+    missing = [str(p) for p in outputs if not p.exists()]
+    if missing:
+        raise FileNotFoundError(f"[{name}] la construcción no generó: {missing}")
+    cache.store(name, key, outputs)
+    return False
@@ -1,14 +1,17 @@
+import os
 from pathlib import Path
 
 # Root del proyecto = carpeta donde está este archivo /src/config.py
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 
-DATA_DIR = PROJECT_ROOT / "data"
-RAW_DIR = DATA_DIR / "raw"
+# DATA_DIR / RAW_DIR / ARTIFACTS_DIR se pueden cambiar por variable de entorno para correr el
+# pipeline sobre otro conjunto de datos sin tocar data/ (ej. benchmarks/bench_pipeline.py)
+DATA_DIR = Path(os.environ.get("DATA_DIR", str(PROJECT_ROOT / "data")))
+RAW_DIR = Path(os.environ.get("RAW_DIR", str(DATA_DIR / "raw")))
 INTERIM_DIR = DATA_DIR / "interim"
 PROCESSED_DIR = DATA_DIR / "processed"
 
-ARTIFACTS_DIR = PROJECT_ROOT / "artifacts"
+ARTIFACTS_DIR = Path(os.environ.get("ARTIFACTS_DIR", str(PROJECT_ROOT / "artifacts")))
 
 # Nombres de archivos esperados (ajusta solo si tus nombres difieren)
 FILES = {
@@ -30,4 +33,40 @@ KEYS = {
 }
 
 # Target (si tu application lo trae; si no, se ignora)
-TARGET_COL = "TARGET"
\ No newline at end of file
+TARGET_COL = "TARGET"
+
+# Agregación por bloques (streaming) de las tablas grandes en src/features.py
+# (FEATURES_STREAMING=1); la memoria queda acotada por STREAM_BATCH_ROWS filas por bloque.
+FEATURES_STREAMING = os.environ.get("FEATURES_STREAMING", "0") == "1"
+STREAM_BATCH_ROWS = int(os.environ.get("STREAM_BATCH_ROWS", "1000000"))
+
+# Agregación de las tablas cargadas completas en src/features.py: "groupby" (pandas),
+# "segments" (un ordenamiento + reducciones por tramos con NumPy, src/segments.py) o
+# "arrow" (group_by/join multihilo de pyarrow.compute sobre los parquet, src/arrow_backend.py)
+AGGREGATION_METHOD = os.environ.get("AGGREGATION_METHOD", "groupby")
+
+# Procesos para calcular los grupos de features particionados por SK_ID_CURR (src/sharding.py);
+# 1 = un solo proceso. Las particiones se escriben en FEATURES_SHARD_DIR (memoria compartida
+# /dev/shm si existe).
+FEATURES_WORKERS = int(os.environ.get("FEATURES_WORKERS", "1"))
+FEATURES_SHARD_DIR = os.environ.get("FEATURES_SHARD_DIR", "/dev/shm" if Path("/dev/shm").is_dir() else "")
+
+# Join de los feat_* sobre base_X en src/features.merge_features: "indexed" (posiciones por
+# searchsorted sobre una matriz preasignada) o "pandas" (cadena de DataFrame.merge)
+MERGE_METHOD = os.environ.get("MERGE_METHOD", "indexed")
+
+# Cache de artefactos procesados (src/artifact_cache.py): versiones de feat_*, model_* y
+# splits por contenido de inputs + código + parámetros. ARTIFACT_CACHE=0 lo desactiva.
+ARTIFACT_CACHE_ENABLED = os.environ.get("ARTIFACT_CACHE", "1") == "1"
+ARTIFACT_CACHE_DIR = Path(os.environ.get("ARTIFACT_CACHE_DIR", str(PROCESSED_DIR / ".artifact_cache")))
+ARTIFACT_CACHE_MAX_MB = int(os.environ.get("ARTIFACT_CACHE_MAX_MB", "4096"))
+
+# Perfilado por etapa (src/profiling.py): cada script de 02_data_preparation y 03_modeling
+# agrega a PROFILE_LOG (JSON lines) un span por paso (load, derive, aggregate, merge, write,
+# fit, ...) con tiempo, CPU y memoria; PROFILE=0 lo desactiva. PROFILE_STAGES=01_build_base,...
+# (o "all") guarda además cProfile y tracemalloc de esas etapas en PROFILE_DIR.
+PROFILE_ENABLED = os.environ.get("PROFILE", "1") == "1"
+PROFILE_DIR = Path(os.environ.get("PROFILE_DIR", str(ARTIFACTS_DIR / "profiling")))
+PROFILE_LOG = Path(os.environ.get("PROFILE_LOG", str(PROFILE_DIR / "spans.jsonl")))
+PROFILE_STAGES = [s for s in os.environ.get("PROFILE_STAGES", "").split(",") if s]
+PROFILE_TOOLS = [s for s in os.environ.get("PROFILE_TOOLS", "cprofile,tracemalloc").split(",") if s]
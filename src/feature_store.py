@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Sequence
+
+import numpy as np
+
+from .config import KEYS
+
+if TYPE_CHECKING:
+    # Solo para build_feature_store; la API carga el store sin importar pandas
+    import pandas as pd
+
+
+IDS_FILE = "ids.npy"
+FEATURES_FILE = "features.npy"
+META_FILE = "feature_store.json"
+
+
+@dataclass(frozen=True)
+class FeatureStore:
+    """
+    Features por cliente en formato de solo lectura: ids ordenados + matriz por filas.
+
+    ids[i] es el SK_ID_CURR de la fila i de features (n_clientes, n_features), con las
+    columnas en el orden del modelo. La matriz es row-major (C-contiguous): el vector de
+    un cliente son n_features valores contiguos, una sola lectura por /score. Ambos arrays se abren con memory-map, así que
+    cargar el store no lee la matriz completa y varios procesos comparten las páginas.
+    """
+    columns: tuple[str, ...]
+    ids: np.ndarray
+    features: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.ids.shape[0])
+
+    def position(self, sk_id_curr: int) -> Optional[int]:
+        """
+        Fila del cliente (búsqueda binaria, O(log n)) o None si no existe.
+        """
+        i = int(np.searchsorted(self.ids, sk_id_curr))
+        if i < self.ids.shape[0] and self.ids[i] == sk_id_curr:
+            return i
+        return None
+
+    def get(self, sk_id_curr: int) -> Optional[np.ndarray]:
+        """
+        Vector float64 (n_features,) listo para el modelo, o None si el cliente no existe.
+        """
+        i = self.position(sk_id_curr)
+        if i is None:
+            return None
+        return self.features[i].astype(np.float64)
+
+    @classmethod
+    def load(cls, store_dir: Path, mmap: bool = True) -> "FeatureStore":
+        with open(store_dir / META_FILE) as f:
+            meta = json.load(f)
+        mode = "r" if mmap else None
+        return cls(
+            columns=tuple(meta["columns"]),
+            ids=np.load(store_dir / IDS_FILE, mmap_mode=mode),
+            features=np.load(store_dir / FEATURES_FILE, mmap_mode=mode),
+        )
+
+
+def build_feature_store(
+    model_X: pd.DataFrame,
+    columns: Sequence[str],
+    store_dir: Path,
+    dtype: str = "float32",
+) -> FeatureStore:
+    """
+    Escribe el store a partir de model_X (una fila por SK_ID_CURR).
+
+    Los inf se guardan como NaN (igual que en la API). Con dtype float32 la matriz ocupa
+    la mitad de memoria; los valores se convierten a float64 al consultarlos.
+    """
+    key = KEYS["SK_ID_CURR"]
+    if key not in model_X.columns:
+        raise ValueError(f"[model_X] falta la columna {key}")
+
+    ids = model_X[key].to_numpy(dtype=np.int64)
+    if np.unique(ids).shape[0] != ids.shape[0]:
+        raise ValueError(f"[model_X] {key} duplicados; el store requiere una fila por cliente")
+
+    order = np.argsort(ids, kind="stable")
+
+    features = model_X.reindex(columns=list(columns)).to_numpy(dtype=np.float64, na_value=np.nan)
+    features[np.isinf(features)] = np.nan
+
+    store_dir.mkdir(parents=True, exist_ok=True)
+    np.save(store_dir / IDS_FILE, ids[order])
+    np.save(store_dir / FEATURES_FILE, np.ascontiguousarray(features[order], dtype=dtype))
+
+    meta = {
+        "key": key,
+        "rows": int(ids.shape[0]),
+        "n_features": len(columns),
+        "dtype": dtype,
+        "columns": list(columns),
+    }
+    with open(store_dir / META_FILE, "w") as f:
+        json.dump(meta, f, indent=2)
+
+    return FeatureStore.load(store_dir)
@@ -0,0 +1,846 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from .artifact_cache import cached_build
+from .config import AGGREGATION_METHOD, FEATURES_STREAMING, FEATURES_WORKERS, KEYS, MERGE_METHOD, PROCESSED_DIR, STREAM_BATCH_ROWS
+from .io import LoadResult, iter_parquet_batches, load_parquet, parquet_columns, raw_path, require_columns
+from .profiling import span
+from .segments import Segments, scatter, sort_order
+from .streaming import stream_aggregate
+
+
+# (columna, función de agregación de pandas)
+Agg = tuple[str, str]
+
+# Llave de primer nivel -> tabla que la mapea a SK_ID_CURR
+MAPPING_TABLES = {
+    KEYS["SK_ID_BUREAU"]: "bureau",
+    KEYS["SK_ID_PREV"]: "previous_application",
+}
+
+
+@dataclass(frozen=True)
+class FeatureGroup:
+    """
+    Especificación de un grupo de features (un feat_<name>.parquet, una fila por SK_ID_CURR).
+
+    - table: tabla cruda de origen (nombre lógico de config.FILES).
+    - columns: columnas a leer; las que no existan en el archivo se ignoran.
+    - derive: agrega columnas derivadas al DataFrame cargado (puede modificarlo en el lugar).
+    - key / aggs: primer nivel, groupby(key) con agregaciones nombradas {salida: (col, func)}.
+      Las agregaciones cuya columna no existe se omiten.
+    - rollup_aggs: segundo nivel opcional. El resultado por key se une (left) a la tabla de
+      mapeo key -> SK_ID_CURR y se agrega por SK_ID_CURR.
+    - finalize: columnas calculadas sobre el resultado final.
+    """
+    name: str
+    table: str
+    columns: tuple[str, ...]
+    required: tuple[str, ...]
+    key: str
+    aggs: dict[str, Agg]
+    derive: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None
+    rollup_aggs: Optional[dict[str, Agg]] = None
+    finalize: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None
+
+    @property
+    def output_name(self) -> str:
+        return f"feat_{self.name}"
+
+    @property
+    def mapping_table(self) -> Optional[str]:
+        return MAPPING_TABLES[self.key] if self.rollup_aggs is not None else None
+
+
+# -------------------------------------------------------------------------
+# Columnas derivadas
+# -------------------------------------------------------------------------
+
+BB_STATUS_SEVERITY = {
+    "C": 0,
+    "X": 0,
+    "0": 0,
+    "1": 1,
+    "2": 2,
+    "3": 3,
+    "4": 4,
+    "5": 5,
+}
+
+
+def derive_bureau_balance(bb: pd.DataFrame) -> pd.DataFrame:
+    if "STATUS" in bb.columns:
+        # STATUS categórico: map puede devolver otro categórico (ej: un bloque vacío), que no acepta fillna(0)
+        bb["status_severity"] = bb["STATUS"].map(BB_STATUS_SEVERITY).astype("float64").fillna(0).astype("int8")
+    else:
+        bb["status_severity"] = 0
+    return bb
+
+
+def derive_late_flags(df: pd.DataFrame) -> pd.DataFrame:
+    if "SK_DPD" in df.columns:
+        df["is_late"] = (df["SK_DPD"] > 0).astype("int8")
+        df["late_days"] = df["SK_DPD"]
+    else:
+        df["is_late"] = 0
+        df["late_days"] = 0
+    return df
+
+
+def derive_installments(inst: pd.DataFrame) -> pd.DataFrame:
+    inst["days_delay"] = inst["DAYS_ENTRY_PAYMENT"] - inst["DAYS_INSTALMENT"]
+    inst["is_late"] = (inst["days_delay"] > 0).astype("int8")
+    inst["is_early"] = (inst["days_delay"] < 0).astype("int8")
+
+    if "AMT_INSTALMENT" in inst.columns and "AMT_PAYMENT" in inst.columns:
+        inst["payment_diff"] = inst["AMT_PAYMENT"] - inst["AMT_INSTALMENT"]
+    else:
+        inst["payment_diff"] = 0.0
+    return inst
+
+
+def derive_credit_card(cc: pd.DataFrame) -> pd.DataFrame:
+    if "AMT_BALANCE" in cc.columns and "AMT_CREDIT_LIMIT_ACTUAL" in cc.columns:
+        cc["utilization"] = cc["AMT_BALANCE"] / cc["AMT_CREDIT_LIMIT_ACTUAL"]
+    else:
+        cc["utilization"] = np.nan
+    return derive_late_flags(cc)
+
+
+def finalize_bureau(bureau_agg: pd.DataFrame) -> pd.DataFrame:
+    if (
+        "bureau_AMT_CREDIT_SUM_DEBT_sum" in bureau_agg.columns
+        and "bureau_AMT_CREDIT_SUM_sum" in bureau_agg.columns
+    ):
+        bureau_agg["bureau_debt_to_credit_ratio"] = (
+            bureau_agg["bureau_AMT_CREDIT_SUM_DEBT_sum"]
+            / bureau_agg["bureau_AMT_CREDIT_SUM_sum"]
+        )
+    return bureau_agg
+
+
+# -------------------------------------------------------------------------
+# Especificaciones (mismo orden que el merge de 08_merge_all.py)
+# -------------------------------------------------------------------------
+
+BUREAU_NUMERIC = (
+    "AMT_CREDIT_SUM",
+    "AMT_CREDIT_SUM_DEBT",
+    "AMT_CREDIT_SUM_OVERDUE",
+    "AMT_CREDIT_MAX_OVERDUE",
+    "DAYS_CREDIT",
+    "DAYS_CREDIT_ENDDATE",
+)
+
+PREVIOUS_NUMERIC = (
+    "AMT_APPLICATION",
+    "AMT_CREDIT",
+    "DAYS_DECISION",
+)
+
+FEATURE_GROUPS = (
+    FeatureGroup(
+        name="bureau",
+        table="bureau",
+        columns=(KEYS["SK_ID_CURR"],) + BUREAU_NUMERIC,
+        required=(KEYS["SK_ID_CURR"],),
+        key=KEYS["SK_ID_CURR"],
+        aggs={
+            **{
+                f"bureau_{c}_{stat}": (c, stat)
+                for c in BUREAU_NUMERIC
+                for stat in ("mean", "max", "sum")
+            },
+            "bureau_credit_count": (KEYS["SK_ID_CURR"], "count"),
+        },
+        finalize=finalize_bureau,
+    ),
+    FeatureGroup(
+        name="bureau_balance",
+        table="bureau_balance",
+        columns=(KEYS["SK_ID_BUREAU"], "MONTHS_BALANCE", "STATUS"),
+        required=(KEYS["SK_ID_BUREAU"], "MONTHS_BALANCE"),
+        key=KEYS["SK_ID_BUREAU"],
+        derive=derive_bureau_balance,
+        aggs={
+            "bb_months_count": ("MONTHS_BALANCE", "count"),
+            "bb_months_min": ("MONTHS_BALANCE", "min"),
+            "bb_months_max": ("MONTHS_BALANCE", "max"),
+            "bb_status_max": ("status_severity", "max"),
+            "bb_status_mean": ("status_severity", "mean"),
+        },
+        rollup_aggs={
+            "bb_credits_count": ("bb_months_count", "count"),
+            "bb_status_max": ("bb_status_max", "max"),
+            "bb_status_mean": ("bb_status_mean", "mean"),
+            "bb_months_min": ("bb_months_min", "min"),
+            "bb_months_max": ("bb_months_max", "max"),
+        },
+    ),
+    FeatureGroup(
+        name="previous_application",
+        table="previous_application",
+        columns=(KEYS["SK_ID_CURR"], KEYS["SK_ID_PREV"]) + PREVIOUS_NUMERIC,
+        required=(KEYS["SK_ID_CURR"], KEYS["SK_ID_PREV"]),
+        key=KEYS["SK_ID_CURR"],
+        aggs={
+            **{
+                f"prev_{c}_{stat}": (c, stat)
+                for c in PREVIOUS_NUMERIC
+                for stat in ("mean", "max", "sum")
+            },
+            "prev_app_count": (KEYS["SK_ID_PREV"], "count"),
+        },
+    ),
+    FeatureGroup(
+        name="pos_cash",
+        table="pos_cash_balance",
+        columns=(KEYS["SK_ID_PREV"], "MONTHS_BALANCE", "SK_DPD"),
+        required=(KEYS["SK_ID_PREV"], "MONTHS_BALANCE"),
+        key=KEYS["SK_ID_PREV"],
+        derive=derive_late_flags,
+        aggs={
+            "pos_months_count": ("MONTHS_BALANCE", "count"),
+            "pos_months_min": ("MONTHS_BALANCE", "min"),
+            "pos_months_max": ("MONTHS_BALANCE", "max"),
+            "pos_late_ratio": ("is_late", "mean"),
+            "pos_late_days_max": ("late_days", "max"),
+        },
+        rollup_aggs={
+            "pos_prev_count": ("pos_months_count", "count"),
+            "pos_late_ratio": ("pos_late_ratio", "mean"),
+            "pos_late_days_max": ("pos_late_days_max", "max"),
+            "pos_months_min": ("pos_months_min", "min"),
+            "pos_months_max": ("pos_months_max", "max"),
+        },
+    ),
+    FeatureGroup(
+        name="installments",
+        table="installments_payments",
+        columns=(
+            KEYS["SK_ID_PREV"],
+            "DAYS_INSTALMENT",
+            "DAYS_ENTRY_PAYMENT",
+            "AMT_INSTALMENT",
+            "AMT_PAYMENT",
+        ),
+        required=(KEYS["SK_ID_PREV"], "DAYS_INSTALMENT", "DAYS_ENTRY_PAYMENT"),
+        key=KEYS["SK_ID_PREV"],
+        derive=derive_installments,
+        aggs={
+            "inst_count": ("days_delay", "count"),
+            "inst_late_ratio": ("is_late", "mean"),
+            "inst_late_days_max": ("days_delay", "max"),
+            "inst_late_days_mean": ("days_delay", "mean"),
+            "inst_payment_diff_mean": ("payment_diff", "mean"),
+        },
+        rollup_aggs={
+            "inst_prev_count": ("inst_count", "count"),
+            "inst_late_ratio": ("inst_late_ratio", "mean"),
+            "inst_late_days_max": ("inst_late_days_max", "max"),
+            "inst_late_days_mean": ("inst_late_days_mean", "mean"),
+            "inst_payment_diff_mean": ("inst_payment_diff_mean", "mean"),
+        },
+    ),
+    FeatureGroup(
+        name="credit_card",
+        table="credit_card_balance",
+        columns=(
+            KEYS["SK_ID_PREV"],
+            "MONTHS_BALANCE",
+            "AMT_BALANCE",
+            "AMT_CREDIT_LIMIT_ACTUAL",
+            "SK_DPD",
+        ),
+        required=(KEYS["SK_ID_PREV"], "MONTHS_BALANCE"),
+        key=KEYS["SK_ID_PREV"],
+        derive=derive_credit_card,
+        aggs={
+            "cc_months_count": ("MONTHS_BALANCE", "count"),
+            "cc_utilization_mean": ("utilization", "mean"),
+            "cc_utilization_max": ("utilization", "max"),
+            "cc_late_ratio": ("is_late", "mean"),
+            "cc_late_days_max": ("late_days", "max"),
+        },
+        rollup_aggs={
+            "cc_prev_count": ("cc_months_count", "count"),
+            "cc_utilization_mean": ("cc_utilization_mean", "mean"),
+            "cc_utilization_max": ("cc_utilization_max", "max"),
+            "cc_late_ratio": ("cc_late_ratio", "mean"),
+            "cc_late_days_max": ("cc_late_days_max", "max"),
+        },
+    ),
+)
+
+FEATURE_GROUPS_BY_NAME = {g.name: g for g in FEATURE_GROUPS}
+
+
+# -------------------------------------------------------------------------
+# Motor
+# -------------------------------------------------------------------------
+
+def select_groups(names: Optional[Iterable[str]] = None) -> list[FeatureGroup]:
+    if names is None:
+        return list(FEATURE_GROUPS)
+    names = list(names)
+    unknown = [n for n in names if n not in FEATURE_GROUPS_BY_NAME]
+    if unknown:
+        raise KeyError(f"Grupos desconocidos: {unknown}. Opciones: {list(FEATURE_GROUPS_BY_NAME)}")
+    return [FEATURE_GROUPS_BY_NAME[n] for n in names]
+
+
+def table_columns(groups: Iterable[FeatureGroup]) -> dict[str, list[str]]:
+    """
+    Columnas a leer por tabla (unión de todos los grupos + llaves de las tablas de mapeo).
+    """
+    needed: dict[str, dict[str, None]] = {}
+    for g in groups:
+        cols = needed.setdefault(g.table, {})
+        cols.update(dict.fromkeys(g.columns + g.required + (g.key,)))
+        if g.mapping_table is not None:
+            needed.setdefault(g.mapping_table, {}).update(dict.fromkeys((g.key, KEYS["SK_ID_CURR"])))
+    return {table: list(cols) for table, cols in needed.items()}
+
+
+def restore_dtypes(out: pd.DataFrame, sources: dict[str, str], original_dtypes: dict[str, str]) -> pd.DataFrame:
+    """
+    Devuelve a su tipo original las columnas enteras calculadas sobre columnas reducidas
+    por load_parquet(downcast=...), para que el schema de feat_*.parquet no dependa del
+    downcast. sources: columna de salida -> columna de origen.
+    """
+    for out_col, src_col in sources.items():
+        target = original_dtypes.get(src_col)
+        if target is None or out_col not in out.columns:
+            continue
+        if pd.api.types.is_integer_dtype(out[out_col]) and out[out_col].dtype != target:
+            out[out_col] = out[out_col].astype(target)
+    return out
+
+
+def first_level(
+    group: FeatureGroup,
+    df: pd.DataFrame,
+    original_dtypes: Optional[dict[str, str]] = None,
+) -> pd.DataFrame:
+    """
+    Primer nivel de un grupo: derivadas + groupby(key).agg(**aggs) sobre la tabla cargada.
+    """
+    require_columns(df, group.required, df_name=group.table)
+
+    if group.derive is not None:
+        with span("derive", group=group.name):
+            df = group.derive(df)
+
+    aggs = {out: (col, func) for out, (col, func) in group.aggs.items() if col in df.columns}
+    with span("aggregate", group=group.name, level=1, rows_in=df.shape[0]) as s:
+        first = df.groupby(group.key).agg(**aggs).reset_index()
+        s["rows"] = first.shape[0]
+    return restore_dtypes(
+        first,
+        {out: col for out, (col, func) in aggs.items() if func in ("min", "max", "sum")},
+        original_dtypes or {},
+    )
+
+
+def first_level_streaming(group: FeatureGroup, batch_size: int) -> pd.DataFrame:
+    """
+    Igual que first_level, pero leyendo la tabla por bloques de batch_size filas y
+    combinando agregados parciales (ver src/streaming.py). La tabla nunca está completa
+    en memoria.
+    """
+    available = set(parquet_columns(group.table))
+    missing = [c for c in group.required if c not in available]
+    if missing:
+        raise ValueError(f"[{group.table}] faltan columnas requeridas: {missing}")
+
+    cols = [c for c in dict.fromkeys(group.columns + group.required + (group.key,)) if c in available]
+    batches = iter_parquet_batches(group.table, columns=cols, batch_size=batch_size, categorical=True)
+    return stream_aggregate(batches, group.key, group.aggs, derive=group.derive)
+
+
+def rollup(
+    group: FeatureGroup,
+    first: pd.DataFrame,
+    mapping: Optional[pd.DataFrame] = None,
+    original_dtypes: Optional[dict[str, str]] = None,
+) -> pd.DataFrame:
+    """
+    Segundo nivel (si el grupo lo tiene) y columnas finales: una fila por SK_ID_CURR.
+    """
+    if group.rollup_aggs is None:
+        out = first
+    else:
+        if mapping is None:
+            raise ValueError(f"[{group.name}] requiere la tabla de mapeo {group.mapping_table}")
+        require_columns(mapping, [group.key, KEYS["SK_ID_CURR"]], df_name=group.mapping_table)
+
+        with span("merge", group=group.name, on=group.key):
+            merged = mapping.merge(first, on=group.key, how="left")
+        with span("aggregate", group=group.name, level=2, rows_in=merged.shape[0]) as s:
+            out = (
+                merged
+                .groupby(KEYS["SK_ID_CURR"])
+                .agg(**group.rollup_aggs)
+                .reset_index()
+            )
+            s["rows"] = out.shape[0]
+
+    out = restore_dtypes(out, {KEYS["SK_ID_CURR"]: KEYS["SK_ID_CURR"]}, original_dtypes or {})
+
+    if group.finalize is not None:
+        out = group.finalize(out)
+    return out
+
+
+def aggregate_group(
+    group: FeatureGroup,
+    df: pd.DataFrame,
+    mapping: Optional[pd.DataFrame] = None,
+    original_dtypes: Optional[dict[str, str]] = None,
+) -> pd.DataFrame:
+    """
+    Calcula las features de un grupo sobre su tabla ya cargada (y su mapeo key -> SK_ID_CURR).
+
+    original_dtypes: columnas reducidas al cargar (LoadResult.original_dtypes de la tabla y
+    del mapeo), para restaurar los tipos enteros del resultado.
+    """
+    first = first_level(group, df, original_dtypes)
+    return rollup(group, first, mapping, original_dtypes)
+
+
+AGGREGATION_METHODS = ("groupby", "segments", "arrow")
+
+
+def _restore_array(values: np.ndarray, target: Optional[str]) -> np.ndarray:
+    if target is not None and values.dtype.kind in "iu" and values.dtype != np.dtype(target):
+        return values.astype(target)
+    return values
+
+
+def _reduce_columns(seg: Segments, columns: dict[str, np.ndarray], aggs: dict[str, Agg], order) -> dict[str, np.ndarray]:
+    """
+    aggs por tramo; cada columna se reordena (si hace falta) y se reduce una sola vez.
+    """
+    by_col: dict[str, list[str]] = {}
+    for col, func in aggs.values():
+        by_col.setdefault(col, []).append(func)
+
+    stats = {}
+    for col, funcs in by_col.items():
+        values = columns[col] if order is None else columns[col][order]
+        stats[col] = seg.reduce_many(values, funcs)
+    return {name: stats[col][func] for name, (col, func) in aggs.items()}
+
+
+def aggregate_group_segments(
+    group: FeatureGroup,
+    df: pd.DataFrame,
+    mapping: Optional[pd.DataFrame] = None,
+    original_dtypes: Optional[dict[str, str]] = None,
+) -> pd.DataFrame:
+    """
+    Mismo resultado que aggregate_group, con reducciones por tramos (src/segments.py) en vez
+    de groupby + merge + groupby.
+
+    Las filas se ordenan una vez por key (nada si ya vienen ordenadas) y el primer nivel sale
+    de los tramos de key. Cada tramo se ubica en el mapeo key -> SK_ID_CURR (un searchsorted
+    por key, no por fila) y el segundo nivel son los tramos de SK_ID_CURR sobre el resultado,
+    sin armar la tabla intermedia. Requiere key única en la tabla de mapeo; si no lo es, usa
+    aggregate_group.
+    """
+    original_dtypes = original_dtypes or {}
+    curr = KEYS["SK_ID_CURR"]
+    require_columns(df, group.required, df_name=group.table)
+
+    if group.rollup_aggs is not None:
+        if mapping is None:
+            raise ValueError(f"[{group.name}] requiere la tabla de mapeo {group.mapping_table}")
+        require_columns(mapping, [group.key, curr], df_name=group.mapping_table)
+        map_keys = mapping[group.key].to_numpy()
+        map_order = sort_order(map_keys)
+        map_sorted = map_keys if map_order is None else map_keys[map_order]
+        if map_sorted.shape[0] == 0 or not bool(np.all(map_sorted[1:] > map_sorted[:-1])):
+            return aggregate_group(group, df, mapping, original_dtypes)
+
+    if group.derive is not None:
+        with span("derive", group=group.name):
+            df = group.derive(df)
+    aggs = {out: (col, func) for out, (col, func) in group.aggs.items() if col in df.columns}
+
+    row_keys = df[group.key].to_numpy()
+    order = sort_order(row_keys)
+    seg1 = Segments(row_keys if order is None else row_keys[order])
+
+    columns = {col: df[col].to_numpy() for col, _ in aggs.values()}
+    first = _reduce_columns(seg1, columns, aggs, order)
+    for name, (col, func) in aggs.items():
+        if func in ("min", "max", "sum"):
+            first[name] = _restore_array(first[name], original_dtypes.get(col))
+
+    if group.rollup_aggs is None:
+        out = pd.DataFrame({group.key: seg1.keys, **first})
+        out = restore_dtypes(out, {curr: curr}, original_dtypes)
+        return group.finalize(out) if group.finalize is not None else out
+
+    # Cliente de cada tramo; las keys que no están en el mapeo no llegan al segundo nivel
+    map_curr = mapping[curr].to_numpy()
+    if map_order is not None:
+        map_curr = map_curr[map_order]
+    pos = np.minimum(np.searchsorted(map_sorted, seg1.keys), map_sorted.shape[0] - 1)
+    in_map = map_sorted[pos] == seg1.keys
+    seg_curr = map_curr[pos[in_map]]
+
+    # Keys del mapeo sin filas: en el merge quedan como NaN y los enteros pasan a float64
+    has_gaps = seg_curr.shape[0] < map_sorted.shape[0]
+    for name, values in first.items():
+        values = values[in_map]
+        first[name] = values.astype(np.float64) if has_gaps and values.dtype.kind in "iub" else values
+
+    order2 = sort_order(seg_curr)
+    seg2 = Segments(seg_curr if order2 is None else seg_curr[order2])
+    second = _reduce_columns(seg2, first, group.rollup_aggs, order2)
+
+    customers = np.unique(map_curr)
+    positions = np.searchsorted(customers, seg2.keys)
+    out = pd.DataFrame({curr: customers})
+    for name, (_, func) in group.rollup_aggs.items():
+        out[name] = scatter(second[name], positions, customers.shape[0], func)
+
+    out = restore_dtypes(out, {curr: curr}, original_dtypes)
+    if group.finalize is not None:
+        out = group.finalize(out)
+    return out
+
+
+def build_feature_groups(
+    names: Optional[Iterable[str]] = None,
+    verbose: bool = True,
+    compact: bool = True,
+    streaming: bool = FEATURES_STREAMING,
+    batch_size: int = STREAM_BATCH_ROWS,
+    method: str = AGGREGATION_METHOD,
+    workers: int = FEATURES_WORKERS,
+    loader: Optional[Callable[[str, list[str]], LoadResult]] = None,
+) -> dict[str, pd.DataFrame]:
+    """
+    Calcula varios grupos de features en una sola pasada.
+
+    Cada tabla cruda se lee una sola vez con solo las columnas que necesitan sus grupos;
+    las tablas de mapeo (bureau, previous_application) se leen primero y el mapeo
+    key -> SK_ID_CURR se comparte entre grupos. Cada tabla se libera al terminar sus grupos.
+
+    compact: carga con enteros reducidos, strings como category y sin copia Arrow -> pandas
+    (ver load_parquet). Los floats no se reducen, así que el resultado es idéntico.
+
+    streaming: las tablas que no son de mapeo (bureau_balance, POS_CASH_balance,
+    installments_payments, credit_card_balance) se agregan por bloques de batch_size filas
+    en vez de cargarse completas.
+
+    method: "groupby" (pandas) o "segments" (ordenamiento + reducciones por tramos, ver
+    aggregate_group_segments) para las tablas cargadas completas; "arrow" calcula todo con
+    pyarrow.compute sobre los parquet (src/arrow_backend.py) e ignora compact, streaming,
+    workers y loader.
+
+    workers > 1: las tablas se particionan por SK_ID_CURR y cada partición se agrega en un
+    proceso aparte (ver src/sharding.py); el resultado es idéntico bit a bit. Tiene prioridad
+    sobre streaming.
+
+    loader(tabla, columnas) -> LoadResult reemplaza la carga desde data/raw (lo usan los
+    procesos de sharding para leer su partición).
+    """
+    if method not in AGGREGATION_METHODS:
+        raise ValueError(f"method debe ser uno de {AGGREGATION_METHODS}; recibido '{method}'")
+    aggregate = aggregate_group_segments if method == "segments" else aggregate_group
+
+    if method == "arrow":
+        from .arrow_backend import build_feature_groups_arrow
+
+        with span("aggregate", backend="arrow", groups=",".join(g.name for g in select_groups(names))):
+            return build_feature_groups_arrow(names, verbose=verbose)
+
+    if workers > 1:
+        from .sharding import build_feature_groups_sharded
+
+        with span("aggregate", backend="sharded", method=method, workers=workers):
+            return build_feature_groups_sharded(names, workers=workers, verbose=verbose, compact=compact, method=method)
+
+    load_options = dict(downcast="integer", categorical=True, zero_copy=True) if compact else {}
+    groups = select_groups(names)
+    needed = table_columns(groups)
+
+    mapping_tables = {g.mapping_table for g in groups if g.mapping_table is not None}
+    tables = sorted(needed, key=lambda t: t not in mapping_tables)
+
+    mappings: dict[str, pd.DataFrame] = {}
+    mapping_dtypes: dict[str, dict[str, str]] = {}
+    results: dict[str, pd.DataFrame] = {}
+
+    for table in tables:
+        table_groups = [g for g in groups if g.table == table]
+
+        if streaming and loader is None and table not in MAPPING_TABLES.values():
+            for g in table_groups:
+                # Lectura, derivadas y primer nivel van juntos, bloque por bloque
+                with span("aggregate", group=g.name, level=1, streaming=True, batch_size=batch_size) as s:
+                    first = first_level_streaming(g, batch_size)
+                    s["rows"] = first.shape[0]
+                results[g.name] = rollup(g, first, mappings.get(g.key), mapping_dtypes.get(g.key))
+                if verbose:
+                    print(f"Features {g.output_name} (streaming, batch_size={batch_size}): shape={results[g.name].shape}")
+            continue
+
+        available = set(parquet_columns(table))
+        cols = [c for c in needed[table] if c in available]
+        with span("load", table=table, columns=len(cols)) as s:
+            res = loader(table, cols) if loader is not None else load_parquet(table, columns=cols, **load_options)
+            df = res.df
+            s["rows"] = df.shape[0]
+        if verbose:
+            print(f"Loaded {table}: shape={df.shape}, memory={df.memory_usage(deep=True).sum() / 1e6:.1f} MB")
+
+        for key, mapping_table in MAPPING_TABLES.items():
+            if mapping_table == table and table in mapping_tables:
+                require_columns(df, [key, KEYS["SK_ID_CURR"]], df_name=table)
+                mappings[key] = df[[key, KEYS["SK_ID_CURR"]]]
+                mapping_dtypes[key] = res.original_dtypes
+
+        for g in table_groups:
+            mapping = mappings.get(g.key) if g.rollup_aggs is not None else None
+            # Si hay rollup, SK_ID_CURR sale de la tabla de mapeo
+            dtypes = {**res.original_dtypes, **mapping_dtypes.get(g.key, {})} if mapping is not None else res.original_dtypes
+            with span("aggregate", group=g.name, method=method) as s:
+                results[g.name] = aggregate(g, df, mapping, original_dtypes=dtypes)
+                s["rows"] = results[g.name].shape[0]
+            if verbose:
+                print(f"Features {g.output_name}: shape={results[g.name].shape}")
+
+        del df, res
+
+    return {g.name: results[g.name] for g in groups}
+
+
+def save_feature_group(name: str, df: pd.DataFrame, out_dir: Path = PROCESSED_DIR) -> Path:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    out_path = out_dir / f"{FEATURE_GROUPS_BY_NAME[name].output_name}.parquet"
+    with span("write", path=out_path.name, rows=df.shape[0]) as s:
+        df.to_parquet(out_path)
+        s["mb"] = round(out_path.stat().st_size / 1e6, 2)
+    return out_path
+
+
+def group_spec(group: FeatureGroup) -> dict:
+    """
+    Campos de datos de group (sin derive / finalize, que se versionan por su código).
+    """
+    return {f.name: getattr(group, f.name) for f in fields(group) if f.name not in ("derive", "finalize")}
+
+
+def group_functions(group: FeatureGroup) -> list[Callable]:
+    return [fn for fn in (group.derive, group.finalize) if fn is not None]
+
+
+def build_feature_group_cached(
+    name: str,
+    out_dir: Path = PROCESSED_DIR,
+    streaming: bool = FEATURES_STREAMING,
+    batch_size: int = STREAM_BATCH_ROWS,
+) -> tuple[Path, bool]:
+    """
+    Escribe feat_<name>.parquet usando el cache de artefactos: si el contenido de sus
+    tablas crudas, la especificación del grupo y el código del motor no cambiaron, el
+    archivo se restaura del cache sin recalcular. Devuelve (ruta, vino_del_cache).
+    """
+    group = FEATURE_GROUPS_BY_NAME[name]
+    out_path = out_dir / f"{group.output_name}.parquet"
+
+    inputs = [raw_path(group.table)]
+    if group.mapping_table is not None:
+        inputs.append(raw_path(group.mapping_table))
+
+    # Solo la especificación de este grupo: cambiar otro grupo no invalida éste
+    spec = group_spec(group)
+    code = [build_feature_groups, save_feature_group] + group_functions(group)
+    if AGGREGATION_METHOD == "arrow":
+        from . import arrow_backend
+
+        code.append(arrow_backend.build_feature_groups_arrow)
+    params = {
+        "spec": spec,
+        "streaming": streaming,
+        "batch_size": batch_size if streaming else None,
+        "method": AGGREGATION_METHOD,
+    }
+
+    def build():
+        feats = build_feature_groups([name], streaming=streaming, batch_size=batch_size)
+        save_feature_group(name, feats[name], out_dir)
+
+    hit = cached_build(group.output_name, inputs, [out_path], build, code=code, params=params)
+    return out_path, hit
+
+
+MERGE_METHODS = ("indexed", "pandas")
+
+
+def _count_duplicates(keys: np.ndarray) -> int:
+    # Los feat_* salen de un groupby: ya vienen ordenados y la verificación es O(n)
+    if keys.shape[0] < 2 or bool(np.all(keys[1:] > keys[:-1])):
+        return 0
+    return int(keys.shape[0] - np.unique(keys).shape[0])
+
+
+def _joined_dtype(dtype, complete: bool):
+    """
+    dtype que deja un left merge de pandas: sin filas faltantes se conserva; con faltantes,
+    enteros -> float64 (los floats se conservan).
+    """
+    if complete or pd.api.types.is_float_dtype(dtype):
+        return dtype
+    if pd.api.types.is_integer_dtype(dtype) and isinstance(dtype, np.dtype):
+        return np.dtype(np.float64)
+    return None
+
+
+def _merge_indexed(base_X: pd.DataFrame, feats: list[tuple[str, pd.DataFrame]], key: str, verbose: bool) -> pd.DataFrame:
+    """
+    Left join de todos los feat_* en una pasada: base_X se ordena por key una vez, las filas
+    de cada feat_* se ubican con un searchsorted y sus columnas se escriben en una matriz
+    float64 preasignada (n_filas x n_features), sin copias intermedias de la tabla creciente.
+    """
+    n = base_X.shape[0]
+    base_keys = base_X[key].to_numpy()
+    border = np.argsort(base_keys, kind="stable")
+    bsorted = base_keys[border]
+
+    # (columna, valores del feat, filas destino, filas origen, dtype de salida)
+    plan = []
+    for name, df in feats:
+        fkeys = df[key].to_numpy()
+        pos = np.searchsorted(bsorted, fkeys)
+        pos_c = np.minimum(pos, n - 1)
+        found = (pos < n) & (bsorted[pos_c] == fkeys)
+        target = border[pos_c[found]]
+        source = np.flatnonzero(found)
+        complete = target.shape[0] == n
+
+        for col in df.columns:
+            if col == key:
+                continue
+            values = df[col]
+            plan.append((col, values, target, source, _joined_dtype(values.dtype, complete)))
+        if verbose:
+            print(f"Join {name}: matched {target.shape[0]}/{n} rows")
+
+    block_cols = [c for c, _, _, _, dt in plan if dt is not None and dt == np.float64]
+    block = np.full((n, len(block_cols)), np.nan, dtype=np.float64, order="F")
+    block_pos = {c: j for j, c in enumerate(block_cols)}
+
+    extra = {}
+    for col, values, target, source, dtype in plan:
+        if col in block_pos:
+            block[target, block_pos[col]] = values.to_numpy(dtype=np.float64, na_value=np.nan)[source]
+        elif dtype is not None and isinstance(dtype, np.dtype):
+            arr = np.full(n, np.nan, dtype=dtype) if dtype.kind == "f" else np.empty(n, dtype=dtype)
+            arr[target] = values.to_numpy()[source]
+            extra[col] = arr
+        else:
+            # category, bool, object, nullables con faltantes: mismo resultado que merge
+            extra[col] = pd.Series(values.to_numpy()[source], index=target).reindex(range(n)).to_numpy()
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                extra[col] = pd.Categorical(extra[col], dtype=values.dtype)
+
+    index = pd.RangeIndex(n)
+    feat_frame = pd.DataFrame(block, columns=block_cols, index=index, copy=False)
+    order = [c for c, *_ in plan]
+    for col, arr in extra.items():
+        feat_frame.insert(order.index(col), col, arr)
+
+    base = base_X if base_X.index.equals(index) else base_X.reset_index(drop=True)
+    merged = pd.concat([base, feat_frame], axis=1, copy=False)
+    if verbose:
+        print(f"After join -> shape={merged.shape}")
+    return merged
+
+
+def merge_features(
+    base_X: pd.DataFrame,
+    feats: list[tuple[str, pd.DataFrame]],
+    verbose: bool = True,
+    method: str = MERGE_METHOD,
+) -> pd.DataFrame:
+    """
+    Une (left) cada tabla de features a base_X por SK_ID_CURR, validando 1 fila por cliente.
+
+    method="indexed" escribe todas las features en una matriz preasignada usando posiciones
+    por searchsorted (pico de memoria ~ una copia del resultado, tiempo lineal);
+    method="pandas" encadena DataFrame.merge. Ambos dan el mismo resultado (columnas,
+    orden y dtypes). "indexed" usa la ruta pandas si base_X tiene llaves repetidas o hay
+    columnas con el mismo nombre en dos tablas.
+    """
+    if method not in MERGE_METHODS:
+        raise ValueError(f"method debe ser uno de {MERGE_METHODS}; recibido '{method}'")
+
+    key = KEYS["SK_ID_CURR"]
+    require_columns(base_X, [key], df_name="base_X")
+
+    for name, df in feats:
+        require_columns(df, [key], df_name=name)
+        dups = _count_duplicates(df[key].to_numpy()) if method == "indexed" else int(df.duplicated(subset=[key]).sum())
+        if dups > 0:
+            raise ValueError(f"[{name}] tiene {dups} SK_ID_CURR duplicados (debería ser 1 fila por cliente).")
+
+    if method == "indexed":
+        names = [c for _, df in feats for c in df.columns if c != key] + list(base_X.columns)
+        if base_X.shape[0] > 0 and len(set(names)) == len(names) and _count_duplicates(np.sort(base_X[key].to_numpy())) == 0:
+            return _merge_indexed(base_X, feats, key, verbose)
+
+    merged = base_X
+    for _, df_feat in feats:
+        merged = merged.merge(df_feat, on=key, how="left")
+        if verbose:
+            print(f"After merge -> shape={merged.shape}")
+
+    if merged.shape[0] != base_X.shape[0]:
+        raise ValueError(f"Row count changed after merges! base={base_X.shape[0]}, merged={merged.shape[0]}")
+
+    return merged
+
+
+def save_model_tables(
+    merged: pd.DataFrame,
+    base_X: pd.DataFrame,
+    base_y: Optional[pd.DataFrame],
+    out_dir: Path = PROCESSED_DIR,
+) -> None:
+    """
+    Escribe model_X.parquet, model_y.parquet (si hay target) y model_metadata.json.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    X_out = out_dir / "model_X.parquet"
+    with span("write", path=X_out.name, rows=merged.shape[0]) as s:
+        merged.to_parquet(X_out)
+        s["mb"] = round(X_out.stat().st_size / 1e6, 2)
+    print(f"[OK] Model features saved to: {X_out}")
+
+    if base_y is not None and "TARGET" in base_y.columns:
+        y_out = out_dir / "model_y.parquet"
+        with span("write", path=y_out.name, rows=base_y.shape[0]):
+            base_y.to_parquet(y_out)
+        print(f"[OK] Model target saved to: {y_out}")
+
+    meta = {
+        "rows": int(merged.shape[0]),
+        "n_features": int(merged.shape[1]),
+        "n_added_features": int(merged.shape[1] - base_X.shape[1]),
+    }
+
+    meta_path = out_dir / "model_metadata.json"
+    pd.Series(meta).to_json(meta_path, indent=2)
+    print(f"[OK] Model metadata saved to: {meta_path}")
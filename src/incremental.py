@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from .config import KEYS, PROCESSED_DIR, STREAM_BATCH_ROWS
+from .features import FEATURE_GROUPS, FEATURE_GROUPS_BY_NAME, MAPPING_TABLES, FeatureGroup, rollup
+from .io import iter_parquet_batches, load_parquet, parquet_columns, require_columns
+from .streaming import finalize_partials, partial_columns, stream_partials, update_partials
+
+
+STATE_DIR = PROCESSED_DIR / "incremental"
+
+# Grupos de tablas mensuales (sin rollup no hay llave intermedia que mantener)
+INCREMENTAL_GROUPS = tuple(
+    g.name for g in FEATURE_GROUPS
+    if g.rollup_aggs is not None and g.table not in MAPPING_TABLES.values()
+)
+
+
+def _group(name: str) -> FeatureGroup:
+    if name not in INCREMENTAL_GROUPS:
+        raise KeyError(f"Grupo '{name}' no soporta modo incremental. Opciones: {list(INCREMENTAL_GROUPS)}")
+    return FEATURE_GROUPS_BY_NAME[name]
+
+
+def state_paths(name: str, state_dir: Path = STATE_DIR) -> tuple[Path, Path]:
+    return state_dir / f"{name}_state.parquet", state_dir / f"{name}_state.json"
+
+
+def save_state(name: str, state: pd.DataFrame, aggs: dict, state_dir: Path = STATE_DIR) -> Path:
+    state_path, meta_path = state_paths(name, state_dir)
+    state_dir.mkdir(parents=True, exist_ok=True)
+
+    tmp = state_path.with_suffix(".parquet.tmp")
+    state.to_parquet(tmp)
+    os.replace(tmp, state_path)
+
+    meta = {"group": name, "key": state.index.name, "keys": int(state.shape[0]), "aggs": aggs}
+    with open(meta_path, "w") as f:
+        json.dump(meta, f, indent=2)
+    return state_path
+
+
+def load_state(name: str, state_dir: Path = STATE_DIR) -> tuple[pd.DataFrame, dict[str, tuple[str, str]]]:
+    state_path, meta_path = state_paths(name, state_dir)
+    if not state_path.exists():
+        raise FileNotFoundError(f"No existe el estado incremental de '{name}': {state_path} (ejecutar con --init)")
+    with open(meta_path) as f:
+        meta = json.load(f)
+    aggs = {out: tuple(spec) for out, spec in meta["aggs"].items()}
+    state = pd.read_parquet(state_path)
+    missing = [c for c in partial_columns(aggs) if c not in state.columns]
+    if missing:
+        raise ValueError(f"El estado incremental de '{name}' no tiene {missing} (formato anterior): ejecutar con --init")
+    return state, aggs
+
+
+def init_state(name: str, batch_size: int = STREAM_BATCH_ROWS, state_dir: Path = STATE_DIR) -> pd.DataFrame:
+    """
+    Estado inicial de un grupo: estadísticos parciales (count, sum, min, max, ...) por
+    SK_ID_PREV / SK_ID_BUREAU sobre toda la historia de su tabla cruda, leída por bloques.
+    """
+    group = _group(name)
+    available = set(parquet_columns(group.table))
+    cols = [c for c in dict.fromkeys(group.columns + group.required + (group.key,)) if c in available]
+    batches = iter_parquet_batches(group.table, columns=cols, batch_size=batch_size, categorical=True)
+
+    state, aggs = stream_partials(batches, group.key, group.aggs, derive=group.derive)
+    save_state(name, state, aggs, state_dir)
+    return state
+
+
+def apply_delta(
+    group: FeatureGroup,
+    state: pd.DataFrame,
+    aggs: dict[str, tuple[str, str]],
+    delta: pd.DataFrame,
+) -> tuple[pd.DataFrame, np.ndarray]:
+    """
+    Suma las filas nuevas al estado (después de las que ya tenía, como si estuvieran al final
+    de la tabla). Solo se combinan las llaves presentes en delta; devuelve (estado
+    actualizado, llaves afectadas).
+    """
+    require_columns(delta, group.required, df_name=f"{group.table} (delta)")
+    if group.derive is not None:
+        delta = group.derive(delta)
+
+    partials = partial_columns(aggs)
+    missing = [c for c, _ in partials.values() if c not in delta.columns]
+    if missing:
+        raise ValueError(f"[{group.table} (delta)] faltan columnas del estado: {sorted(set(missing))}")
+
+    combined = update_partials([state], delta, group.key, partials)[list(state.columns)]
+    keys = combined.index.to_numpy()
+
+    known = state.index.isin(keys)
+    updated = pd.concat([state[~known], combined.astype(state.dtypes.to_dict())]).sort_index()
+    return updated, keys
+
+
+def rollup_customers(
+    group: FeatureGroup,
+    state: pd.DataFrame,
+    aggs: dict[str, tuple[str, str]],
+    mapping: pd.DataFrame,
+    customers: np.ndarray,
+) -> pd.DataFrame:
+    """
+    Filas finales (una por SK_ID_CURR) solo para los clientes indicados: el primer nivel
+    sale del estado de sus llaves y el segundo nivel es el mismo rollup del pipeline.
+    """
+    sub_mapping = mapping[mapping[KEYS["SK_ID_CURR"]].isin(customers)]
+    keys = state.index.intersection(sub_mapping[group.key].unique())
+    first = finalize_partials(state.loc[keys], aggs).reset_index()
+    return rollup(group, first, sub_mapping)
+
+
+def replace_rows(df: pd.DataFrame, new: pd.DataFrame, key: str) -> pd.DataFrame:
+    """
+    Reemplaza (o agrega) en df las filas de los clientes de new; el resultado queda ordenado
+    por key, igual que la salida del groupby.
+    """
+    kept = df[~df[key].isin(new[key])]
+    out = pd.concat([kept, new[df.columns]], ignore_index=True)
+    return out.sort_values(key, kind="stable").reset_index(drop=True)
+
+
+def update_model_X(model_X: pd.DataFrame, new: pd.DataFrame, key: str) -> int:
+    """
+    Escribe en model_X (en el lugar) las columnas de new para sus clientes. Devuelve el
+    número de filas actualizadas.
+    """
+    rows = model_X[key].isin(new[key]).to_numpy()
+    aligned = new.set_index(key).reindex(model_X.loc[rows, key])
+    for col in new.columns:
+        if col == key:
+            continue
+        if col not in model_X.columns:
+            raise ValueError(f"[model_X] falta la columna {col}; regenerar con 08_merge_all.py")
+        model_X.loc[rows, col] = aligned[col].to_numpy()
+    return int(rows.sum())
+
+
+def incremental_update(
+    name: str,
+    deltas: Iterable[pd.DataFrame],
+    processed_dir: Path = PROCESSED_DIR,
+    state_dir: Optional[Path] = None,
+) -> dict:
+    """
+    Aplica filas nuevas de la tabla de un grupo (ej: un mes de POS_CASH_balance):
+
+    1. combina sus estadísticos parciales con el estado por SK_ID_PREV / SK_ID_BUREAU;
+    2. recalcula el rollup solo para los SK_ID_CURR de las llaves afectadas;
+    3. reemplaza esas filas en feat_<name>.parquet y en model_X.parquet.
+
+    El costo de agregación es O(filas nuevas + llaves de los clientes afectados), no
+    O(historia). Las filas nuevas también deben agregarse a la tabla cruda para que una
+    reconstrucción completa dé el mismo resultado.
+    """
+    group = _group(name)
+    state_dir = state_dir or processed_dir / "incremental"
+    key = KEYS["SK_ID_CURR"]
+
+    state, aggs = load_state(name, state_dir)
+    affected_keys = []
+    n_rows = 0
+    for delta in deltas:
+        state, keys = apply_delta(group, state, aggs, delta)
+        affected_keys.append(keys)
+        n_rows += int(delta.shape[0])
+    affected_keys = np.unique(np.concatenate(affected_keys)) if affected_keys else np.array([])
+
+    mapping = load_parquet(group.mapping_table, columns=[group.key, key]).df
+    customers = mapping.loc[mapping[group.key].isin(affected_keys), key].unique()
+    new = rollup_customers(group, state, aggs, mapping, customers)
+
+    feat_path = processed_dir / f"{group.output_name}.parquet"
+    feat = pd.read_parquet(feat_path)
+    feat = replace_rows(feat, new, key)
+
+    model_path = processed_dir / "model_X.parquet"
+    model_X = pd.read_parquet(model_path)
+    n_model = update_model_X(model_X, new, key)
+
+    # Estado y tablas se escriben al final: si algo falla antes, nada queda a medias
+    save_state(name, state, aggs, state_dir)
+    feat.to_parquet(feat_path)
+    model_X.to_parquet(model_path)
+
+    return {
+        "group": name,
+        "delta_rows": n_rows,
+        "affected_keys": int(affected_keys.shape[0]),
+        "affected_customers": int(customers.shape[0]),
+        "model_X_rows_updated": n_model,
+    }
@@ -1,9 +1,13 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Iterable, Optional
+from typing import Iterable, Iterator, Optional
 
+import numpy as np
 import pandas as pd
 
 from .config import RAW_DIR, FILES
@@ -18,11 +22,16 @@ class LoadResult:
     name: str
     path: Path
     df: pd.DataFrame
+    # Columnas reducidas por downcast -> dtype que habrían tenido sin reducir
+    original_dtypes: dict[str, str] = field(default_factory=dict)
 
 
-def load_parquet(name: str, columns: Optional[list[str]] = None) -> LoadResult:
+DOWNCAST_MODES = ("integer", "all")
+
+
+def raw_path(name: str) -> Path:
     """
-    Carga un parquet desde data/raw por nombre lógico (ej: 'bureau').
+    Ruta en data/raw de una tabla por nombre lógico (ej: 'bureau').
     """
     if name not in FILES:
         raise KeyError(f"Nombre '{name}' no está en config.FILES. Opciones: {list(FILES.keys())}")
@@ -30,9 +39,323 @@ def load_parquet(name: str, columns: Optional[list[str]] = None) -> LoadResult:
     path = RAW_DIR / FILES[name]
     if not path.exists():
         raise DataFileNotFoundError(f"No existe el archivo: {path}")
+    return path
+
+
+def _smallest_int_type(lo: int, hi: int):
+    import pyarrow as pa
+
+    for pa_type, np_type in [(pa.int8(), np.int8), (pa.int16(), np.int16), (pa.int32(), np.int32)]:
+        info = np.iinfo(np_type)
+        if info.min <= lo and hi <= info.max:
+            return pa_type
+    return None
+
+
+def _int_ranges_from_stats(pf, names: list[str]) -> dict[str, tuple[int, int]]:
+    """
+    (min, max) por columna entera a partir de las estadísticas de los row groups del
+    parquet, sin leer datos. Las columnas sin estadísticas completas no se incluyen.
+    """
+    meta = pf.metadata
+    col_index = {meta.schema.column(j).path: j for j in range(meta.num_columns)}
+
+    ranges = {}
+    for name in names:
+        j = col_index.get(name)
+        if j is None:
+            continue
+        lo, hi = None, None
+        for i in range(meta.num_row_groups):
+            stats = meta.row_group(i).column(j).statistics
+            if stats is None or not stats.has_min_max:
+                lo = None
+                break
+            lo = stats.min if lo is None else min(lo, stats.min)
+            hi = stats.max if hi is None else max(hi, stats.max)
+        if lo is not None:
+            ranges[name] = (lo, hi)
+    return ranges
+
+
+def _read_compact(
+    path: Path,
+    columns: Optional[list[str]],
+    downcast: Optional[str],
+    categorical: bool,
+    row_groups: Optional[list[int]] = None,
+):
+    """
+    Lee un parquet row group por row group, reduciendo tipos a nivel Arrow antes de acumular:
+    - enteros al menor tipo que contiene su rango (según estadísticas del parquet o, si no
+      hay, según los datos); con downcast="all" también float64 -> float32;
+    - strings leídos directamente como diccionario (category) si categorical=True.
+    Así el pico de memoria es la tabla compacta más un row group, no la tabla completa.
+
+    row_groups: solo esos row groups (los tipos reducidos salen igual de las estadísticas
+    de todo el archivo).
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    schema = pq.read_schema(path)
+    names = columns if columns is not None else [n for n in schema.names if not n.startswith("__index_level_")]
+    string_cols = [n for n in names if pa.types.is_string(schema.field(n).type) or pa.types.is_large_string(schema.field(n).type)]
+
+    pf = pq.ParquetFile(path, read_dictionary=string_cols if categorical else None)
+
+    targets: dict[str, pa.DataType] = {}
+    unknown_int: list[str] = []
+    if downcast is not None:
+        int_cols = [n for n in names if pa.types.is_signed_integer(schema.field(n).type) and schema.field(n).type.bit_width > 8]
+        ranges = _int_ranges_from_stats(pf, int_cols)
+        for n in int_cols:
+            if n in ranges:
+                t = _smallest_int_type(*ranges[n])
+                if t is not None and t.bit_width < schema.field(n).type.bit_width:
+                    targets[n] = t
+            else:
+                unknown_int.append(n)
+        if downcast == "all":
+            targets.update({n: pa.float32() for n in names if pa.types.is_float64(schema.field(n).type)})
+
+    def cast(table):
+        for n, t in targets.items():
+            i = table.schema.get_field_index(n)
+            if i >= 0:
+                table = table.set_column(i, n, table.column(i).cast(t, safe=pa.types.is_integer(t)))
+        return table
+
+    if row_groups is None:
+        row_groups = range(pf.metadata.num_row_groups)
+    parts = [
+        cast(pf.read_row_group(i, columns=columns, use_pandas_metadata=True))
+        for i in row_groups
+    ]
+    table = pa.concat_tables(parts) if parts else cast(pf.schema_arrow.empty_table())
+    del parts
+
+    # Enteros sin estadísticas: se reducen con el rango real, ya con la tabla en memoria
+    for n in unknown_int:
+        mm = pc.min_max(table.column(n)).as_py()
+        t = _smallest_int_type(mm["min"], mm["max"]) if mm["min"] is not None else None
+        if t is not None and t.bit_width < schema.field(n).type.bit_width:
+            i = table.schema.get_field_index(n)
+            table = table.set_column(i, n, table.column(i).cast(t))
+            targets[n] = t
+
+    # Con nulos, pandas convierte los enteros a float64 de todos modos: no hay tipo que restaurar
+    original = {}
+    for n in targets:
+        original_type = schema.field(n).type
+        if pa.types.is_floating(original_type) or table.column(n).null_count == 0:
+            original[n] = original_type.to_pandas_dtype().__name__
+
+    return table, original
+
+
+def load_parquet(
+    name: str,
+    columns: Optional[list[str]] = None,
+    downcast: Optional[str] = None,
+    categorical: bool = False,
+    zero_copy: bool = False,
+) -> LoadResult:
+    """
+    Carga un parquet desde data/raw por nombre lógico (ej: 'bureau').
+
+    Opciones para tablas grandes (por defecto se comporta como pd.read_parquet):
+    - columns: proyección, solo se leen esas columnas del archivo.
+    - downcast: "integer" reduce enteros a int8/int16/int32 según su rango (sin pérdida);
+      "all" además pasa float64 -> float32 (con pérdida de precisión).
+    - categorical: columnas string como category.
+    - zero_copy: los buffers de Arrow se entregan a pandas sin copia (un bloque por columna,
+      liberando la tabla Arrow a medida que se convierte). Las columnas pueden ser de solo
+      lectura: se pueden agregar columnas, no modificar las existentes en el lugar.
+    """
+    path = raw_path(name)
+    if downcast is None and not categorical and not zero_copy:
+        df = pd.read_parquet(path, columns=columns)
+        return LoadResult(name=name, path=path, df=df)
+
+    if downcast is not None and downcast not in DOWNCAST_MODES:
+        raise ValueError(f"downcast debe ser None o uno de {DOWNCAST_MODES}; recibido '{downcast}'")
+
+    table, original = _read_compact(path, columns, downcast, categorical)
+
+    df = table.to_pandas(
+        split_blocks=zero_copy,
+        self_destruct=zero_copy,
+    )
+    del table
+    return LoadResult(name=name, path=path, df=df, original_dtypes=original)
+
+
+def load_arrow(
+    name: str,
+    columns: Optional[list[str]] = None,
+    downcast: Optional[str] = None,
+    categorical: bool = False,
+    row_groups: Optional[list[int]] = None,
+):
+    """
+    Como load_parquet con las mismas opciones, pero devuelve (pyarrow.Table, original_dtypes)
+    sin convertir a pandas. row_groups limita la lectura a esos row groups del parquet.
+    """
+    if downcast is not None and downcast not in DOWNCAST_MODES:
+        raise ValueError(f"downcast debe ser None o uno de {DOWNCAST_MODES}; recibido '{downcast}'")
+    return _read_compact(raw_path(name), columns, downcast, categorical, row_groups)
+
+
+def parquet_row_groups(name: str) -> int:
+    """
+    Cantidad de row groups de una tabla cruda (solo lee el footer del parquet).
+    """
+    import pyarrow.parquet as pq
+
+    return pq.ParquetFile(raw_path(name)).metadata.num_row_groups
+
+
+def iter_parquet_batches(
+    name: str,
+    columns: Optional[list[str]] = None,
+    batch_size: int = 1_000_000,
+    categorical: bool = False,
+) -> Iterator[pd.DataFrame]:
+    """
+    Lee una tabla cruda en bloques de hasta batch_size filas (record batches de Arrow),
+    sin cargar el archivo completo. Cada bloque se entrega como DataFrame; una tabla sin
+    filas da un único bloque vacío, con sus columnas y tipos.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    path = raw_path(name)
+    schema = pq.read_schema(path)
+    names = columns if columns is not None else schema.names
+    string_cols = [n for n in names if pa.types.is_string(schema.field(n).type) or pa.types.is_large_string(schema.field(n).type)]
+
+    pf = pq.ParquetFile(path, read_dictionary=string_cols if categorical else None)
+    if pf.metadata.num_rows == 0:
+        yield pf.read(columns=columns).to_pandas()
+        return
+    for batch in pf.iter_batches(batch_size=batch_size, columns=columns):
+        yield batch.to_pandas()
+
+
+def parquet_columns(name: str) -> list[str]:
+    """
+    Columnas disponibles en una tabla cruda (solo lee el schema del parquet).
+    """
+    import pyarrow.parquet as pq
+
+    return list(pq.read_schema(raw_path(name)).names)
+
+
+def file_sha256(path: Path, chunk_size: int = 1 << 20) -> str:
+    """
+    Hash SHA-256 del contenido de un archivo (leído por bloques).
+    """
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _cache_is_valid(path: Path, meta_path: Path, dtype: str) -> bool:
+    if not meta_path.exists():
+        return False
+    with open(meta_path) as f:
+        meta = json.load(f)
+    if meta.get("dtype") != dtype:
+        return False
+
+    stat = path.stat()
+    if meta["source_size"] == stat.st_size and meta["source_mtime_ns"] == stat.st_mtime_ns:
+        return True
+
+    # mtime cambió (copia, checkout): solo se invalida si cambió el contenido
+    if meta["source_size"] == stat.st_size and meta["source_sha256"] == file_sha256(path):
+        meta["source_mtime_ns"] = stat.st_mtime_ns
+        with open(meta_path, "w") as f:
+            json.dump(meta, f, indent=2)
+        return True
+    return False
+
+
+def _write_numeric_cache(path: Path, cache_dir: Path, dtype: str) -> None:
+    df = pd.read_parquet(path)
+    df = df.select_dtypes(include=["number"])
+
+    values = df.to_numpy(dtype=dtype, na_value=np.nan)
+    values[np.isinf(values)] = np.nan
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    stat = path.stat()
+    meta = {
+        "source": path.name,
+        "source_size": stat.st_size,
+        "source_mtime_ns": stat.st_mtime_ns,
+        "source_sha256": file_sha256(path),
+        "dtype": dtype,
+        "shape": list(values.shape),
+        "columns": list(df.columns),
+    }
+
+    # Escribir en temporales y renombrar: un proceso concurrente nunca ve un cache a medias
+    for name, arr in [("values.npy", values), ("index.npy", df.index.to_numpy())]:
+        tmp = cache_dir / f"{name}.tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, arr, allow_pickle=False)
+        os.replace(tmp, cache_dir / name)
+
+    tmp = cache_dir / "meta.json.tmp"
+    with open(tmp, "w") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp, cache_dir / "meta.json")
+
+
+def load_numeric_cached(
+    path: Path,
+    cache_dir: Optional[Path] = None,
+    dtype: str = "float64",
+) -> pd.DataFrame:
+    """
+    Carga solo las columnas numéricas de un parquet procesado (ej: X_train.parquet),
+    con inf -> NaN, usando un cache .npy memory-mapped.
+
+    dtype float64 (por defecto) da los mismos valores que leer el parquet, así que el
+    entrenamiento y las métricas no cambian por el cache. float32 ocupa la mitad pero
+    redondea los features: solo para usos que lo toleran (ej: el feature store).
+
+    La primera vez lee el parquet y escribe <cache_dir>/values.npy, index.npy y meta.json
+    (por defecto en <carpeta del parquet>/.cache/<nombre>.<dtype>). Las siguientes veces abre la
+    matriz con mmap sin copiarla. El cache se invalida si cambia el tamaño o el hash
+    del parquet (el mtime solo se usa como verificación rápida).
+
+    La matriz se abre copy-on-write: las páginas se comparten con el archivo mientras no se
+    escriban, y una escritura (ej: sklearn marcando el array como escribible) queda en la
+    memoria del proceso sin modificar el cache.
+    """
+    path = Path(path)
+    if not path.exists():
+        raise DataFileNotFoundError(f"No existe el archivo: {path}")
+
+    if cache_dir is None:
+        cache_dir = path.parent / ".cache" / f"{path.stem}.{dtype}"
+    meta_path = cache_dir / "meta.json"
+
+    if not _cache_is_valid(path, meta_path, dtype):
+        _write_numeric_cache(path, cache_dir, dtype)
+
+    with open(meta_path) as f:
+        meta = json.load(f)
 
-    df = pd.read_parquet(path, columns=columns)
-    return LoadResult(name=name, path=path, df=df)
+    values = np.load(cache_dir / "values.npy", mmap_mode="c")
+    index = np.load(cache_dir / "index.npy", allow_pickle=False)
+    return pd.DataFrame(values, columns=meta["columns"], index=index, copy=False)
 
 
 def require_columns(df: pd.DataFrame, required: Iterable[str], df_name: str = "df") -> None:
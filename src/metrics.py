@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Iterable, Optional, Sequence
+
+from .utils import peak_rss_bytes, process_memory
+
+
+# Segundos: de 50 µs (una fila con el modelo plano) a 10 s (batch grande)
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Filas por solicitud o por llamada al modelo
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096, 16384, 65536)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence, extra: tuple = ()) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)] + [f'{n}="{v}"' for n, v in extra]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """
+    Contador monótono por combinación de labels (los valores se pasan en el orden de label_names).
+    """
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, label_names: Sequence[str] = ()):
+        self.name, self.help, self.label_names = name, help, tuple(label_names)
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in values:
+            yield f"{self.name}{_labels(self.label_names, labels)} {_format_value(value)}"
+
+
+class Histogram:
+    """
+    Histograma de buckets fijos. observe() es un bisect y dos sumas bajo un lock (se llama
+    desde el event loop y desde el threadpool); los acumulados se arman recién en samples().
+    """
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, label_names: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name, self.help, self.label_names = name, help, tuple(label_names)
+        self.buckets = tuple(float(b) for b in buckets)
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels) -> None:
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][i] += 1
+            series[1] += value
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            series = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+        for labels, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = (("le", _format_value(bound)),)
+                yield f"{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.label_names, labels)} {_format_value(total)}"
+            yield f"{self.name}_count{_labels(self.label_names, labels)} {cumulative}"
+
+
+class Gauge:
+    """
+    Valor calculado al exportar: fn devuelve [(valores de labels, valor), ...]. kind="counter"
+    para totales que lleva otro (el CPU del proceso).
+    """
+
+    def __init__(self, name: str, help: str, fn: Callable[[], Iterable[tuple]], label_names: Sequence[str] = (), kind: str = "gauge"):
+        self.name, self.help, self.label_names, self.fn, self.kind = name, help, tuple(label_names), fn, kind
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in self.fn():
+            yield f"{self.name}{_labels(self.label_names, labels)} {_format_value(value)}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: dict[str, object] = {}
+
+    def register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Métrica duplicada: '{metric.name}'")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, label_names: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, label_names))
+
+    def histogram(self, name: str, help: str, label_names: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, label_names, buckets))
+
+    def gauge(self, name: str, help: str, fn: Callable[[], Iterable[tuple]], label_names: Sequence[str] = (), kind: str = "gauge") -> Gauge:
+        return self.register(Gauge(name, help, fn, label_names, kind))
+
+    def render(self) -> str:
+        """
+        Formato de texto de Prometheus (exposition format 0.0.4).
+        """
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+# -------------------------------------------------------------------------
+# Proceso
+# -------------------------------------------------------------------------
+
+_START_TIME = time.time()
+
+
+def register_process_metrics(registry: MetricsRegistry) -> None:
+    """
+    Métricas estándar de proceso (mismos nombres que los clientes oficiales de Prometheus).
+    Con varios workers cada uno exporta las suyas.
+    """
+    registry.gauge("process_resident_memory_bytes", "Resident memory size in bytes.", lambda: [((), process_memory()[1])])
+    registry.gauge("process_virtual_memory_bytes", "Virtual memory size in bytes.", lambda: [((), process_memory()[0])])
+    registry.gauge("process_max_resident_memory_bytes", "Peak resident memory size in bytes.", lambda: [((), peak_rss_bytes())])
+    registry.gauge("process_cpu_seconds_total", "Total user and system CPU time spent in seconds.", lambda: [((), time.process_time())], kind="counter")
+    registry.gauge("process_start_time_seconds", "Start time of the process since unix epoch in seconds.", lambda: [((), _START_TIME)])
+    registry.gauge("process_threads", "Number of OS threads in the process.", lambda: [((), threading.active_count())])
+
+
+# -------------------------------------------------------------------------
+# Tiempos por etapa de cada solicitud
+# -------------------------------------------------------------------------
+
+class RequestTimer:
+    """
+    Marcas de tiempo de una solicitud: cada mark(stage) guarda lo transcurrido desde la marca
+    anterior (la primera, desde que llegó la solicitud). El handler agrega rows y
+    model_version; el middleware cierra con la serialización.
+    """
+    __slots__ = ("start", "last", "stages", "rows", "model_version")
+
+    def __init__(self):
+        self.start = self.last = time.perf_counter()
+        self.stages: list[tuple[str, float]] = []
+        self.rows: Optional[int] = None
+        self.model_version: Optional[str] = None
+
+    def mark(self, stage: str) -> None:
+        now = time.perf_counter()
+        self.stages.append((stage, now - self.last))
+        self.last = now
+
+
+# La solicitud en curso (None si las métricas están deshabilitadas). El objeto es mutable, así
+# que las marcas hechas en el threadpool (copia del contexto) llegan al middleware.
+current_request: ContextVar[Optional[RequestTimer]] = ContextVar("current_request", default=None)
+
+
+def mark(stage: str) -> None:
+    timer = current_request.get()
+    if timer is not None:
+        timer.mark(stage)
+
+
+def annotate(rows: int, model_version: str) -> None:
+    timer = current_request.get()
+    if timer is not None:
+        timer.rows = rows
+        timer.model_version = model_version
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI (sin BaseHTTPMiddleware, que agrega una tarea por solicitud): crea el
+    RequestTimer, marca "serialize" cuando sale el inicio de la respuesta y al terminar llama
+    a on_request(route, status, timer, seconds). route es la plantilla de la ruta
+    ("/score/{sk_id_curr}"), no la URL, para no crear una serie por cliente.
+    """
+
+    def __init__(self, app, on_request: Callable[[str, int, RequestTimer, float], None]):
+        self.app = app
+        self.on_request = on_request
+        self._paths: dict = {}
+
+    def route_path(self, scope: dict) -> str:
+        route = scope.get("route")
+        if route is not None:
+            return getattr(route, "path", "unmatched")
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        if endpoint not in self._paths:
+            routes = getattr(scope.get("app"), "routes", [])
+            self._paths[endpoint] = next((r.path for r in routes if getattr(r, "endpoint", None) is endpoint), "unmatched")
+        return self._paths[endpoint]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timer = RequestTimer()
+        token = current_request.set(timer)
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                timer.mark("serialize")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_request.reset(token)
+            self.on_request(self.route_path(scope), status, timer, time.perf_counter() - timer.start)
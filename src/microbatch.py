@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from typing import Callable, Optional
+
+import numpy as np
+
+
+def _fail_stopped(items: list) -> None:
+    for _, fut in items:
+        if not fut.done():
+            fut.set_exception(RuntimeError("MicroBatcher detenido"))
+
+
+class MicroBatcher:
+    """
+    Agrupa predicciones individuales concurrentes en un solo llamado vectorizado.
+
+    Cada submit() encola una fila y espera su future. Un único consumidor toma la primera
+    fila de la cola y sigue juntando hasta max_batch filas o max_wait_ms milisegundos;
+    luego ejecuta predict_fn (en el threadpool, para no bloquear el event loop) y resuelve
+    cada future con su propio resultado, en el mismo orden.
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[np.ndarray], np.ndarray],
+        max_batch: int = 64,
+        max_wait_ms: float = 2.0,
+    ):
+        if max_batch <= 0:
+            raise ValueError("max_batch debe ser > 0")
+        if max_wait_ms < 0:
+            raise ValueError("max_wait_ms debe ser >= 0")
+
+        self.predict_fn = predict_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+
+        self.batch_sizes: Counter[int] = Counter()
+        self.n_batches = 0
+        self.n_rows = 0
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        # Las solicitudes que quedaron en cola no se van a procesar
+        while self._queue is not None and not self._queue.empty():
+            _, fut = self._queue.get_nowait()
+            if not fut.done():
+                fut.set_exception(RuntimeError("MicroBatcher detenido"))
+
+    async def close(self) -> None:
+        """
+        Detiene el batcher después de procesar las filas que ya están en cola (para
+        reemplazarlo por otro sin perder solicitudes en curso).
+        """
+        if self._task is not None:
+            await self._queue.join()
+        await self.stop()
+
+    async def submit(self, row: np.ndarray) -> float:
+        """
+        Encola una fila (n_features,) y devuelve su resultado cuando se procesa su batch.
+        """
+        if self._task is None:
+            raise RuntimeError("MicroBatcher no iniciado (llamar start() dentro del event loop)")
+        fut = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, fut))
+        return await fut
+
+    def stats(self) -> dict:
+        return {
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "batches": self.n_batches,
+            "rows": self.n_rows,
+            "mean_batch_size": self.n_rows / self.n_batches if self.n_batches else 0.0,
+            "batch_size_counts": {str(k): v for k, v in sorted(self.batch_sizes.items())},
+        }
+
+    async def _collect(self) -> list:
+        loop = asyncio.get_running_loop()
+        items = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+
+        try:
+            while len(items) < self.max_batch:
+                # Primero lo que ya está en cola, sin esperar
+                if not self._queue.empty():
+                    items.append(self._queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    items.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+        except asyncio.CancelledError:
+            # stop() mientras se juntaba el batch: estas filas ya salieron de la cola
+            _fail_stopped(items)
+            for _ in items:
+                self._queue.task_done()
+            raise
+        return items
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            items = await self._collect()
+            try:
+                await self._process(loop, items)
+            finally:
+                # Para close(): la cola queda "terminada" cuando cada fila tuvo su resultado
+                for _ in items:
+                    self._queue.task_done()
+
+    async def _process(self, loop, items: list) -> None:
+        rows = np.stack([row for row, _ in items])
+
+        try:
+            out = await loop.run_in_executor(None, self.predict_fn, rows)
+        except asyncio.CancelledError:
+            _fail_stopped(items)
+            raise
+        except Exception as e:
+            for _, fut in items:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+
+        self.n_batches += 1
+        self.n_rows += len(items)
+        self.batch_sizes[len(items)] += 1
+
+        for (_, fut), value in zip(items, out):
+            # El cliente pudo haber cancelado (desconexión) mientras esperaba
+            if not fut.done():
+                fut.set_result(float(value))
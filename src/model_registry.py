@@ -0,0 +1,319 @@
+from __future__ import annotations
+
+import json
+import os
+import pickle
+import re
+import shutil
+import tempfile
+import time
+import warnings
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+
+from .scoring import FeatureVectorBuilder
+from .tree_ensemble import CompiledEnsemble, export_hist_gradient_boosting
+
+
+# Archivos de cada versión: <registry>/<version>/...
+MANIFEST_FILE = "manifest.json"
+MODEL_FILE = "model.joblib"
+COLUMNS_FILE = "numeric_cols.joblib"
+COMPILED_FILE = "model_compiled.npz"
+FLAT_FILE = "model_flat.bin"
+WARMUP_FILE = "warmup.npy"
+
+# Filas del batch de validación cuando la versión no trae warmup.npy
+WARMUP_ROWS = 64
+
+# Diferencia máxima de probabilidad entre los formatos exportados y el modelo sklearn
+PARITY_TOL = 1e-9
+
+# auto: el primero que exista de flat (memory-map) -> compiled (.npz) -> joblib
+MODEL_FORMATS = ("auto", "flat", "compiled", "joblib")
+
+
+@dataclass(frozen=True)
+class ModelBundle:
+    """
+    Un modelo listo para servir: el modelo, sus columnas y su FeatureVectorBuilder, más los
+    datos que reporta GET /model. Se reemplaza completo (nunca se modifica), así que una
+    solicitud que tomó una referencia usa siempre el mismo modelo y el mismo orden de columnas.
+    """
+    version: str
+    model: Any
+    columns: tuple[str, ...]
+    builder: FeatureVectorBuilder
+    format: str
+    path: Path
+    loaded_at: float
+    load_seconds: float
+    memory_bytes: int
+    metadata: dict = field(default_factory=dict)
+
+    def info(self) -> dict:
+        return {
+            "version": self.version,
+            "format": self.format,
+            "path": str(self.path),
+            "n_features": len(self.columns),
+            "loaded_at": time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime(self.loaded_at)),
+            "load_seconds": self.load_seconds,
+            "memory_bytes": self.memory_bytes,
+            "metadata": self.metadata,
+        }
+
+
+# -------------------------------------------------------------------------
+# Manifiesto
+# -------------------------------------------------------------------------
+
+def read_manifest(registry_dir: Path) -> dict:
+    """
+    {"active": versión activa o None, "versions": {versión: metadatos}}.
+    """
+    path = Path(registry_dir) / MANIFEST_FILE
+    if not path.exists():
+        return {"active": None, "versions": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_manifest(registry_dir: Path, manifest: dict) -> None:
+    # Escritura atómica: quien lea el manifiesto ve la versión anterior o la nueva, nunca media
+    registry_dir = Path(registry_dir)
+    fd, tmp = tempfile.mkstemp(dir=registry_dir, prefix=".manifest_", suffix=".json")
+    with os.fdopen(fd, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, registry_dir / MANIFEST_FILE)
+
+
+def manifest_signature(registry_dir: Path) -> Optional[tuple[int, int]]:
+    """
+    (mtime_ns, tamaño) del manifiesto, para detectar cambios sin leerlo; None si no existe.
+    """
+    try:
+        st = (Path(registry_dir) / MANIFEST_FILE).stat()
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _next_version(manifest: dict) -> str:
+    numbers = [int(m.group(1)) for v in manifest["versions"] if (m := re.fullmatch(r"v(\d+)", v))]
+    return f"v{max(numbers, default=0) + 1}"
+
+
+def check_parity(model: Any, exported: CompiledEnsemble, X: Optional[np.ndarray] = None, name: str = "modelo exportado") -> None:
+    """
+    Falla si exported no da las mismas probabilidades que el modelo sklearn sobre X (o el
+    batch sintético de warm_up).
+    """
+    X = validation_batch(exported.n_features) if X is None else np.asarray(X, dtype=np.float64)
+    with warnings.catch_warnings():
+        # Modelo entrenado con DataFrame, batch como array (igual que en la API)
+        warnings.filterwarnings("ignore", message="X does not have valid feature names")
+        expected = model.predict_proba(X)[:, 1]
+    max_diff = float(np.max(np.abs(exported.predict_proba(X)[:, 1] - expected)))
+    if max_diff > PARITY_TOL:
+        raise ValueError(f"{name} no coincide con el modelo sklearn (max_abs_diff={max_diff} > {PARITY_TOL})")
+
+
+def export_fast_formats(model: Any, columns, out_dir: Path, X: Optional[np.ndarray] = None) -> bool:
+    """
+    Escribe model_compiled.npz y model_flat.bin exportados de model y verifica que los
+    archivos guardados den las mismas probabilidades que sklearn sobre X (o el batch
+    sintético de warm_up). False si el modelo no se puede exportar (solo se servirá joblib).
+    """
+    try:
+        compiled = export_hist_gradient_boosting(model, columns)
+    except ValueError:
+        return False
+    out_dir = Path(out_dir)
+    compiled.save(out_dir / COMPILED_FILE)
+    compiled.save_flat(out_dir / FLAT_FILE)
+
+    for name, loaded in [(COMPILED_FILE, CompiledEnsemble.load(out_dir / COMPILED_FILE)), (FLAT_FILE, CompiledEnsemble.load_flat(out_dir / FLAT_FILE))]:
+        check_parity(model, loaded, X, name)
+    return True
+
+
+def publish(
+    registry_dir: Path,
+    model_path: Path,
+    columns_path: Path,
+    warmup: Optional[np.ndarray] = None,
+    version: Optional[str] = None,
+    activate: bool = True,
+    metadata: Optional[dict] = None,
+) -> str:
+    """
+    Copia el modelo (joblib) y sus columnas a una nueva versión del registro, exporta de ese
+    mismo modelo los formatos compiled y flat (nunca se copian de artifacts/, donde pueden
+    ser de un entrenamiento anterior) y la registra en el manifiesto (y la activa, si
+    activate). La carpeta de la versión se arma aparte y se renombra al final, así que el
+    servicio nunca ve una versión a medio copiar.
+    """
+    import joblib
+
+    registry_dir = Path(registry_dir)
+    registry_dir.mkdir(parents=True, exist_ok=True)
+    manifest = read_manifest(registry_dir)
+    version = version or _next_version(manifest)
+    if version in manifest["versions"] or (registry_dir / version).exists():
+        raise ValueError(f"La versión '{version}' ya existe en {registry_dir}")
+
+    tmp_dir = Path(tempfile.mkdtemp(dir=registry_dir, prefix=f".{version}_"))
+    try:
+        shutil.copy2(model_path, tmp_dir / MODEL_FILE)
+        shutil.copy2(columns_path, tmp_dir / COLUMNS_FILE)
+        if warmup is not None:
+            np.save(tmp_dir / WARMUP_FILE, np.asarray(warmup, dtype=np.float64))
+        fast = export_fast_formats(joblib.load(tmp_dir / MODEL_FILE), joblib.load(tmp_dir / COLUMNS_FILE), tmp_dir, warmup)
+        os.replace(tmp_dir, registry_dir / version)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    manifest["versions"][version] = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "compiled": fast,
+        "flat": fast,
+        **(metadata or {}),
+    }
+    if activate:
+        manifest["active"] = version
+    write_manifest(registry_dir, manifest)
+    return version
+
+
+def activate(registry_dir: Path, version: str) -> None:
+    """
+    Marca una versión existente como activa (también sirve para volver a una anterior).
+    """
+    manifest = read_manifest(registry_dir)
+    if version not in manifest["versions"]:
+        raise KeyError(f"Versión desconocida: '{version}'. Opciones: {list(manifest['versions'])}")
+    manifest["active"] = version
+    write_manifest(registry_dir, manifest)
+
+
+# -------------------------------------------------------------------------
+# Carga y validación
+# -------------------------------------------------------------------------
+
+def model_memory_bytes(model: Any) -> int:
+    """
+    Memoria aproximada del modelo: bytes de sus arrays NumPy si es un CompiledEnsemble, o
+    tamaño serializado (pickle) para otros modelos.
+    """
+    arrays = [v for v in vars(model).values() if isinstance(v, np.ndarray)] if hasattr(model, "__dataclass_fields__") else []
+    if arrays:
+        return int(sum(a.nbytes for a in arrays))
+    return len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def load_model(
+    model_path: Path,
+    columns_path: Path,
+    compiled_path: Optional[Path] = None,
+    model_format: str = "auto",
+    version: str = "artifacts",
+    metadata: Optional[dict] = None,
+    flat_path: Optional[Path] = None,
+) -> ModelBundle:
+    """
+    Carga un modelo en el formato pedido; con "auto", el primero que exista de flat
+    (memory-map, ver CompiledEnsemble.save_flat), compiled (.npz) y joblib. Solo el joblib
+    importa sklearn (al deserializar el estimador).
+    """
+    if model_format not in MODEL_FORMATS:
+        raise ValueError(f"MODEL_FORMAT inválido: {model_format} (opciones: {', '.join(MODEL_FORMATS)})")
+
+    def available(path: Optional[Path]) -> bool:
+        return path is not None and Path(path).exists()
+
+    if model_format == "auto":
+        model_format = "flat" if available(flat_path) else "compiled" if available(compiled_path) else "joblib"
+
+    t0 = time.perf_counter()
+    if model_format == "flat":
+        model, path = CompiledEnsemble.load_flat(flat_path), Path(flat_path)
+        columns = tuple(model.columns)
+    elif model_format == "compiled":
+        model, path = CompiledEnsemble.load(compiled_path), Path(compiled_path)
+        columns = tuple(model.columns)
+    else:
+        import joblib
+
+        model, path = joblib.load(model_path), Path(model_path)
+        columns = tuple(joblib.load(columns_path))
+
+    return ModelBundle(
+        version=version,
+        model=model,
+        columns=columns,
+        builder=FeatureVectorBuilder(columns),
+        format=model_format,
+        path=path,
+        loaded_at=time.time(),
+        load_seconds=time.perf_counter() - t0,
+        memory_bytes=model_memory_bytes(model),
+        metadata=metadata or {},
+    )
+
+
+def load_version(registry_dir: Path, version: Optional[str] = None, model_format: str = "auto") -> ModelBundle:
+    """
+    Carga una versión del registro (por defecto la activa) y la valida con warm_up.
+    """
+    registry_dir = Path(registry_dir)
+    manifest = read_manifest(registry_dir)
+    version = version or manifest["active"]
+    if version is None:
+        raise ValueError(f"El registro {registry_dir} no tiene versión activa")
+    if version not in manifest["versions"]:
+        raise KeyError(f"Versión desconocida: '{version}'. Opciones: {list(manifest['versions'])}")
+
+    version_dir = registry_dir / version
+    bundle = load_model(
+        version_dir / MODEL_FILE,
+        version_dir / COLUMNS_FILE,
+        version_dir / COMPILED_FILE,
+        model_format=model_format,
+        version=version,
+        metadata=manifest["versions"][version],
+        flat_path=version_dir / FLAT_FILE,
+    )
+    warmup_path = version_dir / WARMUP_FILE
+    warm_up(bundle, np.load(warmup_path) if warmup_path.exists() else None)
+    return bundle
+
+
+def validation_batch(n_features: int) -> np.ndarray:
+    # Filas sintéticas: la mitad todo NaN y la mitad todo cero
+    X = np.full((WARMUP_ROWS, n_features), np.nan)
+    X[WARMUP_ROWS // 2:] = 0.0
+    return X
+
+
+def warm_up(bundle: ModelBundle, X: Optional[np.ndarray] = None) -> None:
+    """
+    Valida un modelo antes de servirlo con un batch de prueba (X, o filas sintéticas: todo
+    NaN y todo cero). Falla si predict_proba no devuelve probabilidades válidas; además deja
+    el modelo "caliente" (primeras llamadas, páginas cargadas) antes del cambio.
+    """
+    n = len(bundle.columns)
+    if X is None:
+        X = validation_batch(n)
+    if X.ndim != 2 or X.shape[1] != n:
+        raise ValueError(f"[{bundle.version}] batch de validación con forma {X.shape}; se esperaban {n} columnas")
+
+    proba = np.asarray(bundle.model.predict_proba(X))
+    if proba.shape != (X.shape[0], 2):
+        raise ValueError(f"[{bundle.version}] predict_proba devolvió forma {proba.shape}; se esperaba {(X.shape[0], 2)}")
+    if not np.all(np.isfinite(proba)) or proba.min() < 0 or proba.max() > 1:
+        raise ValueError(f"[{bundle.version}] predict_proba devolvió probabilidades fuera de [0, 1]")
@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import math
+from typing import Any, Callable, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .config import KEYS, TARGET_COL
+from .features import (
+    BB_STATUS_SEVERITY,
+    FEATURE_GROUPS,
+    Agg,
+    FeatureGroup,
+    derive_bureau_balance,
+    derive_credit_card,
+    derive_installments,
+    derive_late_flags,
+    finalize_bureau,
+    table_columns,
+)
+
+
+# Columnas que usa cada tabla de historial (las demás columnas de los registros se ignoran)
+HISTORY_COLUMNS = table_columns(FEATURE_GROUPS)
+
+# Tablas de historial que recibe /predict/raw (nombres lógicos de config.FILES)
+HISTORY_TABLES = tuple(HISTORY_COLUMNS)
+
+# Columnas de una tabla: nombre -> array (float64 para numéricas, object para strings)
+Columns = dict[str, np.ndarray]
+
+
+# -------------------------------------------------------------------------
+# Columnas derivadas (equivalentes NumPy de las de src/features.py)
+# -------------------------------------------------------------------------
+
+def numpy_bureau_balance(bb: Columns) -> Columns:
+    bb["status_severity"] = np.array([BB_STATUS_SEVERITY.get(s, 0) for s in bb["STATUS"]], dtype=np.int8)
+    return bb
+
+
+def numpy_late_flags(df: Columns) -> Columns:
+    dpd = df["SK_DPD"]
+    with np.errstate(invalid="ignore"):
+        df["is_late"] = (dpd > 0).astype(np.int8)
+    df["late_days"] = dpd
+    return df
+
+
+def numpy_installments(inst: Columns) -> Columns:
+    delay = inst["DAYS_ENTRY_PAYMENT"] - inst["DAYS_INSTALMENT"]
+    inst["days_delay"] = delay
+    with np.errstate(invalid="ignore"):
+        inst["is_late"] = (delay > 0).astype(np.int8)
+        inst["is_early"] = (delay < 0).astype(np.int8)
+    inst["payment_diff"] = inst["AMT_PAYMENT"] - inst["AMT_INSTALMENT"]
+    return inst
+
+
+def numpy_credit_card(cc: Columns) -> Columns:
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cc["utilization"] = cc["AMT_BALANCE"] / cc["AMT_CREDIT_LIMIT_ACTUAL"]
+    return numpy_late_flags(cc)
+
+
+def numpy_finalize_bureau(out: dict[str, Any]) -> dict[str, Any]:
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out["bureau_debt_to_credit_ratio"] = np.float64(out["bureau_AMT_CREDIT_SUM_DEBT_sum"]) / np.float64(out["bureau_AMT_CREDIT_SUM_sum"])
+    return out
+
+
+# derive / finalize de pandas -> equivalente NumPy. Los que no tienen equivalente se aplican
+# pasando por un DataFrame (más lento, mismo resultado).
+NUMPY_DERIVE: dict[Callable, Callable[[Columns], Columns]] = {
+    derive_bureau_balance: numpy_bureau_balance,
+    derive_late_flags: numpy_late_flags,
+    derive_installments: numpy_installments,
+    derive_credit_card: numpy_credit_card,
+}
+
+NUMPY_FINALIZE: dict[Callable, Callable[[dict[str, Any]], dict[str, Any]]] = {
+    finalize_bureau: numpy_finalize_bureau,
+}
+
+
+def _derive(group: FeatureGroup, columns: Columns) -> Columns:
+    if group.derive is None:
+        return columns
+    fn = NUMPY_DERIVE.get(group.derive)
+    if fn is not None:
+        return fn(dict(columns))
+    df = group.derive(pd.DataFrame(columns))
+    return {c: df[c].to_numpy() for c in df.columns}
+
+
+def _finalize(group: FeatureGroup, out: dict[str, Any]) -> dict[str, Any]:
+    if group.finalize is None:
+        return out
+    fn = NUMPY_FINALIZE.get(group.finalize)
+    if fn is not None:
+        return fn(out)
+    return group.finalize(pd.DataFrame([out])).iloc[0].to_dict()
+
+
+# -------------------------------------------------------------------------
+# Agregaciones de un grupo (mismos algoritmos que groupby de pandas)
+# -------------------------------------------------------------------------
+
+def _kahan_sum(values: np.ndarray) -> float:
+    """
+    Suma compensada (Kahan) en el orden de las filas, como group_sum / group_mean de pandas;
+    así el resultado es idéntico bit a bit al del pipeline batch.
+    """
+    total, compensation = 0.0, 0.0
+    for value in values.tolist():
+        y = value - compensation
+        t = total + y
+        compensation = t - total - y
+        if compensation != compensation:
+            # Con valores infinitos la compensación es NaN (pandas la reinicia)
+            compensation = 0.0
+        total = t
+    return total
+
+
+def _variance(values: np.ndarray) -> float:
+    # Welford, como group_var de pandas (ddof=1)
+    n, mean, ssqdm = 0, 0.0, 0.0
+    for value in values.tolist():
+        n += 1
+        old = mean
+        mean += (value - old) / n
+        ssqdm += (value - mean) * (value - old)
+    return ssqdm / (n - 1) if n > 1 else math.nan
+
+
+def aggregate_values(values: np.ndarray, func: str):
+    """
+    Una agregación de pandas sobre las filas de un grupo (NaN ignorados).
+    """
+    if values.dtype.kind == "f":
+        values = values[~np.isnan(values)]
+    n = values.shape[0]
+
+    if func == "count":
+        return n
+    if func == "sum":
+        return _kahan_sum(values) if values.dtype.kind == "f" else int(values.sum())
+    if func == "mean":
+        return _kahan_sum(values.astype(np.float64)) / n if n else math.nan
+    if func in ("min", "max"):
+        if n == 0:
+            return math.nan
+        return values.min() if func == "min" else values.max()
+    if func in ("var", "std"):
+        var = _variance(values.astype(np.float64))
+        return var if func == "var" else math.sqrt(var)
+    raise ValueError(f"Función no soportada: '{func}'")
+
+
+def _aggregate(columns: Columns, aggs: dict[str, Agg], rows: Optional[np.ndarray] = None) -> dict[str, Any]:
+    return {
+        name: aggregate_values(columns[col] if rows is None else columns[col][rows], func)
+        for name, (col, func) in aggs.items()
+    }
+
+
+def aggregate_customer(group: FeatureGroup, table: Columns, mapping: Optional[Columns] = None) -> Optional[dict[str, Any]]:
+    """
+    Features de un grupo para un solo cliente (sus filas en table; mapping = sus filas de la
+    tabla de mapeo), o None si el pipeline batch no le daría fila en feat_<name>.
+
+    Primer nivel por key en el orden de las filas; el segundo nivel recorre el mapeo en su
+    orden, como el left merge + groupby de features.rollup.
+    """
+    missing = [c for c in group.required if c not in table]
+    if missing:
+        raise ValueError(f"[{group.table}] faltan columnas requeridas: {missing}")
+
+    table = _derive(group, table)
+    keys = table[group.key]
+    valid = ~np.isnan(keys) if keys.dtype.kind == "f" else np.ones(keys.shape[0], dtype=bool)
+
+    if group.rollup_aggs is None:
+        if not valid.any():
+            return None
+        out = _aggregate(table, group.aggs, None if valid.all() else np.flatnonzero(valid))
+        return _finalize(group, out)
+
+    if mapping is None:
+        raise ValueError(f"[{group.name}] requiere la tabla de mapeo {group.mapping_table}")
+    map_keys = mapping[group.key]
+    if map_keys.shape[0] == 0:
+        return None
+
+    # Primer nivel: una fila por key (con filas), en el orden de aparición
+    first: dict[Any, dict[str, Any]] = {}
+    for key in dict.fromkeys(keys[valid].tolist()):
+        first[key] = _aggregate(table, group.aggs, np.flatnonzero(keys == key))
+
+    # Segundo nivel sobre el mapeo (keys sin filas -> NaN, como en el merge)
+    merged = {
+        name: np.array([first[k][name] if k in first else math.nan for k in map_keys.tolist()], dtype=np.float64)
+        for name in group.aggs
+    }
+    return _finalize(group, _aggregate(merged, group.rollup_aggs))
+
+
+# -------------------------------------------------------------------------
+# Cliente completo
+# -------------------------------------------------------------------------
+
+def records_columns(table: str, records: Sequence[Mapping[str, Any]]) -> Columns:
+    """
+    Columnas de los registros crudos de una tabla: exactamente las que usan los grupos de
+    features (ausentes o None -> NaN, igual que un nulo en el parquet). Las columnas con
+    strings quedan como arrays object.
+    """
+    columns = {}
+    for name in HISTORY_COLUMNS[table]:
+        values = [r.get(name) for r in records]
+        try:
+            columns[name] = np.array(values, dtype=np.float64)
+        except (TypeError, ValueError):
+            columns[name] = np.array(values, dtype=object)
+    return columns
+
+
+def customer_features(
+    application: Mapping[str, Any],
+    history: Mapping[str, Sequence[Mapping[str, Any]]],
+    sk_id_curr: Optional[int] = None,
+) -> dict[str, Any]:
+    """
+    Features de un solo cliente a partir de su fila de application y su historial crudo
+    ({tabla: [registros]}), con las mismas especificaciones que el pipeline batch
+    (src/features.FEATURE_GROUPS): mismas columnas derivadas, mismas agregaciones y mismo
+    orden de suma, así que los valores son idénticos a los de model_X.
+
+    Ruta rápida de un cliente: NumPy y Python sobre unas pocas filas, sin DataFrames. Las
+    filas de bureau / previous_application se asignan al cliente aunque no traigan
+    SK_ID_CURR. Un grupo sin filas deja sus features ausentes (NaN), igual que el left join
+    de 08_merge_all.py para un cliente sin historial en esa tabla.
+    """
+    curr = KEYS["SK_ID_CURR"]
+    unknown = [t for t in history if t not in HISTORY_TABLES]
+    if unknown:
+        raise ValueError(f"Tablas desconocidas: {unknown}. Opciones: {list(HISTORY_TABLES)}")
+
+    if sk_id_curr is None:
+        sk_id_curr = application.get(curr)
+    customer = 0 if sk_id_curr is None else int(sk_id_curr)
+
+    tables = {t: records_columns(t, history.get(t) or []) for t in HISTORY_TABLES}
+    for columns in tables.values():
+        if curr in columns:
+            columns[curr] = np.full(columns[curr].shape[0], customer, dtype=np.int64)
+
+    features = {k: v for k, v in application.items() if k != TARGET_COL}
+    for group in FEATURE_GROUPS:
+        mapping = tables[group.mapping_table] if group.mapping_table is not None else None
+        out = aggregate_customer(group, tables[group.table], mapping)
+        if out is not None:
+            features.update(out)
+    return features
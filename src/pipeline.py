@@ -0,0 +1,408 @@
+from __future__ import annotations
+
+import argparse
+import ast
+import hashlib
+import importlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Optional
+
+from .artifact_cache import code_version
+from .config import (
+    AGGREGATION_METHOD,
+    ARTIFACTS_DIR,
+    FEATURES_STREAMING,
+    FILES,
+    INTERIM_DIR,
+    MERGE_METHOD,
+    PROCESSED_DIR,
+    PROJECT_ROOT,
+    RAW_DIR,
+)
+from .features import FEATURE_GROUPS, group_functions, group_spec
+
+
+STATE_PATH = PROCESSED_DIR / "pipeline_state.json"
+LOGS_DIR = INTERIM_DIR / "pipeline_logs"
+
+# Configuración por variable de entorno que cambia lo que producen los scripts
+SETTINGS = {
+    "AGGREGATION_METHOD": AGGREGATION_METHOD,
+    "MERGE_METHOD": MERGE_METHOD,
+    "FEATURES_STREAMING": FEATURES_STREAMING,
+}
+
+
+@dataclass(frozen=True)
+class Node:
+    """
+    Un paso del pipeline: un script que lee inputs y escribe outputs (rutas absolutas).
+    code / params: funciones y parámetros que cambian la salida además del script y lo que
+    importa de src (ej: la especificación de un grupo de features).
+    """
+    name: str
+    script: str
+    deps: tuple[str, ...] = ()
+    inputs: tuple[Path, ...] = ()
+    outputs: tuple[Path, ...] = ()
+    code: tuple[Callable, ...] = ()
+    params: dict = field(default_factory=dict, compare=False)
+
+
+@dataclass
+class NodeResult:
+    name: str
+    status: str  # ran | skipped | failed | blocked
+    seconds: float = 0.0
+    peak_rss_mb: Optional[float] = None
+    log: Optional[Path] = None
+
+
+def _raw(name: str) -> Path:
+    return RAW_DIR / FILES[name]
+
+
+def _processed(*names: str) -> tuple[Path, ...]:
+    return tuple(PROCESSED_DIR / n for n in names)
+
+
+SPLIT_FILES = _processed(
+    "X_train.parquet", "y_train.parquet",
+    "X_valid.parquet", "y_valid.parquet",
+    "X_test.parquet", "y_test.parquet",
+)
+
+FEATURE_SCRIPTS = {
+    "bureau": "02_data_preparation/02_feature_bureau.py",
+    "bureau_balance": "02_data_preparation/03_feature_bureau_balance.py",
+    "previous_application": "02_data_preparation/04_feature_previous.py",
+    "pos_cash": "02_data_preparation/05_feature_pos_cash.py",
+    "installments": "02_data_preparation/06_feature_installments.py",
+    "credit_card": "02_data_preparation/07_feature_credit_card.py",
+}
+
+
+def build_dag() -> dict[str, Node]:
+    """
+    base -> grupos de features -> merge -> split -> train -> save.
+    Los grupos de features no dependen entre sí ni de base.
+    """
+    nodes = [
+        Node(
+            name="base",
+            script="02_data_preparation/01_build_base.py",
+            inputs=(_raw("application"),),
+            outputs=_processed("base_X.parquet", "base_y.parquet", "base_metadata.json"),
+        ),
+    ]
+
+    for g in FEATURE_GROUPS:
+        inputs = [_raw(g.table)]
+        if g.mapping_table is not None:
+            inputs.append(_raw(g.mapping_table))
+        nodes.append(Node(
+            name=g.output_name,
+            script=FEATURE_SCRIPTS[g.name],
+            inputs=tuple(inputs),
+            outputs=_processed(f"{g.output_name}.parquet"),
+            code=tuple(group_functions(g)),
+            params={"spec": group_spec(g)},
+        ))
+
+    feat_nodes = tuple(g.output_name for g in FEATURE_GROUPS)
+    nodes += [
+        Node(
+            name="merge",
+            script="02_data_preparation/08_merge_all.py",
+            deps=("base",) + feat_nodes,
+            inputs=_processed("base_X.parquet", "base_y.parquet") + tuple(
+                PROCESSED_DIR / f"{n}.parquet" for n in feat_nodes
+            ),
+            outputs=_processed("model_X.parquet", "model_y.parquet", "model_metadata.json"),
+        ),
+        Node(
+            name="split",
+            script="02_data_preparation/09_split_train_valid_test.py",
+            deps=("merge",),
+            inputs=_processed("model_X.parquet", "model_y.parquet"),
+            outputs=SPLIT_FILES + _processed("split_metadata.json"),
+        ),
+        Node(
+            name="train_baseline",
+            script="03_modeling/01_train_baseline.py",
+            deps=("split",),
+            inputs=SPLIT_FILES[:4],
+            outputs=(ARTIFACTS_DIR / "metrics_baseline.json",),
+        ),
+        Node(
+            name="train_champion",
+            script="03_modeling/02_train_champion.py",
+            deps=("split",),
+            inputs=SPLIT_FILES[:4],
+            outputs=(ARTIFACTS_DIR / "metrics_champion.json",),
+        ),
+        Node(
+            name="compare",
+            script="03_modeling/03_compare_models.py",
+            deps=("train_baseline", "train_champion"),
+            inputs=(ARTIFACTS_DIR / "metrics_baseline.json", ARTIFACTS_DIR / "metrics_champion.json"),
+            outputs=(ARTIFACTS_DIR / "model_comparison.csv",),
+        ),
+        Node(
+            name="evaluate_test",
+            script="03_modeling/04_evaluate_on_test.py",
+            deps=("split",),
+            inputs=SPLIT_FILES,
+        ),
+        Node(
+            name="save_model",
+            script="05_deployment/train_and_save_model.py",
+            deps=("split",),
+            inputs=SPLIT_FILES[:4],
+            outputs=(ARTIFACTS_DIR / "champion_model.joblib", ARTIFACTS_DIR / "champion_numeric_cols.joblib"),
+        ),
+    ]
+
+    dag = {n.name: n for n in nodes}
+    for n in nodes:
+        unknown = [d for d in n.deps if d not in dag]
+        if unknown:
+            raise ValueError(f"[{n.name}] dependencias desconocidas: {unknown}")
+    return dag
+
+
+def _script_imports(script: Path) -> tuple[list, dict]:
+    """
+    Lo que el script importa de src ("from src.x import ..."): funciones y clases (su código
+    lo sigue code_version) y el valor de las constantes simples.
+    """
+    refs, constants = [], {}
+    for node in ast.walk(ast.parse(script.read_text(encoding="utf-8"))):
+        if not isinstance(node, ast.ImportFrom) or not (node.module or "").startswith("src"):
+            continue
+        module = importlib.import_module(node.module)
+        for alias in node.names:
+            obj = getattr(module, alias.name)
+            if callable(obj):
+                refs.append(obj)
+                continue
+            try:
+                constants[f"{node.module}.{alias.name}"] = json.dumps(obj, sort_keys=True)
+            except TypeError:
+                pass  # estructuras con objetos (ej: FEATURE_GROUPS): como en code_version
+    return refs, constants
+
+
+def node_fingerprint(node: Node) -> str:
+    """
+    Huella de código (el script, las funciones de src que importa y todo lo que éstas usan,
+    ver artifact_cache.code_version), configuración (SETTINGS, constantes importadas y
+    params del nodo) e inputs (tamaño y mtime de cada archivo).
+    """
+    script = PROJECT_ROOT / node.script
+    refs, constants = _script_imports(script)
+    code = code_version(script, *refs, *node.code)
+
+    inputs = []
+    for p in node.inputs:
+        if p.exists():
+            st = p.stat()
+            inputs.append([str(p), st.st_size, st.st_mtime_ns])
+        else:
+            inputs.append([str(p), None, None])
+
+    payload = json.dumps(
+        {"code": code, "settings": SETTINGS, "constants": constants, "params": node.params, "inputs": inputs},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def available_cores() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _peak_rss_mb(ru_maxrss: int) -> float:
+    # ru_maxrss: KB en Linux, bytes en macOS
+    return ru_maxrss / (1024 * 1024) if sys.platform == "darwin" else ru_maxrss / 1024
+
+
+def run_node(node: Node, run_id: Optional[str] = None) -> NodeResult:
+    """
+    Ejecuta el script del nodo en un proceso aparte; la salida va a un log por nodo.
+    run_id agrupa los spans de perfilado de todos los nodos de una ejecución del DAG.
+    """
+    LOGS_DIR.mkdir(parents=True, exist_ok=True)
+    log_path = LOGS_DIR / f"{node.name}.log"
+
+    t0 = time.perf_counter()
+    with open(log_path, "w") as log:
+        proc = subprocess.Popen(
+            [sys.executable, str(PROJECT_ROOT / node.script)],
+            cwd=PROJECT_ROOT,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            env={**os.environ, "PROFILE_RUN_ID": run_id} if run_id else None,
+        )
+        peak = None
+        if hasattr(os, "wait4"):
+            # wait4 devuelve el uso de recursos de ese hijo en particular (pico de RSS incluido)
+            _, status, usage = os.wait4(proc.pid, 0)
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            peak = _peak_rss_mb(usage.ru_maxrss)
+        else:
+            proc.wait()
+
+    status = "ran" if proc.returncode == 0 else "failed"
+    return NodeResult(node.name, status, time.perf_counter() - t0, peak, log_path)
+
+
+def _load_state() -> dict:
+    if STATE_PATH.exists():
+        with open(STATE_PATH) as f:
+            return json.load(f)
+    return {}
+
+
+def _save_state(state: dict) -> None:
+    STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = STATE_PATH.with_suffix(".json.tmp")
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp, STATE_PATH)
+
+
+def select_nodes(dag: dict[str, Node], targets: Optional[list[str]]) -> list[str]:
+    """
+    Nodos objetivo más todas sus dependencias (todo el DAG si targets es None).
+    """
+    if not targets:
+        return list(dag)
+    unknown = [t for t in targets if t not in dag]
+    if unknown:
+        raise KeyError(f"Nodos desconocidos: {unknown}. Opciones: {list(dag)}")
+
+    selected: dict[str, None] = {}
+    stack = list(targets)
+    while stack:
+        name = stack.pop()
+        if name not in selected:
+            selected[name] = None
+            stack.extend(dag[name].deps)
+    return [n for n in dag if n in selected]
+
+
+def run_pipeline(
+    targets: Optional[list[str]] = None,
+    jobs: Optional[int] = None,
+    force: bool = False,
+    dry_run: bool = False,
+) -> list[NodeResult]:
+    """
+    Ejecuta el DAG: cada nodo corre apenas terminan sus dependencias, hasta `jobs`
+    procesos en paralelo (por defecto, uno por núcleo). Un nodo se salta si su huella
+    (código + inputs) es la misma de la última ejecución exitosa y sus outputs existen,
+    y ninguna de sus dependencias se volvió a ejecutar.
+    """
+    dag = build_dag()
+    names = select_nodes(dag, targets)
+    jobs = jobs or available_cores()
+
+    state = _load_state()
+    run_id = f"{time.strftime('%Y%m%dT%H%M%S')}-pipeline"
+    results: dict[str, NodeResult] = {}
+    pending = set(names)
+    running = {}
+
+    def ready(name: str) -> bool:
+        return all(d in results for d in dag[name].deps if d in names)
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while pending or running:
+            for name in sorted(n for n in pending if ready(n)):
+                pending.discard(name)
+                node = dag[name]
+                deps = [results[d] for d in node.deps if d in results]
+
+                if any(r.status in ("failed", "blocked") for r in deps):
+                    results[name] = NodeResult(name, "blocked")
+                    continue
+
+                fp = node_fingerprint(node)
+                upstream_ran = any(r.status in ("ran", "would_run") for r in deps)
+                up_to_date = (
+                    state.get(name) == fp
+                    and all(p.exists() for p in node.outputs)
+                    and not upstream_ran
+                )
+                if (up_to_date and not force) or dry_run:
+                    status = "skipped" if up_to_date else "would_run"
+                    results[name] = NodeResult(name, status)
+                    print(f"[{status}] {name}")
+                    continue
+
+                print(f"[start] {name}")
+                running[pool.submit(run_node, node, run_id)] = name
+
+            if not running:
+                continue
+
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for fut in done:
+                name = running.pop(fut)
+                res = fut.result()
+                results[name] = res
+
+                rss = f"{res.peak_rss_mb:.0f} MB" if res.peak_rss_mb is not None else "n/a"
+                print(f"[{res.status}] {name}: {res.seconds:.1f}s, peak RSS {rss} (log: {res.log})")
+
+                if res.status == "ran":
+                    state[name] = node_fingerprint(dag[name])
+                else:
+                    state.pop(name, None)
+                _save_state(state)
+
+    return [results[n] for n in names]
+
+
+def print_summary(results: list[NodeResult], wall: float) -> None:
+    print("\nPIPELINE SUMMARY")
+    print(f"{'node':28s} {'status':10s} {'wall_s':>8s} {'peak_rss_mb':>12s}")
+    for r in results:
+        rss = f"{r.peak_rss_mb:.0f}" if r.peak_rss_mb is not None else "-"
+        print(f"{r.name:28s} {r.status:10s} {r.seconds:8.1f} {rss:>12s}")
+    total = sum(r.seconds for r in results)
+    print(f"\nSum of node times: {total:.1f}s, pipeline wall time: {wall:.1f}s")
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Ejecuta el pipeline completo como DAG.")
+    parser.add_argument("targets", nargs="*", help="Nodos a construir (con sus dependencias). Por defecto, todos.")
+    parser.add_argument("--jobs", type=int, default=None, help="Procesos en paralelo (por defecto, núcleos disponibles).")
+    parser.add_argument("--force", action="store_true", help="Ejecuta aunque la huella no haya cambiado.")
+    parser.add_argument("--dry-run", action="store_true", help="Solo muestra qué se ejecutaría.")
+    parser.add_argument("--list", action="store_true", help="Lista los nodos y sus dependencias.")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for node in build_dag().values():
+            print(f"{node.name:28s} <- {', '.join(node.deps) or '-'}")
+        return 0
+
+    t0 = time.perf_counter()
+    results = run_pipeline(args.targets or None, jobs=args.jobs, force=args.force, dry_run=args.dry_run)
+    print_summary(results, time.perf_counter() - t0)
+    return 1 if any(r.status in ("failed", "blocked") for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import argparse
+import cProfile
+import json
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from itertools import count
+from pathlib import Path
+from typing import Iterator, Optional
+
+from .config import PROFILE_DIR, PROFILE_ENABLED, PROFILE_LOG, PROFILE_STAGES, PROFILE_TOOLS
+from .utils import peak_rss_bytes, process_memory
+
+
+PROFILE_TOOL_NAMES = ("cprofile", "tracemalloc")
+TRACEMALLOC_FRAMES = 10
+TOP_N = 40
+
+MB = 1e6
+
+# Etapa en curso (la fija stage()); los procesos hijos de sharding la heredan con el fork.
+# Con tracemalloc: pico de toda la etapa y snapshot del cierre de span con más memoria viva.
+_stage = {"name": None, "run_id": None, "traced_peak": 0, "snapshot": None, "snapshot_traced": 0, "snapshot_span": None}
+_span_ids = count(1)
+_current: ContextVar[Optional[dict]] = ContextVar("profiling_span", default=None)
+
+
+def _write(record: dict) -> None:
+    PROFILE_LOG.parent.mkdir(parents=True, exist_ok=True)
+    line = (json.dumps(record, default=str) + "\n").encode()
+    # Una sola escritura en modo append: las líneas de procesos paralelos no se mezclan
+    fd = os.open(PROFILE_LOG, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def span(name: str, **attrs) -> Iterator[dict]:
+    """
+    Un paso medido de una etapa (load, derive, aggregate, merge, write, fit, predict, ...).
+    attrs se guardan con el span y se pueden completar adentro del bloque:
+
+        with span("load", table="bureau") as s:
+            df = ...
+            s["rows"] = len(df)
+
+    Al salir se agrega una línea a PROFILE_LOG con tiempo de pared, CPU del proceso, RSS al
+    entrar y al salir, cuánto subió el pico de RSS y, si tracemalloc está activo, el pico de
+    memoria asignada por Python dentro del span. Los spans anidados guardan su padre.
+    """
+    if not PROFILE_ENABLED:
+        yield attrs
+        return
+
+    parent = _current.get()
+    record = {"span_id": f"{os.getpid()}-{next(_span_ids)}", "parent_id": parent["span_id"] if parent else None}
+    token = _current.set(record)
+
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        traced, peak = tracemalloc.get_traced_memory()
+        if parent is not None:
+            # reset_peak borra el pico del padre: se lo guarda antes
+            parent["_peak"] = max(parent.get("_peak", 0), peak)
+        tracemalloc.reset_peak()
+        record["_traced_start"] = traced
+
+    rss_start, peak_start = process_memory()[1], peak_rss_bytes()
+    cpu_start, t0, started = time.process_time(), time.perf_counter(), time.time()
+    status = "ok"
+    try:
+        yield attrs
+    except BaseException as e:
+        status = f"error: {type(e).__name__}"
+        raise
+    finally:
+        wall = time.perf_counter() - t0
+        cpu = time.process_time() - cpu_start
+        _current.reset(token)
+
+        out = {
+            "run_id": _stage["run_id"],
+            "stage": _stage["name"],
+            "span": name,
+            **attrs,
+            "span_id": record["span_id"],
+            "parent_id": record["parent_id"],
+            "pid": os.getpid(),
+            "start": started,
+            "wall_s": wall,
+            "cpu_s": cpu,
+            "rss_start_mb": rss_start / MB,
+            "rss_end_mb": process_memory()[1] / MB,
+            "peak_rss_mb": peak_rss_bytes() / MB,
+            "peak_rss_growth_mb": (peak_rss_bytes() - peak_start) / MB,
+            "status": status,
+        }
+        if tracing and tracemalloc.is_tracing():
+            traced, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, record.get("_peak", 0))
+            out["py_alloc_peak_mb"] = (peak - record["_traced_start"]) / MB
+            if parent is not None:
+                parent["_peak"] = max(parent.get("_peak", 0), peak)
+            _stage["traced_peak"] = max(_stage["traced_peak"], peak)
+            if traced > _stage["snapshot_traced"]:
+                # Lo que sigue vivo al cerrar el span (ej. el DataFrame recién cargado)
+                _stage.update(snapshot=tracemalloc.take_snapshot(), snapshot_traced=traced, snapshot_span=f"{name} {attrs}")
+        _write(out)
+
+
+def stage_name(script: str) -> str:
+    path = Path(script).resolve()
+    return f"{path.parent.name}/{path.stem}"
+
+
+def _selected_tools(name: str) -> list[str]:
+    stem = name.split("/")[-1]
+    if not ("all" in PROFILE_STAGES or name in PROFILE_STAGES or stem in PROFILE_STAGES):
+        return []
+    unknown = [t for t in PROFILE_TOOLS if t not in PROFILE_TOOL_NAMES]
+    if unknown:
+        raise ValueError(f"PROFILE_TOOLS desconocidas: {unknown}. Opciones: {PROFILE_TOOL_NAMES}")
+    return list(PROFILE_TOOLS)
+
+
+def _save_cprofile(profiler: cProfile.Profile, prefix: Path) -> None:
+    prof_path = prefix.with_suffix(".prof")
+    profiler.dump_stats(prof_path)
+    with open(prefix.with_name(prefix.name + "_cprofile.txt"), "w") as f:
+        pstats.Stats(profiler, stream=f).sort_stats("cumulative").print_stats(TOP_N)
+    print(f"[OK] cProfile saved to: {prof_path}")
+
+
+TRACEMALLOC_IGNORE = [
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, cProfile.__file__),
+    tracemalloc.Filter(False, pstats.__file__),
+]
+
+
+def _save_tracemalloc(prefix: Path) -> None:
+    path = prefix.with_name(prefix.name + "_tracemalloc.txt")
+    peak = max(_stage["traced_peak"], tracemalloc.get_traced_memory()[1])
+    snapshot = _stage["snapshot"] or tracemalloc.take_snapshot()
+    stats = snapshot.filter_traces(TRACEMALLOC_IGNORE).statistics("lineno")
+    with open(path, "w") as f:
+        f.write(f"Peak traced memory: {peak / MB:.1f} MB\n")
+        f.write(f"Allocated at the end of the span with most memory alive ({_stage['snapshot_span']}), top {TOP_N} lines:\n")
+        for stat in stats[:TOP_N]:
+            frame = stat.traceback[0]
+            f.write(f"{stat.size / MB:10.2f} MB {stat.count:>10} blocks  {frame.filename}:{frame.lineno}\n")
+    print(f"[OK] tracemalloc saved to: {path}")
+
+
+@contextmanager
+def stage(script: str) -> Iterator[None]:
+    """
+    Etapa completa (un script de 02_data_preparation o 03_modeling): span "stage" que
+    contiene los spans de sus pasos. run_id agrupa los spans de una ejecución (PROFILE_RUN_ID
+    lo fija desde afuera, ej. src/pipeline.py para todo el DAG).
+
+    Si la etapa está en PROFILE_STAGES, además corre bajo cProfile (.prof para pstats /
+    snakeviz y un resumen por tiempo acumulado) y/o tracemalloc (líneas con más memoria
+    asignada al final; los spans suman su pico de memoria de Python). Ambos hacen lenta la
+    etapa: los tiempos de esa corrida no son comparables con los demás.
+    """
+    name = stage_name(script)
+    run_id = os.environ.get("PROFILE_RUN_ID") or f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+    _stage.update(name=name, run_id=run_id, traced_peak=0, snapshot=None, snapshot_traced=0, snapshot_span=None)
+
+    tools = _selected_tools(name) if PROFILE_ENABLED else []
+    prefix = PROFILE_DIR / f"{name.split('/')[-1]}_{run_id}"
+    profiler = cProfile.Profile() if "cprofile" in tools else None
+    if "tracemalloc" in tools:
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+
+    try:
+        with span("stage", script=name, tools=tools or None):
+            if profiler is not None:
+                profiler.enable()
+            try:
+                yield
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+    finally:
+        if tools:
+            PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        if profiler is not None:
+            _save_cprofile(profiler, prefix)
+        if "tracemalloc" in tools:
+            _save_tracemalloc(prefix)
+            _stage["snapshot"] = None
+            tracemalloc.stop()
+
+
+# -------------------------------------------------------------------------
+# Resumen del log
+# -------------------------------------------------------------------------
+
+SUMMARY_SKIP = {
+    "run_id", "stage", "span", "span_id", "parent_id", "pid", "start", "wall_s", "cpu_s",
+    "rss_start_mb", "rss_end_mb", "peak_rss_mb", "peak_rss_growth_mb", "status", "py_alloc_peak_mb",
+}
+
+
+def read_spans(log_path: Path = PROFILE_LOG, run_id: Optional[str] = None) -> list[dict]:
+    """
+    Spans del log; run_id="last" = la última ejecución registrada.
+    """
+    with open(log_path) as f:
+        spans = [json.loads(line) for line in f if line.strip()]
+    if run_id == "last" and spans:
+        run_id = max(spans, key=lambda s: s["start"])["run_id"]
+    return [s for s in spans if run_id is None or s["run_id"] == run_id]
+
+
+def print_summary(spans: list[dict]) -> None:
+    """
+    Árbol de spans por etapa (en orden de inicio) con tiempo, CPU y memoria.
+    """
+    children: dict[Optional[str], list[dict]] = {}
+    ids = {s["span_id"] for s in spans}
+    for s in sorted(spans, key=lambda s: s["start"]):
+        parent = s["parent_id"] if s["parent_id"] in ids else None
+        children.setdefault(parent, []).append(s)
+
+    print(f"{'span':72s} {'wall_s':>8s} {'cpu_s':>8s} {'rss_mb':>8s} {'Δrss_mb':>8s} {'peak+_mb':>8s} {'py_peak_mb':>10s}")
+
+    def show(s: dict, depth: int) -> None:
+        attrs = " ".join(f"{k}={v}" for k, v in s.items() if k not in SUMMARY_SKIP and v is not None)
+        label = ("  " * depth + f"{s['span']} {attrs}")[:72]
+        py_peak = f"{s['py_alloc_peak_mb']:.1f}" if "py_alloc_peak_mb" in s else "-"
+        status = "" if s["status"] == "ok" else f"  [{s['status']}]"
+        print(
+            f"{label:72s} {s['wall_s']:8.2f} {s['cpu_s']:8.2f} {s['rss_end_mb']:8.0f} "
+            f"{s['rss_end_mb'] - s['rss_start_mb']:+8.0f} {s['peak_rss_growth_mb']:8.0f} {py_peak:>10s}{status}"
+        )
+        for child in children.get(s["span_id"], []):
+            show(child, depth + 1)
+
+    for root in children.get(None, []):
+        if root["span"] == "stage":
+            print(f"\n[{root['stage']}] run={root['run_id']}")
+        show(root, 0)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Resumen de los spans de perfilado por etapa.")
+    parser.add_argument("--log", type=Path, default=PROFILE_LOG, help="Log JSON lines (por defecto PROFILE_LOG).")
+    parser.add_argument("--run", default="last", help="run_id a mostrar; 'last' (por defecto) o 'all'.")
+    args = parser.parse_args(argv)
+
+    if not args.log.exists():
+        print(f"[skip] {args.log} not found (run a stage of 02_data_preparation or 03_modeling first)")
+        return 1
+    print_summary(read_spans(args.log, None if args.run == "all" else args.run))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
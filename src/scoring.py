@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Mapping, Sequence
+
+import numpy as np
+
+
+class FeatureVectorBuilder:
+    """
+    Construye vectores de features float64 en el orden exacto de columnas del modelo,
+    sin pasar por pandas.
+
+    Se crea una sola vez al inicio (a partir de champion_numeric_cols.joblib): el mapa
+    nombre -> posición se precalcula y cada hilo reutiliza su propia fila preasignada.
+    """
+
+    def __init__(self, columns: Sequence[str]):
+        self.columns = list(columns)
+        self.index = {c: i for i, c in enumerate(self.columns)}
+        self.n_features = len(self.columns)
+        self._local = threading.local()
+
+    def _buffer(self) -> np.ndarray:
+        buf = getattr(self._local, "row", None)
+        if buf is None:
+            buf = np.empty((1, self.n_features), dtype=np.float64)
+            self._local.row = buf
+        return buf
+
+    def row(self, features: Mapping[str, Any]) -> np.ndarray:
+        """
+        Devuelve una matriz (1, n_features). Columnas ausentes, None e inf quedan como NaN.
+
+        El array es un buffer del hilo actual: se sobrescribe en la siguiente llamada.
+        """
+        out = self._buffer()
+        out.fill(np.nan)
+        values = out[0]
+        index = self.index
+        for name, value in features.items():
+            i = index.get(name)
+            if i is not None and value is not None:
+                values[i] = value
+        values[np.isinf(values)] = np.nan
+        return out
+
+    def matrix(self, records: Sequence[Mapping[str, Any]]) -> np.ndarray:
+        """
+        Matriz (n_records, n_features) a partir de una lista de diccionarios.
+        """
+        out = np.full((len(records), self.n_features), np.nan, dtype=np.float64)
+        index = self.index
+        for r, features in enumerate(records):
+            values = out[r]
+            for name, value in features.items():
+                i = index.get(name)
+                if i is not None and value is not None:
+                    values[i] = value
+        out[np.isinf(out)] = np.nan
+        return out
+
+    def matrix_from_columns(self, columns: Mapping[str, Sequence[Any]], n_rows: int) -> np.ndarray:
+        """
+        Matriz (n_rows, n_features) a partir de un payload columnar {columna: valores}.
+        """
+        out = np.full((n_rows, self.n_features), np.nan, dtype=np.float64)
+        for name, values in columns.items():
+            i = self.index.get(name)
+            if i is not None:
+                out[:, i] = np.asarray(values, dtype=np.float64)
+        out[np.isinf(out)] = np.nan
+        return out
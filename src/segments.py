@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import numpy as np
+
+
+# Funciones soportadas (mismas semánticas que groupby().agg de pandas: se ignoran NaN)
+SEGMENT_FUNCS = ("count", "sum", "mean", "min", "max", "var", "std")
+
+
+class Segments:
+    """
+    Tramos contiguos de llaves iguales en un array ya ordenado.
+
+    keys[i] es la llave del tramo i, que empieza en starts[i] y tiene lengths[i] filas.
+    Con los tramos calculados una vez, cada estadístico es un ufunc.reduceat, sin hashing.
+    """
+
+    def __init__(self, sorted_keys: np.ndarray):
+        n = sorted_keys.shape[0]
+        if n == 0:
+            self.starts = np.zeros(0, dtype=np.intp)
+        else:
+            self.starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        self.keys = sorted_keys[self.starts]
+        self.lengths = np.diff(np.r_[self.starts, n])
+        self.n_rows = n
+
+    def __len__(self) -> int:
+        return int(self.starts.shape[0])
+
+    def reduce(self, values: np.ndarray, func: str) -> np.ndarray:
+        """
+        Estadístico func por tramo sobre values (alineado con las llaves ordenadas).
+        """
+        return self.reduce_many(values, [func])[func]
+
+    def reduce_many(self, values: np.ndarray, funcs) -> dict[str, np.ndarray]:
+        """
+        Varios estadísticos por tramo sobre la misma columna; conteos y sumas se calculan una
+        sola vez y se comparten (mean = sum / count, etc.).
+
+        Tipos como groupby: count -> int64; min/max conservan el tipo; mean/var/std -> float.
+        La suma de enteros se acumula en int64, el mismo tipo que devuelve groupby para
+        int8/int16/int32.
+        Las sumas son secuenciales por tramo, así que las de floats pueden diferir de pandas
+        (suma compensada) en los últimos bits.
+        """
+        unknown = [f for f in funcs if f not in SEGMENT_FUNCS]
+        if unknown:
+            raise ValueError(f"Funciones no soportadas: {unknown}. Opciones: {SEGMENT_FUNCS}")
+        if values.shape[0] != self.n_rows:
+            raise ValueError(f"values tiene {values.shape[0]} filas; se esperaban {self.n_rows}")
+
+        starts = self.starts
+        if len(self) == 0:
+            return {f: np.zeros(0, dtype=np.int64 if f == "count" else values.dtype) for f in funcs}
+
+        is_int = values.dtype.kind in "iub"
+        valid = None if is_int else ~np.isnan(values)
+        cache: dict[str, np.ndarray] = {}
+
+        def count():
+            if "count" not in cache:
+                cache["count"] = self.lengths.astype(np.int64) if is_int else np.add.reduceat(valid.view(np.int8), starts, dtype=np.int64)
+            return cache["count"]
+
+        def total():
+            if "sum" not in cache:
+                cache["sum"] = np.add.reduceat(values, starts, dtype=np.int64) if is_int else np.add.reduceat(np.where(valid, values, 0), starts)
+            return cache["sum"]
+
+        out = {}
+        for func in funcs:
+            if func == "count":
+                out[func] = count()
+            elif func == "sum":
+                out[func] = total()
+            elif func == "min":
+                out[func] = (np.minimum if is_int else np.fmin).reduceat(values, starts)
+            elif func == "max":
+                out[func] = (np.maximum if is_int else np.fmax).reduceat(values, starts)
+            else:
+                out[func] = self._moments(values, total(), count(), valid, func)
+        return out
+
+    def _moments(self, values, total, count, valid, func) -> np.ndarray:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = total / count
+            if func == "mean":
+                return np.where(count > 0, mean, np.nan)
+
+            # Varianza muestral (ddof=1) en dos pasadas: desviaciones respecto de la media del tramo
+            dev = values - np.repeat(mean, self.lengths)
+            if valid is not None:
+                dev = np.where(valid, dev, 0)
+            var = np.add.reduceat(dev * dev, self.starts) / (count - 1)
+        var = np.where(count > 1, var, np.nan)
+        return var if func == "var" else np.sqrt(var)
+
+
+def sort_order(keys: np.ndarray):
+    """
+    Permutación estable que ordena keys, o None si ya están ordenadas (chequeo O(n)).
+
+    Para llaves enteras con rango < 2**32 usa radix sort LSD en dos pasadas de 16 bits
+    (np.argsort estable es radix para tipos de 16 bits; para int64 es timsort).
+    """
+    if keys.shape[0] < 2 or bool(np.all(keys[1:] >= keys[:-1])):
+        return None
+
+    if keys.dtype.kind in "iu":
+        lo = int(keys.min())
+        span = int(keys.max()) - lo
+        if span < 2**32:
+            codes = (keys.astype(np.int64) - lo).astype(np.uint32)
+            if span < 2**16:
+                return np.argsort(codes.astype(np.uint16), kind="stable")
+            order = np.argsort((codes & 0xFFFF).astype(np.uint16), kind="stable")
+            high = (codes >> 16).astype(np.uint16)[order]
+            return order[np.argsort(high, kind="stable")]
+
+    return np.argsort(keys, kind="stable")
+
+
+def scatter(values: np.ndarray, positions: np.ndarray, n: int, func: str) -> np.ndarray:
+    """
+    Resultados por tramo escritos en un array de n llaves (positions = fila de cada tramo).
+    Las llaves sin filas quedan como groupby sobre valores vacíos/NaN: count y sum = 0,
+    el resto NaN.
+    """
+    if positions.shape[0] == n:
+        return values
+    if func in ("count", "sum"):
+        out = np.zeros(n, dtype=values.dtype)
+    else:
+        out = np.full(n, np.nan, dtype=np.result_type(values.dtype, np.float64))
+    out[positions] = values
+    return out
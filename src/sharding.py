@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from .config import FEATURES_SHARD_DIR, KEYS
+from .features import build_feature_groups, select_groups, table_columns
+from .io import LoadResult, load_arrow, parquet_columns, parquet_row_groups
+
+
+def shard_ids(curr: np.ndarray, n_shards: int) -> np.ndarray:
+    """
+    Partición de cada fila según su SK_ID_CURR (curr % n_shards). Las filas sin cliente
+    (NaN) van a la partición n_shards, que no se procesa.
+    """
+    out = np.full(curr.shape[0], n_shards, dtype=np.uint16)
+    valid = ~np.isnan(curr) if curr.dtype.kind == "f" else np.ones(curr.shape[0], dtype=bool)
+    out[valid] = (curr[valid].astype(np.int64) % n_shards).astype(np.uint16)
+    return out
+
+
+def _curr_of_keys(keys: np.ndarray, mapping: tuple[np.ndarray, np.ndarray]) -> np.ndarray:
+    """
+    SK_ID_CURR de cada key según el mapeo (keys ordenadas, clientes); NaN si no está.
+    Esas filas no llegan al rollup, así que no importa en qué partición caen.
+    """
+    map_keys, map_curr = mapping
+    out = np.full(keys.shape[0], np.nan)
+    if map_keys.shape[0] == 0:
+        return out
+    pos = np.minimum(np.searchsorted(map_keys, keys), map_keys.shape[0] - 1)
+    found = map_keys[pos] == keys
+    out[found] = map_curr[pos[found]]
+    return out
+
+
+def _write_sharded_table(table, shards: np.ndarray, n_shards: int, path: Path) -> np.ndarray:
+    """
+    Escribe la tabla como archivo Arrow IPC con las filas agrupadas por partición (orden
+    estable: dentro de cada partición se conserva el orden original) y devuelve los offsets.
+    """
+    import pyarrow as pa
+
+    order = np.argsort(shards, kind="stable")
+    counts = np.bincount(shards, minlength=n_shards + 1)
+    offsets = np.r_[0, np.cumsum(counts)]
+
+    table = table.take(pa.array(order))
+    with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return offsets
+
+
+def _split_row_groups(
+    table: str,
+    columns: list[str],
+    row_groups: list[int],
+    load_options: dict,
+    mapping: Optional[tuple[str, str, str]],
+    n_shards: int,
+    path: str,
+) -> tuple[str, list[int], dict[str, str]]:
+    """
+    Proceso de trabajo (fase 1): lee un rango contiguo de row groups de la tabla, asigna
+    cada fila a su partición y la escribe como Arrow IPC con las particiones contiguas.
+    mapping = (key, archivo de keys ordenadas, archivo de SK_ID_CURR) para tablas sin
+    SK_ID_CURR propio.
+    """
+    data, original = load_arrow(table, columns=columns, row_groups=row_groups, **load_options)
+
+    curr = KEYS["SK_ID_CURR"]
+    if mapping is None:
+        row_curr = data.column(curr).to_numpy()
+    else:
+        key, keys_file, curr_file = mapping
+        row_curr = _curr_of_keys(
+            data.column(key).to_numpy(),
+            (np.load(keys_file, mmap_mode="r"), np.load(curr_file, mmap_mode="r")),
+        )
+
+    offsets = _write_sharded_table(data, shard_ids(row_curr, n_shards), n_shards, Path(path))
+    return path, offsets.tolist(), original
+
+
+def _run_shard(
+    names: list[str],
+    shard: int,
+    tables: dict[str, list[tuple[str, list[int], dict[str, str]]]],
+    compact: bool,
+    method: str,
+) -> dict[str, pd.DataFrame]:
+    """
+    Proceso de trabajo (fase 2): agrega los grupos sobre su partición. Cada tabla es la
+    concatenación, en orden, de su tramo en cada archivo de la fase 1, leídos con memory-map
+    (los slices Arrow no copian datos).
+    """
+    import pyarrow as pa
+
+    def loader(table: str, columns: list[str]) -> LoadResult:
+        parts, original_dtypes = [], None
+        for path, offsets, original in tables[table]:
+            data = pa.ipc.open_file(pa.memory_map(path)).read_all()
+            parts.append(data.slice(offsets[shard], offsets[shard + 1] - offsets[shard]).select(columns))
+            # Un entero conserva su tipo original solo si no tiene nulos en ningún tramo
+            original_dtypes = dict(original) if original_dtypes is None else {
+                c: t for c, t in original_dtypes.items() if original.get(c) == t
+            }
+        # Enteros sin estadísticas pueden reducirse distinto en cada tramo: se promueven
+        data = pa.concat_tables(parts, promote_options="permissive")
+        df = data.to_pandas(split_blocks=compact)
+        return LoadResult(name=table, path=Path(tables[table][0][0]), df=df, original_dtypes=original_dtypes or {})
+
+    return build_feature_groups(names, verbose=False, compact=compact, method=method, workers=1, loader=loader)
+
+
+def _row_group_ranges(table: str, n: int) -> list[list[int]]:
+    """
+    Hasta n rangos contiguos de row groups de la tabla (rangos contiguos: concatenarlos en
+    orden reproduce el orden de filas del parquet).
+    """
+    return [r.tolist() for r in np.array_split(np.arange(parquet_row_groups(table)), n) if r.shape[0] > 0]
+
+
+def _concat_shards(parts: list[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Une las salidas por partición en el orden del groupby (SK_ID_CURR ascendente).
+    """
+    key = KEYS["SK_ID_CURR"]
+    non_empty = [p for p in parts if p.shape[0] > 0] or parts[:1]
+    out = pd.concat(non_empty, ignore_index=True) if len(non_empty) > 1 else non_empty[0]
+    return out.sort_values(key, kind="stable", ignore_index=True)
+
+
+def build_feature_groups_sharded(
+    names: Optional[Iterable[str]] = None,
+    workers: int = 2,
+    verbose: bool = True,
+    compact: bool = True,
+    method: str = "groupby",
+    shard_dir: Optional[str] = FEATURES_SHARD_DIR or None,
+) -> dict[str, pd.DataFrame]:
+    """
+    build_feature_groups particionado por cliente, con un proceso por partición.
+
+    0. Se leen solo las columnas (key, SK_ID_CURR) de las tablas de mapeo, para asignar
+       las filas de tablas por SK_ID_PREV / SK_ID_BUREAU a su cliente.
+    1. En paralelo, cada proceso lee un rango contiguo de row groups de una tabla (mismas
+       opciones de carga), asigna cada fila a la partición SK_ID_CURR % workers y escribe
+       el rango como Arrow IPC (en memoria compartida si shard_dir es /dev/shm) con cada
+       partición contigua.
+    2. En paralelo, cada proceso abre con memory-map su partición de cada rango, corre
+       build_feature_groups sobre ella, y las salidas se concatenan ordenadas por SK_ID_CURR.
+
+    Todos los datos de un cliente (y de sus créditos) quedan en la misma partición y en el
+    mismo orden relativo, así que cada agregación ve exactamente las mismas filas que en
+    un solo proceso: el resultado es idéntico bit a bit.
+    """
+    groups = select_groups(names)
+    names = [g.name for g in groups]
+    needed = table_columns(groups)
+    curr = KEYS["SK_ID_CURR"]
+    load_options = dict(downcast="integer", categorical=True) if compact else {}
+
+    tmp_dir = Path(tempfile.mkdtemp(prefix="feature_shards_", dir=shard_dir))
+    try:
+        t0 = time.perf_counter()
+        mappings: dict[str, tuple[str, str, str]] = {}
+        for g in groups:
+            if g.mapping_table is None or g.key in mappings:
+                continue
+            data, _ = load_arrow(g.mapping_table, columns=[g.key, curr])
+            map_keys = data.column(g.key).to_numpy()
+            order = np.argsort(map_keys, kind="stable")
+            sorted_keys = map_keys[order]
+            if np.any(sorted_keys[1:] == sorted_keys[:-1]):
+                # Una key en dos clientes no se puede particionar sin duplicar filas
+                if verbose:
+                    print(f"[{g.mapping_table}] {g.key} repetido en el mapeo; se calcula en un solo proceso")
+                return build_feature_groups(names, verbose=verbose, compact=compact, method=method, workers=1)
+            keys_file, curr_file = tmp_dir / f"{g.key}.keys.npy", tmp_dir / f"{g.key}.curr.npy"
+            np.save(keys_file, sorted_keys)
+            np.save(curr_file, data.column(curr).to_numpy()[order])
+            mappings[g.key] = (g.key, str(keys_file), str(curr_file))
+            del data, map_keys, order, sorted_keys
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures: dict[str, list] = {}
+            for table, table_cols in needed.items():
+                available = set(parquet_columns(table))
+                cols = [c for c in table_cols if c in available]
+                mapping = None
+                if curr not in cols:
+                    mapping = mappings[next(g.key for g in groups if g.table == table)]
+                futures[table] = [
+                    pool.submit(
+                        _split_row_groups, table, cols, row_groups, load_options, mapping, workers,
+                        str(tmp_dir / f"{table}.{i}.arrow"),
+                    )
+                    for i, row_groups in enumerate(_row_group_ranges(table, workers))
+                ]
+            written = {table: [f.result() for f in fs] for table, fs in futures.items()}
+
+            if verbose:
+                n_files = sum(len(v) for v in written.values())
+                print(f"Sharded {len(written)} tables into {workers} partitions ({n_files} files) in {time.perf_counter() - t0:.1f}s ({tmp_dir})")
+
+            futures_shards = [pool.submit(_run_shard, names, shard, written, compact, method) for shard in range(workers)]
+            shard_results = [f.result() for f in futures_shards]
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    results = {}
+    for g in groups:
+        results[g.name] = _concat_shards([r[g.name] for r in shard_results])
+        if verbose:
+            print(f"Features {g.output_name} ({workers} workers): shape={results[g.name].shape}")
+    return results
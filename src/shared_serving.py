@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import json
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from .feature_store import FEATURES_FILE, IDS_FILE, META_FILE, FeatureStore
+from .model_registry import (
+    COLUMNS_FILE,
+    FLAT_FILE,
+    MODEL_FILE,
+    WARMUP_FILE,
+    ModelBundle,
+    check_parity,
+    load_model,
+    read_manifest,
+    warm_up,
+)
+from .tree_ensemble import CompiledEnsemble, export_hist_gradient_boosting
+
+
+# Contenido del directorio compartido: <shared>/model_flat.bin, <shared>/feature_store/, <shared>/shared.json
+SHARED_META_FILE = "shared.json"
+STORE_SUBDIR = "feature_store"
+
+
+def default_shared_dir() -> Path:
+    """
+    Directorio nuevo en /dev/shm (tmpfs: los archivos viven en RAM y todos los procesos que
+    los abren con memory-map usan las mismas páginas); si no existe, uno temporal en disco.
+    """
+    base = Path("/dev/shm")
+    return Path(tempfile.mkdtemp(prefix="home_credit_serve_", dir=base if base.is_dir() else None))
+
+
+def prepare_shared_artifacts(
+    shared_dir: Path,
+    registry_dir: Path,
+    model_path: Path,
+    columns_path: Path,
+    store_dir: Path,
+    model_X_path: Optional[Path] = None,
+) -> ModelBundle:
+    """
+    Lo hace una sola vez el proceso padre antes de arrancar los workers:
+
+    1. Modelo: la versión activa del registro o, si no hay, los artefactos sueltos. Su
+       archivo plano se exporta siempre desde el joblib (uno copiado puede ser de un
+       entrenamiento anterior) y se valida contra sklearn.
+    2. Feature store: se copia el de store_dir o, si no existe, se construye desde model_X.
+
+    Los workers solo abren estos archivos (load_shared_model / FeatureStore.load), sin
+    leer ni convertir nada.
+    """
+    shared_dir = Path(shared_dir)
+    shared_dir.mkdir(parents=True, exist_ok=True)
+
+    manifest = read_manifest(registry_dir)
+    version, metadata, warmup = "artifacts", {}, None
+    if manifest["active"] is not None:
+        version = manifest["active"]
+        metadata = manifest["versions"][version]
+        version_dir = Path(registry_dir) / version
+        model_path, columns_path = version_dir / MODEL_FILE, version_dir / COLUMNS_FILE
+        if (version_dir / WARMUP_FILE).exists():
+            warmup = np.load(version_dir / WARMUP_FILE)
+
+    import joblib
+
+    model = joblib.load(model_path)
+    target = shared_dir / FLAT_FILE
+    export_hist_gradient_boosting(model, joblib.load(columns_path)).save_flat(target)
+    check_parity(model, CompiledEnsemble.load_flat(target), warmup, FLAT_FILE)
+
+    bundle = load_model(None, None, flat_path=target, model_format="flat", version=version, metadata=metadata)
+    warm_up(bundle, warmup)
+
+    shared_store = shared_dir / STORE_SUBDIR
+    if (Path(store_dir) / META_FILE).exists():
+        shared_store.mkdir(exist_ok=True)
+        for name in (META_FILE, IDS_FILE, FEATURES_FILE):
+            shutil.copyfile(Path(store_dir) / name, shared_store / name)
+    elif model_X_path is not None and Path(model_X_path).exists():
+        import pandas as pd
+
+        from .config import KEYS
+        from .feature_store import build_feature_store
+
+        read_cols = list(dict.fromkeys([KEYS["SK_ID_CURR"]] + list(bundle.columns)))
+        build_feature_store(pd.read_parquet(model_X_path, columns=read_cols), bundle.columns, shared_store)
+
+    has_store = (shared_store / META_FILE).exists()
+    if has_store and FeatureStore.load(shared_store).columns != bundle.columns:
+        raise ValueError(f"[{version}] El feature store no tiene las mismas columnas que el modelo; regenerarlo.")
+
+    with open(shared_dir / SHARED_META_FILE, "w") as f:
+        json.dump({"version": version, "metadata": metadata, "feature_store": has_store}, f, indent=2)
+    return bundle
+
+
+def load_shared_model(shared_dir: Path) -> ModelBundle:
+    """
+    Modelo de un directorio de prepare_shared_artifacts, abierto con memory-map. Ya fue
+    validado por el proceso padre, así que un worker nuevo queda listo sin leer el modelo.
+    """
+    shared_dir = Path(shared_dir)
+    with open(shared_dir / SHARED_META_FILE) as f:
+        meta = json.load(f)
+    return load_model(
+        None,
+        None,
+        flat_path=shared_dir / FLAT_FILE,
+        model_format="flat",
+        version=meta["version"],
+        metadata=meta["metadata"],
+    )
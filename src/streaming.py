@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from .segments import Segments, sort_order
+
+
+# Funciones de agregación que se pueden calcular por partes y combinar
+STREAMABLE_FUNCS = ("count", "sum", "mean", "min", "max", "var", "std")
+
+# Estadísticos parciales que necesita cada función. "comp" es el término de compensación de
+# la suma de Kahan: va con cada "sum" para continuarla en el bloque siguiente.
+_PARTIALS = {
+    "count": ("count",),
+    "sum": ("sum", "comp"),
+    "mean": ("sum", "comp", "count"),
+    "min": ("min",),
+    "max": ("max",),
+    "var": ("count", "sum", "comp", "sumsq"),
+    "std": ("count", "sum", "comp", "sumsq"),
+}
+
+# Cómo se combina el valor previo de una key con el de un bloque (la suma se continúa fila a
+# fila, ver kahan_continue)
+_COMBINE = {"count": np.add, "sumsq": np.add, "min": np.fmin, "max": np.fmax}
+
+
+def partial_columns(aggs: dict[str, tuple[str, str]]) -> dict[str, tuple[str, str]]:
+    """
+    {columna parcial: (columna de origen, estadístico)} necesarios para las agregaciones
+    nombradas aggs = {salida: (columna, función)}.
+    """
+    out: dict[str, tuple[str, str]] = {}
+    for _, (col, func) in aggs.items():
+        if func not in _PARTIALS:
+            raise ValueError(f"La agregación '{func}' no se puede calcular por streaming. Opciones: {STREAMABLE_FUNCS}")
+        for stat in _PARTIALS[func]:
+            out[f"{col}__{stat}"] = (col, stat)
+    return out
+
+
+def kahan_continue(seg: Segments, values: np.ndarray, total: np.ndarray, comp: np.ndarray) -> None:
+    """
+    Continúa en el lugar la suma compensada (total, comp) de cada tramo de seg con sus
+    valores, en el orden de las filas y sin los NaN. Son los mismos pasos que group_sum /
+    group_mean de pandas (y online_features._kahan_sum), vectorizados entre tramos: una
+    iteración por posición dentro del tramo más largo.
+    """
+    if len(seg) == 0:
+        return
+    by_length = np.argsort(-seg.lengths, kind="stable")
+    neg_lengths = -seg.lengths[by_length]
+    starts = seg.starts[by_length]
+    s, c = total[by_length], comp[by_length]
+
+    with np.errstate(invalid="ignore"):
+        for j in range(int(-neg_lengths[0])):
+            k = int(np.searchsorted(neg_lengths, -j, side="left"))  # tramos con más de j filas
+            v = values[starts[:k] + j]
+            sk, ck = s[:k], c[:k]
+            y = v - ck
+            t = sk + y
+            new_c = t - sk - y
+            # Con valores infinitos la compensación es NaN (pandas la reinicia)
+            new_c[new_c != new_c] = 0.0
+            valid = v == v
+            s[:k] = np.where(valid, t, sk)
+            c[:k] = np.where(valid, new_c, ck)
+
+    total[by_length] = s
+    comp[by_length] = c
+
+
+def _previous(tiers: list[pd.DataFrame], keys: np.ndarray) -> tuple[list[tuple[pd.DataFrame, np.ndarray, np.ndarray]], np.ndarray]:
+    """
+    Dónde está el valor previo de cada key: [(tier, filas de keys, posiciones en el tier)]
+    (el primer tier que la tiene) y la máscara de keys con valor previo.
+    """
+    found = np.zeros(keys.shape[0], dtype=bool)
+    hits = []
+    for tier in tiers:
+        pos = tier.index.get_indexer(keys)
+        rows = np.flatnonzero((pos >= 0) & ~found)
+        if rows.shape[0]:
+            hits.append((tier, rows, pos[rows]))
+            found[rows] = True
+    return hits, found
+
+
+def update_partials(
+    tiers: list[pd.DataFrame],
+    df: pd.DataFrame,
+    key: str,
+    partials: dict[str, tuple[str, str]],
+) -> pd.DataFrame:
+    """
+    Parciales acumulados de cada key de df (índice = key, ordenado): su valor previo, del
+    primer DataFrame de tiers que tenga la key, combinado con las filas de df. Las sumas
+    continúan la suma compensada en el orden de las filas, así que el resultado no depende
+    de cómo se partan las filas en bloques.
+    """
+    keys = df[key].to_numpy()
+    order = sort_order(keys)
+    seg = Segments(keys if order is None else keys[order])
+    hits, found = _previous(tiers, seg.keys)
+
+    def previous(name: str, fill, dtype) -> np.ndarray:
+        out = np.full(len(seg), fill, dtype=dtype)
+        for tier, rows, pos in hits:
+            out[rows] = tier[name].to_numpy()[pos]
+        return out
+
+    by_col: dict[str, dict[str, str]] = {}
+    for name, (col, stat) in partials.items():
+        by_col.setdefault(col, {})[stat] = name
+
+    out = {}
+    for col, stats in by_col.items():
+        values = df[col].to_numpy()
+        if order is not None:
+            values = values[order]
+        is_int = values.dtype.kind in "iub"
+
+        funcs = [s for s in ("count", "min", "max") if s in stats]
+        if is_int and "sum" in stats:
+            funcs.append("sum")
+        reduced = seg.reduce_many(values, funcs) if funcs else {}
+        if "sumsq" in stats:
+            reduced["sumsq"] = seg.reduce(values.astype(np.float64) ** 2, "sum")
+
+        for stat, name in stats.items():
+            if stat == "comp":
+                continue
+            if stat == "sum" and not is_int:
+                total = previous(name, 0.0, np.float64)
+                comp = previous(stats["comp"], 0.0, np.float64)
+                kahan_continue(seg, values.astype(np.float64, copy=False), total, comp)
+                out[name], out[stats["comp"]] = total, comp
+                continue
+
+            value = reduced[stat]
+            if stat == "sum":
+                value = value + previous(name, 0, np.int64)
+                if "comp" in stats:
+                    out[stats["comp"]] = np.zeros(len(seg), dtype=np.float64)
+            elif found.any():
+                prev = previous(name, 0, value.dtype)
+                value = value.copy()
+                value[found] = _COMBINE[stat](value[found], prev[found])
+            out[name] = value
+
+    return pd.DataFrame({name: out[name] for name in partials}, index=pd.Index(seg.keys, name=key))
+
+
+def replace_partials(old: Optional[pd.DataFrame], new: pd.DataFrame) -> pd.DataFrame:
+    """
+    old con las keys de new reemplazadas por su valor en new (índice ordenado).
+    """
+    if old is None or old.empty:
+        return new
+    return pd.concat([old[~old.index.isin(new.index)], new]).sort_index()
+
+
+def finalize_partials(state: pd.DataFrame, aggs: dict[str, tuple[str, str]]) -> pd.DataFrame:
+    """
+    Convierte el estado combinado en las agregaciones nombradas finales (índice = key).
+    """
+    out = pd.DataFrame(index=state.index)
+    for name, (col, func) in aggs.items():
+        if func in ("count", "sum", "min", "max"):
+            out[name] = state[f"{col}__{func}"]
+            continue
+
+        n = state[f"{col}__count"]
+        s = state[f"{col}__sum"]
+        if func == "mean":
+            out[name] = s / n
+        else:
+            # Varianza muestral (ddof=1, igual que pandas); NaN con menos de 2 valores
+            var = (state[f"{col}__sumsq"] - s.astype(np.float64) ** 2 / n) / (n - 1)
+            var = var.where(n > 1).clip(lower=0)
+            out[name] = var if func == "var" else np.sqrt(var)
+    return out
+
+
+def empty_partials(key: str, partials: dict[str, tuple[str, str]]) -> pd.DataFrame:
+    """
+    Estado sin keys, con las columnas parciales de partials (para una tabla vacía).
+    """
+    return pd.DataFrame(
+        {name: np.array([], dtype=np.int64 if stat == "count" else np.float64) for name, (_, stat) in partials.items()},
+        index=pd.Index(np.array([], dtype=np.int64), name=key),
+    )
+
+
+def stream_partials(
+    batches: Iterable[pd.DataFrame],
+    key: str,
+    aggs: dict[str, tuple[str, str]],
+    derive: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+    combine_every: int = 8,
+) -> tuple[pd.DataFrame, dict[str, tuple[str, str]]]:
+    """
+    Estado combinado (estadísticos parciales por key, índice = key) de todos los bloques.
+
+    Devuelve también las agregaciones efectivas: las de aggs cuya columna existe en los
+    bloques (después de derive). Sin ningún bloque, el estado queda vacío y se devuelven
+    todas las de aggs.
+    """
+    partials: Optional[dict[str, tuple[str, str]]] = None
+    # state: todas las keys hasta el último volcado; recent: las actualizadas desde entonces.
+    # Cada bloque solo reescribe recent; state se reescribe cada combine_every bloques.
+    state: Optional[pd.DataFrame] = None
+    recent: Optional[pd.DataFrame] = None
+    pending = 0
+
+    for batch in batches:
+        if derive is not None:
+            batch = derive(batch)
+        if partials is None:
+            available = {out: (col, func) for out, (col, func) in aggs.items() if col in batch.columns}
+            aggs = available
+            partials = partial_columns(aggs)
+
+        tiers = [t for t in (recent, state) if t is not None]
+        recent = replace_partials(recent, update_partials(tiers, batch, key, partials))
+        pending += 1
+        if pending >= combine_every:
+            state, recent, pending = replace_partials(state, recent), None, 0
+
+    if partials is None:
+        # Sin bloques no se sabe qué columnas existen: estado vacío con todas las de aggs
+        return empty_partials(key, partial_columns(aggs)), aggs
+
+    return (replace_partials(state, recent) if recent is not None else state), aggs
+
+
+def stream_aggregate(
+    batches: Iterable[pd.DataFrame],
+    key: str,
+    aggs: dict[str, tuple[str, str]],
+    derive: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+    combine_every: int = 8,
+) -> pd.DataFrame:
+    """
+    groupby(key).agg(**aggs) calculado bloque a bloque.
+
+    Cada bloque actualiza los estadísticos parciales (count, suma compensada, min, max, suma
+    de cuadrados) de sus keys; la memoria queda acotada por el tamaño de bloque más el
+    estado (una fila por key). derive se aplica a cada bloque, por lo que debe ser fila a fila.
+
+    Devuelve el mismo resultado que el groupby en memoria, con reset_index(), sin importar
+    cómo estén ordenadas las filas: las sumas y medias siguen la suma de Kahan de pandas fila
+    a fila. var/std salen de la suma de cuadrados (pandas usa Welford) y pueden diferir en
+    los últimos bits.
+    """
+    state, aggs = stream_partials(batches, key, aggs, derive, combine_every)
+    return finalize_partials(state, aggs).reset_index()
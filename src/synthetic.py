@@ -0,0 +1,374 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .config import FILES, INTERIM_DIR, KEYS, RAW_DIR, TARGET_COL
+
+
+# Escala 1 = tamaño del dataset de Kaggle (application_train)
+BASE_APPLICATION_ROWS = 307_511
+TARGET_RATE = 0.0807
+
+# Tabla hija -> (key, tabla padre) de cada relación uno-a-muchos
+PARENTS = {
+    "bureau": (KEYS["SK_ID_CURR"], "application"),
+    "bureau_balance": (KEYS["SK_ID_BUREAU"], "bureau"),
+    "previous_application": (KEYS["SK_ID_CURR"], "application"),
+    "pos_cash_balance": (KEYS["SK_ID_PREV"], "previous_application"),
+    "installments_payments": (KEYS["SK_ID_PREV"], "previous_application"),
+    "credit_card_balance": (KEYS["SK_ID_PREV"], "previous_application"),
+}
+
+# Clientes por bloque de generación (con sus filas hijas: ~190 filas por cliente en escala 1)
+BLOCK_CUSTOMERS = 20_000
+
+RAW_TABLES = ["application", *PARENTS]
+
+# Primer id de cada key (rangos del dataset original)
+ID_START = {KEYS["SK_ID_CURR"]: 100_002, KEYS["SK_ID_BUREAU"]: 5_000_000, KEYS["SK_ID_PREV"]: 1_000_000}
+
+
+@dataclass(frozen=True)
+class FanOut:
+    """
+    Filas hijas por fila padre: coverage = fracción de padres con al menos una fila, mean =
+    filas promedio de esos padres, max = tope (la key más repetida del dataset original).
+    """
+    coverage: float
+    mean: float
+    max: int
+
+    def sample(self, rng: np.random.Generator, n_parents: int) -> np.ndarray:
+        # Geométrica truncada en max: cola larga como en los datos reales (muchos padres con
+        # pocas filas), con p elegido para que la media ya truncada sea mean
+        counts = np.minimum(rng.geometric(_truncated_geometric_p(self.mean, self.max), n_parents), self.max)
+        counts[rng.random(n_parents) >= self.coverage] = 0
+        return counts.astype(np.int64)
+
+
+def _truncated_geometric_p(mean: float, cap: int) -> float:
+    """
+    p tal que E[min(Geom(p), cap)] = (1 - (1 - p)^cap) / p sea mean (bisección; la
+    esperanza decrece con p).
+    """
+    if mean <= 1:
+        return 1.0
+    lo, hi = 1e-9, 1.0
+    for _ in range(100):
+        p = (lo + hi) / 2
+        if (1 - (1 - p) ** cap) / p > mean:
+            lo = p
+        else:
+            hi = p
+    return (lo + hi) / 2
+
+
+def load_fanouts(profile_path: Path) -> dict[str, FanOut]:
+    """
+    FanOut de cada tabla hija a partir de data/interim/eda_secondary_key_profiles.json
+    (01_data_understanding/02_eda_secondary.py).
+    """
+    with open(profile_path) as f:
+        profiles = {(p["df"], p["key"]): p for p in json.load(f)}
+
+    parent_rows = {"application": BASE_APPLICATION_ROWS}
+    for table, (key, _) in PARENTS.items():
+        own_key = {"bureau": KEYS["SK_ID_BUREAU"], "previous_application": KEYS["SK_ID_PREV"]}.get(table)
+        if own_key is not None:
+            parent_rows[table] = profiles[(table, own_key)]["rows"]
+
+    fanouts = {}
+    for table, (key, parent) in PARENTS.items():
+        p = profiles.get((table, key))
+        if p is None:
+            raise KeyError(f"[{profile_path.name}] falta el perfil de {table}.{key}")
+        fanouts[table] = FanOut(
+            coverage=min(1.0, p["n_unique"] / parent_rows[parent]),
+            mean=float(p["avg_rows_per_key"]),
+            max=int(max(int(v) for v in p["top_5_key_counts"].values())),
+        )
+    return fanouts
+
+
+# -------------------------------------------------------------------------
+# Columnas
+# -------------------------------------------------------------------------
+
+def _nullable(rng: np.random.Generator, values: np.ndarray, null_rate: float) -> pa.Array:
+    return pa.array(values, mask=rng.random(values.shape[0]) < null_rate) if null_rate else pa.array(values)
+
+
+def _category(rng: np.random.Generator, n: int, categories: Sequence[str], p=None, null_rate: float = 0.0) -> pa.Array:
+    # Diccionario (índices int8): los strings no se materializan fila por fila
+    idx = rng.choice(len(categories), n, p=p).astype(np.int8)
+    mask = rng.random(n) < null_rate if null_rate else None
+    return pa.DictionaryArray.from_arrays(pa.array(idx, mask=mask), pa.array(list(categories)))
+
+
+def _repeat_parent(counts: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (posición del padre, número de fila dentro del padre) de cada fila hija.
+    """
+    parent = np.repeat(np.arange(counts.shape[0]), counts)
+    starts = np.cumsum(counts) - counts
+    return parent, np.arange(parent.shape[0]) - starts[parent]
+
+
+def application_table(rng: np.random.Generator, ids: np.ndarray) -> pa.Table:
+    n = ids.shape[0]
+    income = rng.lognormal(11.9, 0.5, n)
+    credit = rng.lognormal(13.1, 0.6, n)
+    return pa.table({
+        KEYS["SK_ID_CURR"]: ids,
+        TARGET_COL: (rng.random(n) < TARGET_RATE).astype(np.int64),
+        "NAME_CONTRACT_TYPE": _category(rng, n, ["Cash loans", "Revolving loans"], p=[0.9, 0.1]),
+        "CODE_GENDER": _category(rng, n, ["F", "M"], p=[0.66, 0.34]),
+        "FLAG_OWN_CAR": _category(rng, n, ["N", "Y"], p=[0.66, 0.34]),
+        "CNT_CHILDREN": rng.poisson(0.4, n).astype(np.int64),
+        "AMT_INCOME_TOTAL": income,
+        "AMT_CREDIT": credit,
+        "AMT_ANNUITY": _nullable(rng, credit / rng.uniform(10, 40, n), 0.00004),
+        "AMT_GOODS_PRICE": _nullable(rng, credit * rng.uniform(0.8, 1.0, n), 0.0009),
+        "NAME_INCOME_TYPE": _category(rng, n, ["Working", "Commercial associate", "Pensioner", "State servant"], p=[0.52, 0.23, 0.18, 0.07]),
+        "NAME_EDUCATION_TYPE": _category(rng, n, ["Secondary / secondary special", "Higher education", "Incomplete higher", "Lower secondary"], p=[0.71, 0.24, 0.03, 0.02]),
+        "REGION_POPULATION_RELATIVE": rng.uniform(0.0003, 0.073, n),
+        "DAYS_BIRTH": -rng.integers(7_489, 25_229, n),
+        "DAYS_EMPLOYED": -rng.integers(0, 17_912, n),
+        "OWN_CAR_AGE": _nullable(rng, rng.integers(0, 40, n).astype(np.float64), 0.66),
+        "OCCUPATION_TYPE": _category(rng, n, ["Laborers", "Sales staff", "Core staff", "Managers", "Drivers"], null_rate=0.31),
+        "CNT_FAM_MEMBERS": _nullable(rng, rng.integers(1, 6, n).astype(np.float64), 0.00001),
+        "EXT_SOURCE_1": _nullable(rng, rng.beta(2, 2, n), 0.56),
+        "EXT_SOURCE_2": _nullable(rng, rng.beta(3, 2, n), 0.002),
+        "EXT_SOURCE_3": _nullable(rng, rng.beta(3, 2, n), 0.2),
+        "AMT_REQ_CREDIT_BUREAU_YEAR": _nullable(rng, rng.poisson(1.9, n).astype(np.float64), 0.135),
+    })
+
+
+def bureau_table(rng: np.random.Generator, curr_ids: np.ndarray, counts: np.ndarray, first_id: int) -> pa.Table:
+    parent, _ = _repeat_parent(counts)
+    n = parent.shape[0]
+    return pa.table({
+        KEYS["SK_ID_CURR"]: curr_ids[parent],
+        KEYS["SK_ID_BUREAU"]: first_id + np.arange(n, dtype=np.int64),
+        "CREDIT_ACTIVE": _category(rng, n, ["Closed", "Active", "Sold", "Bad debt"], p=[0.63, 0.367, 0.0029, 0.0001]),
+        "DAYS_CREDIT": -rng.integers(0, 2_923, n),
+        "DAYS_CREDIT_ENDDATE": _nullable(rng, rng.normal(500, 4_000, n).round(), 0.06),
+        "AMT_CREDIT_MAX_OVERDUE": _nullable(rng, rng.exponential(3_800, n), 0.65),
+        "AMT_CREDIT_SUM": _nullable(rng, rng.lognormal(11.5, 1.3, n), 0.000008),
+        "AMT_CREDIT_SUM_DEBT": _nullable(rng, rng.lognormal(10.0, 1.8, n), 0.15),
+        "AMT_CREDIT_SUM_OVERDUE": np.where(rng.random(n) < 0.997, 0.0, rng.exponential(5_000, n)),
+    })
+
+
+def bureau_balance_table(rng: np.random.Generator, bureau_ids: np.ndarray, counts: np.ndarray) -> pa.Table:
+    parent, month = _repeat_parent(counts)
+    n = parent.shape[0]
+    return pa.table({
+        KEYS["SK_ID_BUREAU"]: bureau_ids[parent],
+        "MONTHS_BALANCE": -month,
+        "STATUS": _category(rng, n, list("C0X12345"), p=[0.5, 0.27, 0.2, 0.02, 0.005, 0.002, 0.001, 0.002]),
+    })
+
+
+def previous_table(rng: np.random.Generator, curr_ids: np.ndarray, counts: np.ndarray, first_id: int) -> pa.Table:
+    parent, _ = _repeat_parent(counts)
+    n = parent.shape[0]
+    application = rng.lognormal(11.3, 1.2, n)
+    return pa.table({
+        KEYS["SK_ID_PREV"]: first_id + np.arange(n, dtype=np.int64),
+        KEYS["SK_ID_CURR"]: curr_ids[parent],
+        "NAME_CONTRACT_TYPE": _category(rng, n, ["Cash loans", "Consumer loans", "Revolving loans"], p=[0.45, 0.44, 0.11]),
+        "AMT_APPLICATION": application,
+        "AMT_CREDIT": _nullable(rng, application * rng.uniform(0.9, 1.2, n), 0.0000006),
+        "DAYS_DECISION": -rng.integers(1, 2_923, n),
+    })
+
+
+def monthly_table(
+    rng: np.random.Generator, table: str, prev_ids: np.ndarray, prev_curr: np.ndarray, counts: np.ndarray
+) -> pa.Table:
+    """
+    pos_cash_balance / installments_payments / credit_card_balance: una fila por mes (o cuota)
+    de cada crédito previo, con su SK_ID_CURR.
+    """
+    parent, month = _repeat_parent(counts)
+    n = parent.shape[0]
+    columns = {KEYS["SK_ID_PREV"]: prev_ids[parent], KEYS["SK_ID_CURR"]: prev_curr[parent]}
+    dpd = np.where(rng.random(n) < 0.97, 0, rng.integers(1, 120, n))
+
+    if table == "pos_cash_balance":
+        columns.update({
+            "MONTHS_BALANCE": -1 - month,
+            "CNT_INSTALMENT": _nullable(rng, rng.integers(1, 60, n).astype(np.float64), 0.0026),
+            "SK_DPD": dpd,
+        })
+    elif table == "installments_payments":
+        due = -rng.integers(1, 2_922, n).astype(np.float64)
+        amount = rng.lognormal(9.2, 1.1, n)
+        columns.update({
+            "NUM_INSTALMENT_NUMBER": 1 + month,
+            "DAYS_INSTALMENT": due,
+            "DAYS_ENTRY_PAYMENT": _nullable(rng, due + rng.integers(-30, 15, n), 0.0002),
+            "AMT_INSTALMENT": amount,
+            "AMT_PAYMENT": _nullable(rng, amount * rng.choice([1.0, 0.5, 1.5], n, p=[0.9, 0.06, 0.04]), 0.0002),
+        })
+    elif table == "credit_card_balance":
+        columns.update({
+            "MONTHS_BALANCE": -1 - month,
+            "AMT_BALANCE": np.where(rng.random(n) < 0.5, 0.0, rng.exponential(120_000, n)),
+            "AMT_CREDIT_LIMIT_ACTUAL": rng.choice([0, 45_000, 90_000, 135_000, 180_000, 270_000], n).astype(np.int64),
+            "SK_DPD": dpd,
+        })
+    else:
+        raise ValueError(f"Tabla mensual desconocida: '{table}'")
+    return pa.table(columns)
+
+
+# -------------------------------------------------------------------------
+# Dataset completo
+# -------------------------------------------------------------------------
+
+def generate_block(
+    rng: np.random.Generator,
+    curr_ids: np.ndarray,
+    fanouts: dict[str, FanOut],
+    first_bureau: int,
+    first_prev: int,
+    sorted_keys: bool = False,
+) -> dict[str, pa.Table]:
+    """
+    Las siete tablas de un bloque de clientes: cada fila hija queda en el mismo bloque que su
+    SK_ID_CURR, así que los bloques se escriben uno tras otro sin volver sobre los anteriores.
+
+    Las tablas hijas se generan agrupadas por key y, salvo sorted_keys, se mezclan dentro del
+    bloque: como en los archivos originales, las filas de una key no son contiguas ni las
+    keys están ordenadas (application sí viene ordenada por SK_ID_CURR).
+    """
+    curr, bureau_key, prev_key = KEYS["SK_ID_CURR"], KEYS["SK_ID_BUREAU"], KEYS["SK_ID_PREV"]
+    n = curr_ids.shape[0]
+    tables = {"application": application_table(rng, curr_ids)}
+
+    bureau = bureau_table(rng, curr_ids, fanouts["bureau"].sample(rng, n), first_bureau)
+    bureau_ids = bureau[bureau_key].to_numpy()
+    tables["bureau"] = bureau
+    tables["bureau_balance"] = bureau_balance_table(rng, bureau_ids, fanouts["bureau_balance"].sample(rng, bureau_ids.shape[0]))
+
+    previous = previous_table(rng, curr_ids, fanouts["previous_application"].sample(rng, n), first_prev)
+    prev_ids, prev_curr = previous[prev_key].to_numpy(), previous[curr].to_numpy()
+    tables["previous_application"] = previous
+    for name in ("pos_cash_balance", "installments_payments", "credit_card_balance"):
+        tables[name] = monthly_table(rng, name, prev_ids, prev_curr, fanouts[name].sample(rng, prev_ids.shape[0]))
+
+    if not sorted_keys:
+        for name in PARENTS:
+            tables[name] = tables[name].take(rng.permutation(tables[name].num_rows))
+    return tables
+
+
+def generate_raw(
+    out_dir: Path,
+    scale: float,
+    profile_path: Path,
+    seed: int = 0,
+    block_customers: int = BLOCK_CUSTOMERS,
+    sorted_keys: bool = False,
+    verbose: bool = True,
+) -> dict[str, int]:
+    """
+    Escribe las siete tablas crudas (nombres de config.FILES) con scale veces las filas de
+    application del dataset original, y las relaciones uno-a-muchos del perfil de keys.
+
+    Se genera por bloques de block_customers clientes y cada bloque se agrega como row group
+    a los siete parquet abiertos, así que la memoria depende del tamaño del bloque y no de
+    scale. Las filas hijas se mezclan dentro de cada bloque (sorted_keys=True las deja
+    ordenadas por key, ver generate_block). Mismo seed, block_customers y sorted_keys ->
+    mismos archivos. Devuelve las filas de cada tabla.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    fanouts = load_fanouts(profile_path)
+    curr, bureau_key, prev_key = KEYS["SK_ID_CURR"], KEYS["SK_ID_BUREAU"], KEYS["SK_ID_PREV"]
+
+    n_app = max(1, int(round(BASE_APPLICATION_ROWS * scale)))
+    next_bureau, next_prev = ID_START[bureau_key], ID_START[prev_key]
+    rows = dict.fromkeys(RAW_TABLES, 0)
+    writers: dict[str, pq.ParquetWriter] = {}
+    try:
+        for start in range(0, n_app, block_customers):
+            curr_ids = ID_START[curr] + np.arange(start, min(start + block_customers, n_app), dtype=np.int64)
+            tables = generate_block(rng, curr_ids, fanouts, next_bureau, next_prev, sorted_keys)
+            next_bureau += tables["bureau"].num_rows
+            next_prev += tables["previous_application"].num_rows
+            for name, table in tables.items():
+                if name not in writers:
+                    # Sin el schema de Arrow: las columnas de diccionario se leen como string, igual que el original
+                    writers[name] = pq.ParquetWriter(out_dir / FILES[name], table.schema, store_schema=False)
+                writers[name].write_table(table)
+                rows[name] += table.num_rows
+            del tables
+            if verbose:
+                print(f"  customers {curr_ids[-1] - ID_START[curr] + 1:>12,} / {n_app:,}  rows={sum(rows.values()):>14,}", flush=True)
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    if verbose:
+        for name, n in rows.items():
+            print(f"  {name:24s} rows={n:>14,}")
+    return rows
+
+
+def key_profile(raw_dir: Path, table: str, key: str) -> Optional[dict]:
+    """
+    Cardinalidad de una key en una tabla ya escrita (mismos campos que el perfil de EDA).
+    """
+    path = Path(raw_dir) / FILES[table]
+    keys = pq.read_table(path, columns=[key])[key].to_numpy()
+    values, counts = np.unique(keys, return_counts=True)
+    return {
+        "df": table,
+        "rows": int(keys.shape[0]),
+        "key": key,
+        "n_unique": int(values.shape[0]),
+        "avg_rows_per_key": float(keys.shape[0] / max(values.shape[0], 1)),
+        "max_rows_per_key": int(counts.max()) if counts.size else 0,
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Genera las siete tablas crudas sintéticas a cualquier escala.")
+    parser.add_argument("--scale", type=float, default=1.0, help="Veces las filas de application del dataset original (1 = 307.511 clientes).")
+    parser.add_argument("--out-dir", type=Path, default=RAW_DIR, help="Directorio de salida (por defecto RAW_DIR).")
+    parser.add_argument("--profile", type=Path, default=INTERIM_DIR / "eda_secondary_key_profiles.json", help="Perfil de keys de 02_eda_secondary.py.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--block-customers", type=int, default=BLOCK_CUSTOMERS, help="Clientes por bloque (controla la memoria).")
+    parser.add_argument("--sorted", action="store_true", help="Tablas hijas ordenadas por key (por defecto se mezclan, como los archivos originales).")
+    args = parser.parse_args(argv)
+
+    out_dir = args.out_dir.resolve()
+    existing = [FILES[name] for name in RAW_TABLES if (out_dir / FILES[name]).exists()]
+    if out_dir == RAW_DIR.resolve() and existing:
+        print(f"[skip] {out_dir} already has raw tables ({', '.join(existing)}); use --out-dir or RAW_DIR")
+        return 1
+
+    t0 = time.perf_counter()
+    rows = generate_raw(out_dir, args.scale, args.profile, seed=args.seed, block_customers=args.block_customers, sorted_keys=args.sorted)
+    size_mb = sum((out_dir / FILES[name]).stat().st_size for name in RAW_TABLES) / 1e6
+    print(f"\nTotal rows: {sum(rows.values()):,} ({size_mb:.0f} MB) in {time.perf_counter() - t0:.1f}s")
+    print(f"[OK] Synthetic raw tables saved to: {out_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import json
+import mmap
+import struct
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+
+
+# Filas por bloque al recorrer los árboles (acota la memoria de la matriz filas x árboles)
+EVAL_CHUNK_ROWS = 4096
+
+# Formato plano (save_flat / load_flat): magic + largo del header (uint64 little-endian) +
+# header JSON + arrays alineados a FLAT_ALIGN bytes
+FLAT_MAGIC = b"HCTREE01"
+FLAT_ALIGN = 64
+
+
+@dataclass(frozen=True)
+class CompiledEnsemble:
+    """
+    Ensemble de árboles aplanado en arrays NumPy contiguos (un nodo por posición).
+
+    Todos los árboles comparten los mismos arrays; roots[t] es el nodo raíz del árbol t.
+    Las hojas apuntan a sí mismas en left/right, así el recorrido en paralelo de todos
+    los árboles puede iterar max_depth veces sin ramas especiales.
+    """
+    columns: tuple[str, ...]
+    baseline: float
+    roots: np.ndarray            # int32 [n_trees]
+    feature: np.ndarray          # int32 [n_nodes]
+    threshold: np.ndarray        # float64 [n_nodes]
+    missing_go_left: np.ndarray  # bool [n_nodes]
+    left: np.ndarray             # int32 [n_nodes]
+    right: np.ndarray            # int32 [n_nodes]
+    value: np.ndarray            # float64 [n_nodes] (solo se usa en hojas)
+    max_depth: int
+
+    @property
+    def n_trees(self) -> int:
+        return int(self.roots.shape[0])
+
+    @property
+    def n_features(self) -> int:
+        return len(self.columns)
+
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        """
+        Score crudo (log-odds) para una matriz (n_rows, n_features) en el orden de columns.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"X debe tener forma (n, {self.n_features}); recibido {X.shape}")
+
+        raw = np.empty(X.shape[0], dtype=np.float64)
+        for start in range(0, X.shape[0], EVAL_CHUNK_ROWS):
+            stop = start + EVAL_CHUNK_ROWS
+            raw[start:stop] = self._raw_chunk(X[start:stop])
+        return raw
+
+    def _raw_chunk(self, X: np.ndarray) -> np.ndarray:
+        # node[i, t] = nodo actual de la fila i en el árbol t; todos avanzan un nivel por iteración
+        node = np.broadcast_to(self.roots, (X.shape[0], self.n_trees))
+        for _ in range(self.max_depth):
+            x = np.take_along_axis(X, self.feature[node], axis=1)
+            go_left = np.where(np.isnan(x), self.missing_go_left[node], x <= self.threshold[node])
+            node = np.where(go_left, self.left[node], self.right[node])
+        return self.baseline + self.value[node].sum(axis=1)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """
+        Igual que HistGradientBoostingClassifier.predict_proba (clasificación binaria).
+        """
+        p1 = 1.0 / (1.0 + np.exp(-self.decision_function(X)))
+        return np.column_stack([1.0 - p1, p1])
+
+    def save(self, path: Path) -> None:
+        """
+        Guarda el ensemble en un .npz sin pickle.
+        """
+        np.savez(
+            path,
+            columns=np.array(self.columns, dtype=np.str_),
+            baseline=np.array(self.baseline),
+            roots=self.roots,
+            feature=self.feature,
+            threshold=self.threshold,
+            missing_go_left=self.missing_go_left,
+            left=self.left,
+            right=self.right,
+            value=self.value,
+            max_depth=np.array(self.max_depth),
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "CompiledEnsemble":
+        with np.load(path, allow_pickle=False) as z:
+            return cls(
+                columns=tuple(str(c) for c in z["columns"]),
+                baseline=float(z["baseline"]),
+                roots=z["roots"],
+                feature=z["feature"],
+                threshold=z["threshold"],
+                missing_go_left=z["missing_go_left"],
+                left=z["left"],
+                right=z["right"],
+                value=z["value"],
+                max_depth=int(z["max_depth"]),
+            )
+
+    def save_flat(self, path: Path) -> None:
+        """
+        Guarda el ensemble en un solo archivo sin pickle pensado para memory-map: header JSON
+        (columnas, escalares y offset / dtype / forma de cada array) seguido de los arrays en
+        crudo, cada uno alineado a FLAT_ALIGN bytes.
+        """
+        arrays = {f.name: getattr(self, f.name) for f in fields(self) if isinstance(getattr(self, f.name), np.ndarray)}
+        specs, offset = {}, 0
+        for name, a in arrays.items():
+            # offset relativo al inicio de la sección de datos
+            specs[name] = {"dtype": a.dtype.str, "shape": list(a.shape), "offset": offset}
+            offset += _aligned(a.nbytes)
+        header = json.dumps({
+            "columns": list(self.columns),
+            "baseline": self.baseline,
+            "max_depth": self.max_depth,
+            "arrays": specs,
+        }).encode()
+
+        prefix = FLAT_MAGIC + struct.pack("<Q", len(header)) + header
+        data_start = _aligned(len(prefix))
+        with open(path, "wb") as f:
+            f.write(prefix)
+            for name, a in arrays.items():
+                f.write(b"\0" * (data_start + specs[name]["offset"] - f.tell()))
+                f.write(np.ascontiguousarray(a).tobytes())
+
+    @classmethod
+    def load_flat(cls, path: Path) -> "CompiledEnsemble":
+        """
+        Abre un archivo de save_flat con memory-map de solo lectura: no copia los arrays (las
+        páginas se leen al usarse) y los procesos que abren el mismo archivo comparten esas
+        páginas. Solo necesita NumPy.
+        """
+        with open(path, "rb") as f:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if buf[:len(FLAT_MAGIC)] != FLAT_MAGIC:
+            raise ValueError(f"{path} no es un modelo plano (magic {bytes(buf[:len(FLAT_MAGIC)])!r})")
+        (size,) = struct.unpack_from("<Q", buf, len(FLAT_MAGIC))
+        start = len(FLAT_MAGIC) + 8
+        header = json.loads(buf[start:start + size])
+        data_start = _aligned(start + size)
+
+        arrays = {}
+        for name, spec in header["arrays"].items():
+            dtype = np.dtype(spec["dtype"])
+            count = int(np.prod(spec["shape"]))
+            arrays[name] = np.frombuffer(buf, dtype=dtype, count=count, offset=data_start + spec["offset"]).reshape(spec["shape"])
+        return cls(
+            columns=tuple(header["columns"]),
+            baseline=float(header["baseline"]),
+            max_depth=int(header["max_depth"]),
+            **arrays,
+        )
+
+
+def _aligned(n: int) -> int:
+    return -(-n // FLAT_ALIGN) * FLAT_ALIGN
+
+
+def export_hist_gradient_boosting(model, columns: Sequence[str]) -> CompiledEnsemble:
+    """
+    Aplana un HistGradientBoostingClassifier binario ya entrenado (solo splits numéricos).
+    """
+    if getattr(model, "n_trees_per_iteration_", None) != 1:
+        raise ValueError("Solo se soporta clasificación binaria (n_trees_per_iteration_ == 1).")
+    if getattr(model, "is_categorical_", None) is not None and np.any(model.is_categorical_):
+        raise ValueError("El modelo tiene features categóricas nativas; no soportado.")
+    if model.n_features_in_ != len(columns):
+        raise ValueError(f"columns tiene {len(columns)} nombres; el modelo espera {model.n_features_in_}")
+
+    trees = [predictors[0].nodes for predictors in model._predictors]
+
+    sizes = np.array([t.shape[0] for t in trees])
+    offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    nodes = np.concatenate(trees)
+    node_offset = np.repeat(offsets, sizes)
+
+    is_leaf = nodes["is_leaf"].astype(bool)
+    own = np.arange(nodes.shape[0])
+
+    left = np.where(is_leaf, own, nodes["left"].astype(np.int64) + node_offset)
+    right = np.where(is_leaf, own, nodes["right"].astype(np.int64) + node_offset)
+
+    return CompiledEnsemble(
+        columns=tuple(columns),
+        baseline=float(np.ravel(model._baseline_prediction)[0]),
+        roots=offsets.astype(np.int32),
+        feature=np.where(is_leaf, 0, nodes["feature_idx"]).astype(np.int32),
+        threshold=nodes["num_threshold"].astype(np.float64),
+        missing_go_left=nodes["missing_go_to_left"].astype(bool),
+        left=left.astype(np.int32),
+        right=right.astype(np.int32),
+        value=np.where(is_leaf, nodes["value"], 0.0).astype(np.float64),
+        max_depth=int(nodes["depth"].max()),
+    )
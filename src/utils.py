@@ -0,0 +1,24 @@
+import os
+import resource
+import sys
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def peak_rss_bytes() -> int:
+    # ru_maxrss: KB en Linux, bytes en macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+def process_memory() -> tuple[int, int]:
+    """
+    (memoria virtual, residente) actual del proceso en bytes. /proc solo existe en Linux;
+    en otro sistema se devuelve el pico de RSS como aproximación.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            size, resident = f.read().split()[:2]
+        return int(size) * _PAGE_SIZE, int(resident) * _PAGE_SIZE
+    except OSError:
+        return 0, peak_rss_bytes()